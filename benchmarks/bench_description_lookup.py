@@ -0,0 +1,89 @@
+"""Микробенчмарк поиска описаний: последовательный перебор против индексов.
+
+Запуск: python -m benchmarks.bench_description_lookup [--entries 60000] [--queries 500]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from src.description_manager import DescriptionManager
+
+
+def build_dictionary(entries: int, like_entries: int, seed: int = 42) -> list:
+    """Создает синтетический словарь описаний методов"""
+    rnd = random.Random(seed)
+    data = []
+    for i in range(entries):
+        if rnd.random() < 0.5:
+            name = f"Class{i % 5000}::method{i}"
+        else:
+            name = f"method{i}"
+        data.append({'name': name, 'desc': f"Описание {i}"})
+    for i in range(like_entries):
+        data.append({'name': f"Pattern{i}Suffix", 'desc': f"Шаблон {i}", 'cond': 'like'})
+    return data
+
+
+def build_queries(count: int, entries: int, seed: int = 7) -> list:
+    """Создает набор запросов: часть находится, часть нет"""
+    rnd = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        i = rnd.randrange(entries * 2)
+        method = f"method{i}"
+        queries.append((f"Class{i % 5000}::{method}", method))
+    return queries
+
+
+def linear_lookup(manager: DescriptionManager, compare_names: list, exact_match: bool):
+    """Поиск прежним перебором всего списка"""
+    for position, item in enumerate(manager.descriptions['method']):
+        item_name = item.get('name', '')
+        if item_name and manager._matches(item, item_name, compare_names, exact_match):
+            return position
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк DescriptionManager.get_description')
+    parser.add_argument('--entries', type=int, default=60000)
+    parser.add_argument('--like-entries', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--partial-match', action='store_false', dest='exact_match', default=True)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = build_dictionary(args.entries, args.like_entries)
+        Path(tmp, 'methods.json').write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+        started = time.perf_counter()
+        manager = DescriptionManager(tmp)
+        load_time = time.perf_counter() - started
+
+        queries = [
+            manager._prepare_search_names('method', name, short, True, args.exact_match)[1]
+            for name, short in build_queries(args.queries, args.entries)
+        ]
+        index = manager.indexes['method']
+
+        started = time.perf_counter()
+        expected = [linear_lookup(manager, names, args.exact_match) for names in queries]
+        linear_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = [index.find(names, args.exact_match) for names in queries]
+        indexed_time = time.perf_counter() - started
+
+    assert actual == expected, 'Результаты индекса расходятся с перебором'
+
+    print(f"Записей в словаре: {len(data)}, запросов: {len(queries)}")
+    print(f"Загрузка и построение индексов: {load_time * 1000:.1f} мс")
+    print(f"Перебор:  {linear_time * 1000:.1f} мс ({linear_time / len(queries) * 1e6:.1f} мкс/запрос)")
+    print(f"Индексы:  {indexed_time * 1000:.1f} мс ({indexed_time / len(queries) * 1e6:.1f} мкс/запрос)")
+    print(f"Ускорение: x{linear_time / max(indexed_time, 1e-9):.0f}")
+
+
+if __name__ == '__main__':
+    main()
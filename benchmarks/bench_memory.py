@@ -0,0 +1,140 @@
+"""Бенчмарк памяти строк отчета: прежние словари против ReportItem.
+
+Элементы синтетического проекта (benchmarks.corpus) проходят через тот же
+путь, что и вывод PHP-парсера: JSON-декодирование ответа по каждому файлу,
+PHPAnalyzer._process_file и ItemSorter. Для сравнения те же ответы
+превращаются в словари элементов отчета в прежнем формате. Считается память,
+удерживаемая всеми строками отчета (объекты без повторов, по sys.getsizeof).
+
+Запуск: python -m benchmarks.bench_memory [--elements 1000000]
+"""
+import argparse
+import json
+import pickle
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from benchmarks.corpus import generate_project
+from src.item_sorter import ItemSorter
+from src.php_analyzer import PHPAnalyzer
+from src.report_item import Element
+
+
+def build_responses(elements: int, seed: int = 1) -> list:
+    """Ответы парсера (JSON по файлам), повторяющие синтетический проект до elements элементов"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = generate_project(tmp, files=500, seed=seed)
+
+    by_file = defaultdict(list)
+    for element in manifest:
+        element = dict(element)
+        by_file[element.pop('relative_path')].append(element)
+
+    responses = []
+    total = 0
+    copy = 0
+    while total < elements:
+        for relative_path, file_elements in by_file.items():
+            responses.append((f"copy{copy}/{relative_path}", json.dumps(file_elements, ensure_ascii=False)))
+            total += len(file_elements)
+            if total >= elements:
+                break
+        copy += 1
+    return responses
+
+
+class LegacySorter(ItemSorter):
+    """ItemSorter в прежнем виде: словари строк, прогоны сбрасываются по одной строке"""
+
+    line_key = staticmethod(lambda item: item['line_number'])
+    path_key = staticmethod(lambda item: item['relative_path'])
+
+    def _spill(self):
+        run = tempfile.TemporaryFile(prefix='php_analyzer_run_')
+        for item in self._iter_buffer():
+            pickle.dump(item, run, protocol=pickle.HIGHEST_PROTOCOL)
+        self._runs.append(run)
+        self._buffer = []
+        self._buffered = 0
+
+    @staticmethod
+    def _read_run(run):
+        while True:
+            try:
+                yield pickle.load(run)
+            except EOFError:
+                return
+
+
+def legacy_items(analyzer: PHPAnalyzer, relative_path: str, elements: list) -> list:
+    """Элементы отчета в прежнем формате: словарь на строку с полями из декодированного JSON"""
+    items = []
+    for element in elements:
+        items.append({
+            'relative_path': relative_path,
+            'name': element['name'],
+            'type': element['type'],
+            'type_ru': analyzer.TYPE_MAPPING.get(element['type'], element['type']),
+            'description': element['doc'],
+            'item_number': 1,
+            'line_number': element.get('startLine', 0),
+        })
+    return items
+
+
+def retained_size(items: list) -> int:
+    """Память списка строк отчета вместе с полями, каждый объект учитывается один раз"""
+    seen = set()
+    total = sys.getsizeof(items)
+    for item in items:
+        total += sys.getsizeof(item)
+        values = item.values() if isinstance(item, dict) else item
+        for value in values:
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
+
+
+def run(mode: str, analyzer: PHPAnalyzer, responses: list, spill: bool) -> dict:
+    """Собирает строки отчета одним способом и измеряет удерживаемую память"""
+    sorter_class = LegacySorter if mode == 'legacy' else ItemSorter
+    sorter = sorter_class(buffer_items=50000 if spill else 0)
+    for relative_path, payload in responses:
+        decoded = json.loads(payload)
+        if mode == 'legacy':
+            # Как раньше: путь один на файл, остальные строки - из JSON каждого элемента
+            sorter.add_file_items(legacy_items(analyzer, relative_path, decoded))
+        else:
+            elements = [Element.from_dict(element) for element in decoded]
+            sorter.add_file_items(analyzer._process_file(analyzer.base_dir / relative_path, elements))
+
+    items = list(sorter)
+    size = retained_size(items)
+    sorter.close()
+    return {'items': len(items), 'bytes': size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк памяти строк отчета')
+    parser.add_argument('--elements', type=int, default=1000000)
+    parser.add_argument('--spill', action='store_true',
+                        help='Сбрасывать прогоны ItemSorter на диск (строки читаются обратно из pickle)')
+    args = parser.parse_args()
+
+    responses = build_responses(args.elements)
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = PHPAnalyzer(tmp, cache_dir=None)
+        analyzer.base_dir = Path(tmp)
+        results = {mode: run(mode, analyzer, responses, args.spill) for mode in ('legacy', 'compact')}
+
+    for mode, result in results.items():
+        print(f"{mode:<8} строк: {result['items']}, память: {result['bytes'] / 2 ** 20:.1f} МБ "
+              f"({result['bytes'] / result['items']:.0f} байт/строка)")
+    ratio = results['legacy']['bytes'] / results['compact']['bytes']
+    print(f"Сокращение памяти: x{ratio:.2f}")
+
+
+if __name__ == '__main__':
+    main()
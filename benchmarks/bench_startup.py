@@ -0,0 +1,110 @@
+"""Бенчмарк запуска: время от старта интерпретатора до первого разобранного файла.
+
+Каждый прогон - отдельный процесс Python в корне проекта, который импортирует
+main, проверяет окружение (prepare_environment), создает анализатор и разбирает
+первый файл. Сценарии:
+  cold     - пустая директория кэша и устаревший скрипт воркера
+  warm     - проверка окружения из кэша, скрипт воркера не перезаписывается
+  no_cache - --no-cache: php -v и чтение версии PHP-Parser при каждом запуске
+
+Файл проекта меняется в каждом прогоне, чтобы разбор не брался из кэша. Скрипт
+воркера записывается во временную директорию, php_ast_parser.php проекта не меняется.
+
+Запуск: python -m benchmarks.bench_startup [--repeat 10] [--engine php]
+"""
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from src.config import Config
+from src.environment import EnvironmentProbe
+
+# Замеры внутри процесса: секунды от старта до завершения каждого этапа
+CHILD = r'''
+import time
+started = time.perf_counter()
+import argparse, json, sys
+from pathlib import Path
+import main
+from src.config import Config
+from src.file_discovery import FileDiscovery
+marks = {'import': time.perf_counter() - started}
+Config.PHP_PARSER_SCRIPT = sys.argv[1]
+parser = argparse.ArgumentParser()
+main.add_analysis_arguments(parser)
+args = parser.parse_args(sys.argv[2:])
+main.prepare_environment(args)
+marks['environment'] = time.perf_counter() - started
+analyzer = main.create_analyzer(args)
+marks['analyzer'] = time.perf_counter() - started
+files = FileDiscovery(Path(args.directory), **main.get_discovery_options(args))
+try:
+    next(analyzer.parser_pool.parse_files(files))
+    marks['first_file'] = time.perf_counter() - started
+finally:
+    analyzer.close()
+print(json.dumps(marks))
+'''
+
+SCENARIOS = ('cold', 'warm', 'no_cache')
+MARKS = ('import', 'environment', 'analyzer', 'first_file', 'process')
+
+
+def run_once(workdir: Path, run: int, scenario: str, engine: str) -> dict:
+    """Один запуск в отдельном процессе, возвращает отметки этапов"""
+    cache_dir = workdir / 'cache'
+    script = workdir / Config.PHP_PARSER_SCRIPT
+    if scenario == 'cold':
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        script.write_text('<?php // устаревшая версия\n', encoding='utf-8')
+    project = workdir / 'project'
+    project.mkdir(exist_ok=True)
+    (project / 'Startup.php').write_text(f"<?php\nclass Startup{run} {{\n    public $run = {run};\n}}\n",
+                                         encoding='utf-8')
+
+    command = [sys.executable, '-c', CHILD, str(script), str(project), '--quiet', '--skip-composer',
+               '--engine', engine, '--cache-dir', str(cache_dir),
+               '--descriptions', str(workdir / 'descriptions')]
+    if scenario == 'no_cache':
+        command.append('--no-cache')
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    marks['process'] = time.perf_counter() - started
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--engine', choices=Config.PARSE_ENGINES, default=Config.PARSE_ENGINE)
+    args = parser.parse_args()
+
+    if args.engine == 'php' and not EnvironmentProbe(None).php_available():
+        print("PHP не установлен: запустите с --engine python")
+        return
+
+    print(f"Медиана по {args.repeat} запускам, мс")
+    print(f"{'Сценарий':<10}" + ''.join(f"{mark:>13}" for mark in MARKS))
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        (workdir / 'descriptions').mkdir()
+        run = 0
+        for scenario in SCENARIOS:
+            samples = {mark: [] for mark in MARKS}
+            for _ in range(args.repeat):
+                run += 1
+                marks = run_once(workdir, run, scenario, args.engine)
+                for mark in MARKS:
+                    samples[mark].append(marks[mark])
+            print(f"{scenario:<10}" + ''.join(f"{statistics.median(samples[mark]) * 1000:>13.1f}"
+                                              for mark in MARKS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Микробенчмарк протокола воркера: массив объектов (v1) против столбцов (v2).
+
+Ответ для файла с --members элементами (сгенерированная модель с тысячами
+свойств и методов) кодируется обоими способами; замеряются размер ответа,
+время json.loads вместе с построением Element и память декодированного ответа.
+
+Запуск: python -m benchmarks.bench_wire_format [--members 5000] [--repeat 20]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from src.php_parser import PHPParser
+from src.report_item import Element
+
+
+def build_elements(members: int) -> list:
+    """Элементы файла в формате php_ast_parser.php"""
+    elements = [{'type': 'class', 'name': 'GeneratedModel', 'doc': '/** Модель */', 'startLine': 3}]
+    for i in range(members):
+        item_type = 'property' if i % 2 else 'method'
+        name = f"attribute{i}" if i % 2 else f"getAttribute{i}"
+        separator = '::$' if i % 2 else '::'
+        elements.append({'type': item_type, 'name': f"GeneratedModel{separator}{name}", 'short_name': name,
+                         'doc': f"/** Поле {i} */" if i % 3 else '', 'startLine': 10 + i})
+    return elements
+
+
+def encode_v1(elements: list) -> bytes:
+    """Прежний ответ: массив объектов с именами полей в каждом элементе"""
+    return json.dumps({'elements': elements, 'error': None}).encode('utf-8')
+
+
+def encode_v2(elements: list) -> bytes:
+    """Ответ по столбцам, как packElements в php_ast_parser.php"""
+    codes = {item_type: code for code, item_type in enumerate(PHPParser.ELEMENT_TYPES)}
+    columns = {
+        'type': [codes[element['type']] for element in elements],
+        'name': [element['name'] for element in elements],
+        'short_name': [element.get('short_name', '') for element in elements],
+        'doc': [element['doc'] for element in elements],
+        'line': [element['startLine'] for element in elements],
+    }
+    # JSON_UNESCAPED_UNICODE: кириллица передается как UTF-8
+    return json.dumps({'v': PHPParser.PROTOCOL_VERSION, 'elements': columns, 'error': None},
+                      ensure_ascii=False).encode('utf-8')
+
+
+def decode_v1(body: bytes) -> list:
+    """Прежнее декодирование: текст, словари, затем элементы"""
+    return [Element.from_dict(element) for element in json.loads(body.decode('utf-8'))['elements']]
+
+
+def decode_v2(body: bytes) -> list:
+    """Декодирование по столбцам из байтов ответа"""
+    return PHPParser.unpack_elements(json.loads(body)['elements'])
+
+
+def measure(decode, body: bytes, repeat: int):
+    """Лучшее время декодирования и пиковая память одного декодирования"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        decode(body)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    decode(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк протокола PHP-воркера')
+    parser.add_argument('--members', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    elements = build_elements(args.members)
+    bodies = {'v1': encode_v1(elements), 'v2': encode_v2(elements)}
+    assert decode_v1(bodies['v1']) == decode_v2(bodies['v2']), 'Форматы декодируются по-разному'
+
+    results = {}
+    for name, decode in (('v1', decode_v1), ('v2', decode_v2)):
+        seconds, peak = measure(decode, bodies[name], args.repeat)
+        results[name] = seconds
+        print(f"{name}: ответ {len(bodies[name]) / 1024:.0f} КБ, декодирование {seconds * 1000:.2f} мс, "
+              f"пик памяти {peak / 2 ** 20:.1f} МБ")
+    print(f"Ускорение декодирования: x{results['v1'] / results['v2']:.2f}, "
+          f"размер ответа: {len(bodies['v2']) / len(bodies['v1']):.0%} от прежнего")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""Детерминированный генератор синтетических PHP-проектов для бенчмарков.
+
+Раскладка повторяет Yii-проект (как my-project/): controllers, models, components,
+helpers, views и config. Вместе с файлами возвращается перечень элементов в том
+виде, в каком их отдает php_ast_parser.php, чтобы сценарии без PHP (поиск описаний,
+запись CSV) работали на тех же именах.
+
+Запуск: python -m benchmarks.corpus /tmp/corpus [--files 200] [--classes 2]
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+# Директории Yii-проекта и суффиксы имен классов в них
+LAYOUT = (
+    ('controllers', 'Controller'),
+    ('models', ''),
+    ('components', 'Component'),
+    ('helpers', 'Helper'),
+    ('adapters', 'Adapter'),
+)
+
+WORDS = (
+    'user', 'order', 'file', 'layer', 'map', 'report', 'item', 'price', 'account', 'session',
+    'token', 'group', 'role', 'config', 'cache', 'search', 'filter', 'export', 'import', 'status',
+)
+VERBS = ('get', 'set', 'find', 'load', 'save', 'build', 'check', 'apply', 'render', 'validate')
+
+
+def generate_project(root: str | Path, files: int = 200, classes_per_file: int = 2, methods: int = 6,
+                     properties: int = 4, constants: int = 2, variables: int = 3,
+                     docblock_ratio: float = 0.5, seed: int = 1) -> List[Dict]:
+    """Создает проект в root и возвращает перечень элементов в порядке обхода файлов"""
+    rnd = random.Random(seed)
+    root = Path(root)
+    manifest: List[Dict] = []
+
+    class_files = max(1, files - files // 5)
+    for i in range(files):
+        if i < class_files:
+            directory, suffix = LAYOUT[i % len(LAYOUT)]
+            base_name = f"{_camel(rnd.choice(WORDS))}{_camel(rnd.choice(WORDS))}{i}"
+            relative_path = f"{directory}/{base_name}{suffix}.php"
+            code, elements = _class_file(rnd, base_name + suffix, classes_per_file, methods,
+                                         properties, constants, docblock_ratio)
+        elif i % 2:
+            relative_path = f"views/{rnd.choice(WORDS)}{i}/index.php"
+            code, elements = _view_file(rnd, i, variables, docblock_ratio)
+        else:
+            relative_path = f"config/{rnd.choice(WORDS)}{i}.php"
+            code, elements = _config_file(rnd, i, constants, variables, docblock_ratio)
+
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code, encoding='utf-8')
+        for element in elements:
+            element['relative_path'] = relative_path
+        manifest.extend(elements)
+
+    return manifest
+
+
+def generate_descriptions(manifest: List[Dict], entries: int, hit_ratio: float = 0.5,
+                          seed: int = 2) -> Dict[str, List[Dict]]:
+    """Создает словари описаний по типам: часть имен из проекта, остальное - шум до entries записей"""
+    rnd = random.Random(seed)
+    result: Dict[str, List[Dict]] = {}
+    for element in manifest:
+        if rnd.random() < hit_ratio:
+            result.setdefault(element['type'], []).append(
+                {'name': element['name'], 'desc': f"Описание {element['name']}"})
+
+    types = sorted({element['type'] for element in manifest})
+    for i in range(entries - sum(len(items) for items in result.values())):
+        item_type = types[i % len(types)]
+        name = f"Noise{i % 3000}::{rnd.choice(VERBS)}{i}" if i % 2 else f"noise_{i}"
+        result.setdefault(item_type, []).append({'name': name, 'desc': f"Шум {i}"})
+    return result
+
+
+def _class_file(rnd: random.Random, class_name: str, classes: int, methods: int, properties: int,
+                constants: int, docblock_ratio: float):
+    """Файл с классами, их константами, свойствами и методами"""
+    lines = ['<?php', '', 'namespace app\\generated;', '']
+    elements = []
+    for c in range(classes):
+        name = class_name if c == 0 else f"{class_name}Part{c}"
+        _docblock(rnd, lines, f"Класс {name}", docblock_ratio, '')
+        elements.append(_element('class', name, '', len(lines) + 1))
+        lines.append(f"class {name} extends \\yii\\base\\BaseObject")
+        lines.append('{')
+        for k in range(constants):
+            const = f"{rnd.choice(WORDS).upper()}_{k}"
+            _docblock(rnd, lines, f"Константа {const}", docblock_ratio)
+            elements.append(_element('class_constant', f"{name}::{const}", const, len(lines) + 1))
+            lines.append(f"    const {const} = {k};")
+        for k in range(properties):
+            prop = f"{rnd.choice(WORDS)}{_camel(rnd.choice(WORDS))}{k}"
+            _docblock(rnd, lines, f"@var string {prop}", docblock_ratio)
+            elements.append(_element('property', f"{name}::${prop}", prop, len(lines) + 1))
+            lines.append(f"    public ${prop} = '{prop}';")
+        for k in range(methods):
+            method = f"{rnd.choice(VERBS)}{_camel(rnd.choice(WORDS))}{k}"
+            _docblock(rnd, lines, f"Метод {method}\n@param int $id\n@return array", docblock_ratio)
+            elements.append(_element('method', f"{name}::{method}", method, len(lines) + 1))
+            lines.append(f"    public function {method}($id)")
+            lines.append('    {')
+            lines.append(f"        $result = ['id' => $id, 'name' => '{method}'];")
+            lines.append('        return $result;')
+            lines.append('    }')
+        lines.append('}')
+        lines.append('')
+    return '\n'.join(lines), elements
+
+
+def _view_file(rnd: random.Random, index: int, variables: int, docblock_ratio: float):
+    """Шаблон представления с переменными верхнего уровня и функцией-помощником"""
+    lines = ['<?php', '']
+    elements = []
+    for k in range(variables):
+        var = f"{rnd.choice(WORDS)}{k}"
+        _docblock(rnd, lines, f"@var mixed ${var}", docblock_ratio, '')
+        elements.append(_element('variable', f"${var}", '', len(lines) + 1))
+        lines.append(f"${var} = '{var}';")
+    function = f"render_{rnd.choice(WORDS)}_{index}"
+    _docblock(rnd, lines, f"Функция {function}", docblock_ratio, '')
+    elements.append(_element('function', function, '', len(lines) + 1))
+    lines.append(f"function {function}($value) {{ return htmlspecialchars($value); }}")
+    lines.append('?>')
+    lines.append('<div class="view"><?= $title ?? \'\' ?></div>')
+    return '\n'.join(lines) + '\n', elements
+
+
+def _config_file(rnd: random.Random, index: int, constants: int, variables: int, docblock_ratio: float):
+    """Файл конфигурации с глобальными константами и переменными"""
+    lines = ['<?php', '']
+    elements = []
+    for k in range(constants):
+        const = f"APP_{rnd.choice(WORDS).upper()}_{index}_{k}"
+        _docblock(rnd, lines, f"Константа {const}", docblock_ratio, '')
+        elements.append(_element('constant', const, '', len(lines) + 1))
+        lines.append(f"const {const} = '{k}';")
+    for k in range(variables):
+        var = f"params{k}"
+        elements.append(_element('variable', f"${var}", '', len(lines) + 1))
+        lines.append(f"${var} = ['key' => {k}];")
+    lines.append('return $params0;')
+    return '\n'.join(lines) + '\n', elements
+
+
+def _docblock(rnd: random.Random, lines: List[str], text: str, ratio: float, indent: str = '    '):
+    """С вероятностью ratio добавляет DocBlock перед элементом"""
+    if rnd.random() >= ratio:
+        return
+    lines.append(f"{indent}/**")
+    lines.extend(f"{indent} * {line}" for line in text.split('\n'))
+    lines.append(f"{indent} */")
+
+
+def _element(item_type: str, name: str, short_name: str, line: int) -> Dict:
+    """Элемент в формате вывода php_ast_parser.php"""
+    element = {'type': item_type, 'name': name, 'doc': '', 'startLine': line}
+    if short_name:
+        element['short_name'] = short_name
+    return element
+
+
+def _camel(word: str) -> str:
+    return word[:1].upper() + word[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Генератор синтетического PHP-проекта')
+    parser.add_argument('root', help='Директория, в которой создается проект')
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--classes', type=int, default=2, help='Классов в файле')
+    parser.add_argument('--methods', type=int, default=6)
+    parser.add_argument('--properties', type=int, default=4)
+    parser.add_argument('--constants', type=int, default=2)
+    parser.add_argument('--variables', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--manifest', help='Сохранить перечень элементов в JSON-файл')
+    args = parser.parse_args()
+
+    manifest = generate_project(args.root, args.files, args.classes, args.methods, args.properties,
+                                args.constants, args.variables, seed=args.seed)
+    if args.manifest:
+        Path(args.manifest).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"Создано файлов: {args.files}, элементов: {len(manifest)} в {args.root}")
+
+
+if __name__ == '__main__':
+    main()
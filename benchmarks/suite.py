@@ -0,0 +1,303 @@
+"""Набор бенчмарков анализатора с сохранением результатов и сравнением с базовой линией.
+
+Сценарии:
+  descriptions - DescriptionManager.get_description по большим словарям
+  load         - загрузка словарей из скомпилированного снимка (и для сравнения из JSON)
+  csv          - запись отчета CSVWriter
+  parse        - разбор файлов пулом PHP-воркеров (без кэша)
+  extract      - встроенный разбор файлов без PHP (FastExtractor)
+  end_to_end   - полный запуск PHPAnalyzer.analyze_directory
+
+Сценарии parse и end_to_end требуют PHP и PHP-Parser и пропускаются без них.
+
+Запуск:
+  python -m benchmarks.suite --output bench.json
+  python -m benchmarks.suite --baseline bench_baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+from benchmarks.corpus import generate_descriptions, generate_project
+from src.csv_writer import CSVWriter
+from src.description_manager import DescriptionManager
+from src.fast_extractor import FastExtractor
+from src.log import LOGGER_NAME
+from src.php_analyzer import PHPAnalyzer
+from src.php_tokenizer import UnsupportedSyntax
+from src.report_item import ReportItem
+from src.utils import check_php_environment
+
+RESULTS_VERSION = 1
+SCENARIOS = ('descriptions', 'load', 'csv', 'parse', 'extract', 'end_to_end')
+
+
+class Skip(Exception):
+    """Сценарий невозможно выполнить в текущем окружении"""
+
+
+def measure(func: Callable[[], None], repeat: int) -> Dict:
+    """Выполняет func repeat раз и возвращает время прогонов"""
+    runs = []
+    # Журнал анализатора не должен влиять на замеры: на время прогонов выводятся только ошибки
+    logger = logging.getLogger(LOGGER_NAME)
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - started)
+    finally:
+        logger.setLevel(level)
+    return {'median': statistics.median(runs), 'min': min(runs), 'runs': runs}
+
+
+def bench_descriptions(ctx: Dict) -> Dict:
+    """Поиск описаний для всех элементов проекта"""
+    manager = DescriptionManager(ctx['descriptions_dir'])
+    manifest = ctx['manifest']
+
+    def run():
+        for element in manifest:
+            manager.get_description(element['type'], element['name'], element.get('short_name', ''))
+
+    result = measure(run, ctx['repeat'])
+    result['ops'] = len(manifest)
+    return result
+
+
+def bench_load(ctx: Dict) -> Dict:
+    """Создание DescriptionManager со снимком словарей; json_median - без снимка"""
+    descriptions_dir = ctx['descriptions_dir']
+    # Первый запуск собирает снимок и в замер не входит
+    DescriptionManager(descriptions_dir)
+    result = measure(lambda: DescriptionManager(descriptions_dir), ctx['repeat'])
+    result['json_median'] = measure(lambda: DescriptionManager(descriptions_dir, use_snapshot=False),
+                                    ctx['repeat'])['median']
+    result['ops'] = len(DescriptionManager.SOURCE_FILES)
+    return result
+
+
+def bench_csv(ctx: Dict) -> Dict:
+    """Запись отчета из rows строк"""
+    manifest = ctx['manifest']
+    rows = ctx['csv_rows']
+    items = []
+    for i in range(rows):
+        element = manifest[i % len(manifest)]
+        items.append(ReportItem(
+            f"{i // len(manifest)}/{element['relative_path']}", 1, element['name'], element['type'],
+            PHPAnalyzer.TYPE_MAPPING[element['type']], f"Описание {element['name']}", element['startLine']
+        ))
+    output = Path(ctx['tmp']) / 'bench.csv'
+
+    result = measure(lambda: CSVWriter().write_to_csv(items, output), ctx['repeat'])
+    result['ops'] = rows
+    return result
+
+
+def bench_parse(ctx: Dict) -> Dict:
+    """Разбор всех файлов проекта PHP-воркерами"""
+    require_php()
+    analyzer = PHPAnalyzer(ctx['descriptions_dir'], cache_dir=None, jobs=ctx['jobs'])
+    files = list(analyzer.create_discovery(ctx['project']))
+    try:
+        def run():
+            for _ in analyzer.parser_pool.parse_files(files):
+                pass
+
+        # Первый прогон запускает воркеры и в замер не входит
+        measure(run, 1)
+        result = measure(run, ctx['repeat'])
+    finally:
+        analyzer.close()
+    result['ops'] = len(files)
+    return result
+
+
+def bench_extract(ctx: Dict) -> Dict:
+    """Встроенный разбор всех файлов проекта; fallbacks - файлы, которые достались бы PHP-воркеру"""
+    extractor = FastExtractor()
+    files = sorted(Path(ctx['project']).rglob('*.php'))
+    fallbacks = []
+
+    def run():
+        fallbacks.clear()
+        for file_path in files:
+            try:
+                extractor.extract_file(file_path)
+            except UnsupportedSyntax:
+                fallbacks.append(file_path)
+
+    result = measure(run, ctx['repeat'])
+    result['ops'] = len(files)
+    result['fallbacks'] = len(fallbacks)
+    return result
+
+
+def bench_end_to_end(ctx: Dict) -> Dict:
+    """Полный анализ проекта с записью отчета"""
+    require_php()
+    output = Path(ctx['tmp']) / 'report.csv'
+
+    def run():
+        analyzer = PHPAnalyzer(ctx['descriptions_dir'], cache_dir=None, jobs=ctx['jobs'])
+        analyzer.analyze_directory(ctx['project'], output)
+
+    result = measure(run, ctx['repeat'])
+    result['ops'] = len(ctx['manifest'])
+    return result
+
+
+BENCHMARKS = {
+    'descriptions': bench_descriptions,
+    'load': bench_load,
+    'csv': bench_csv,
+    'parse': bench_parse,
+    'extract': bench_extract,
+    'end_to_end': bench_end_to_end,
+}
+
+
+def require_php():
+    """Проверяет наличие PHP и PHP-Parser"""
+    if not check_php_environment():
+        raise Skip('PHP не установлен')
+    if not Path('vendor/nikic/php-parser').exists():
+        raise Skip('PHP-Parser не установлен (composer install)')
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Сравнивает медианы сценариев с базовой линией, возвращает строки сравнения"""
+    rows = []
+    for name, current in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if 'median' not in current or not base or 'median' not in base:
+            continue
+        ratio = current['median'] / base['median'] if base['median'] else 1.0
+        rows.append({
+            'scenario': name,
+            'baseline': base['median'],
+            'current': current['median'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def run_suite(args: argparse.Namespace) -> Dict:
+    """Генерирует проект и выполняет выбранные сценарии"""
+    params = {
+        'files': args.files,
+        'classes': args.classes,
+        'methods': args.methods,
+        'dict_entries': args.dict_entries,
+        'csv_rows': args.csv_rows,
+        'jobs': args.jobs,
+        'repeat': args.repeat,
+        'seed': args.seed,
+    }
+    results = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'scenarios': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='php_analyzer_bench_') as tmp:
+        project = Path(tmp) / 'my-project'
+        manifest = generate_project(project, args.files, args.classes, args.methods, seed=args.seed)
+        descriptions_dir = Path(tmp) / 'descriptions'
+        descriptions_dir.mkdir()
+        for item_type, items in generate_descriptions(manifest, args.dict_entries, seed=args.seed).items():
+            filename = DescriptionManager.SOURCE_FILES[item_type]
+            (descriptions_dir / filename).write_text(json.dumps(items, ensure_ascii=False), encoding='utf-8')
+
+        ctx = {
+            'tmp': tmp,
+            'project': project,
+            'manifest': manifest,
+            'descriptions_dir': str(descriptions_dir),
+            'csv_rows': args.csv_rows,
+            'jobs': args.jobs,
+            'repeat': args.repeat,
+        }
+        for name in args.scenario or SCENARIOS:
+            print(f"{name}...", end=' ', flush=True)
+            try:
+                result = BENCHMARKS[name](ctx)
+            except Skip as e:
+                results['scenarios'][name] = {'skipped': str(e)}
+                print(f"пропущен: {e}")
+                continue
+            results['scenarios'][name] = result
+            print(f"{result['median'] * 1000:.1f} мс (мин. {result['min'] * 1000:.1f} мс, операций {result['ops']})")
+
+    return results
+
+
+def load_results(path: str | Path) -> Dict:
+    """Загружает сохраненные результаты"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != RESULTS_VERSION:
+        raise ValueError(f"Неподдерживаемая версия результатов в {path}: {data.get('version')}")
+    return data
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Бенчмарки анализатора PHP-файлов',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Выполнить только указанный сценарий (можно повторять)')
+    parser.add_argument('--files', type=int, default=300, help='Файлов в синтетическом проекте')
+    parser.add_argument('--classes', type=int, default=2, help='Классов в файле')
+    parser.add_argument('--methods', type=int, default=8, help='Методов в классе')
+    parser.add_argument('--dict-entries', type=int, default=50000, help='Записей в словарях описаний')
+    parser.add_argument('--csv-rows', type=int, default=100000, help='Строк в сценарии csv')
+    parser.add_argument('--jobs', type=int, default=1, help='PHP-воркеров в сценариях parse и end_to_end')
+    parser.add_argument('--repeat', type=int, default=3, help='Повторов каждого сценария')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='bench_results.json', help='Файл для результатов')
+    parser.add_argument('--baseline', help='Файл базовой линии для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Допустимое замедление медианы относительно базовой линии (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args)
+    Path(args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"Результаты сохранены в {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline.get('params') != results['params']:
+        print("Предупреждение: параметры базовой линии отличаются от текущих")
+
+    rows = compare(results, baseline, args.threshold)
+    print(f"\n{'Сценарий':<14} {'База, мс':>10} {'Сейчас, мс':>11} {'Изменение':>10}")
+    for row in rows:
+        mark = '  РЕГРЕССИЯ' if row['regression'] else ''
+        print(f"{row['scenario']:<14} {row['baseline'] * 1000:>10.1f} {row['current'] * 1000:>11.1f} "
+              f"{(row['ratio'] - 1) * 100:>+9.1f}%{mark}")
+
+    regressions = [row['scenario'] for row in rows if row['regression']]
+    if regressions:
+        print(f"\nЗамедление больше {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
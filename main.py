@@ -1,20 +1,39 @@
 import argparse
+import cProfile
 import subprocess
+import sys
 from pathlib import Path
 from src.config import Config
+from src.description_manager import DescriptionManager
+from src.description_store import DescriptionStore
+from src.environment import EnvironmentProbe
+from src.file_discovery import FileDiscovery
+from src.incremental import git_changed_files, read_changed_files
+from src.log import configure_logging, get_logger
 from src.php_analyzer import PHPAnalyzer
-from src.utils import check_php_environment
+from src.profiler import profiler
+from src.report_writer import COMPRESSIONS
+from src.shard_merger import ShardMerger
+from src.sharding import ShardError, load_shard_results, parse_shard
+from src.watcher import ReportWatcher
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Анализатор PHP-файлов с использованием AST парсера',
-        formatter_class=argparse.ArgumentDefaultsHelpFormatter
-    )
+logger = get_logger('main')
+
+def add_analysis_arguments(parser: argparse.ArgumentParser):
+    """Добавляет общие для команд параметры анализа"""
     parser.add_argument('directory', help='Директория с PHP-файлами для анализа')
     parser.add_argument('--descriptions', default=Config.DESCRIPTIONS_DIR,
                         help='Директория с JSON-файлами описаний')
-    parser.add_argument('--output', default='php_analysis.csv',
-                        help='Имя выходного CSV-файла')
+    parser.add_argument('--description-store', metavar='FILE',
+                        help='Брать описания из SQLite-хранилища (см. команду import-descriptions) вместо JSON')
+    parser.add_argument('--no-description-snapshot', action='store_true',
+                        help='Не использовать скомпилированный снимок словарей описаний')
+    parser.add_argument('--output',
+                        help='Имя файла отчета (по умолчанию php_analysis с расширением формата)')
+    parser.add_argument('--format', choices=sorted(PHPAnalyzer.WRITERS), default='csv', dest='output_format',
+                        help='Формат отчета')
+    parser.add_argument('--compress', choices=sorted(COMPRESSIONS),
+                        help='Сжимать отчет (для форматов csv и jsonl)')
     parser.add_argument('--exact-match', action='store_true', default=True,
                         help='Сравнивать имена методов/свойств полностью')
     parser.add_argument('--partial-match', action='store_false', dest='exact_match',
@@ -27,52 +46,339 @@ def main():
                         help='Включать номера строк в отчет')
     parser.add_argument('--skip-composer', action='store_true',
                         help='Пропустить установку PHP-Parser')
+    parser.add_argument('--timeout', type=float, default=Config.PARSE_TIMEOUT,
+                        help='Максимальное время разбора одного файла, секунд')
+    parser.add_argument('--memory-limit', type=int, default=Config.PARSE_MEMORY_LIMIT_MB, metavar='MB',
+                        help='Ограничение памяти PHP-воркера, МБ (0 - без ограничения)')
+    parser.add_argument('--recycle-files', type=int, default=Config.WORKER_MAX_FILES, metavar='N',
+                        help='Перезапускать PHP-воркер после N файлов (0 - не перезапускать)')
+    parser.add_argument('--recycle-rss', type=float, default=Config.WORKER_MAX_RSS_MB, metavar='MB',
+                        help='Перезапускать PHP-воркер, когда его RSS превышает MB (0 - не проверять)')
+    parser.add_argument('--retry-quarantined', action='store_true',
+                        help='Снова разбирать файлы из карантина кэша')
+    parser.add_argument('--failure-report', default=Config.FAILURE_REPORT, metavar='FILE',
+                        help='JSON-список файлов, которые не удалось разобрать')
+    parser.add_argument('--engine', choices=Config.PARSE_ENGINES, default=Config.PARSE_ENGINE,
+                        help='Извлечение элементов: php - PHP-Parser, python - встроенный разбор '
+                             'с передачей сложных файлов PHP-Parser')
+    parser.add_argument('--no-prefilter', action='store_false', dest='prefilter', default=Config.PREFILTER,
+                        help='Разбирать все файлы, включая файлы без объявлений')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Количество параллельных PHP-воркеров')
+    parser.add_argument('--flush-every', type=int, default=0,
+                        help='Записывать found_*.json каждые N новых описаний (0 - только в конце)')
+    parser.add_argument('--cache-dir', default=Config.CACHE_DIR,
+                        help='Директория кэша результатов разбора')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Не использовать кэш результатов разбора и проверки окружения')
+    parser.add_argument('--cache-size', type=float, default=Config.CACHE_MAX_SIZE_MB,
+                        help='Максимальный размер кэша разбора, МБ')
+    parser.add_argument('--sort-buffer', type=int, default=Config.SORT_BUFFER_ITEMS,
+                        help='Элементов отчета в памяти до сброса на диск при сортировке')
+    parser.add_argument('--extensions', default=','.join(Config.PHP_EXTENSIONS),
+                        help='Расширения анализируемых файлов через запятую')
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help='Анализировать только файлы, подходящие под шаблон (можно повторять)')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help='Пропускать файлы и директории по шаблону, например vendor (можно повторять)')
+    parser.add_argument('--gitignore', action='store_true',
+                        help='Учитывать правила .gitignore')
+    parser.add_argument('--follow-symlinks', action='store_true',
+                        help='Заходить в директории по символическим ссылкам')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Выводить только предупреждения и ошибки')
+    parser.add_argument('-v', '--verbose', action='count', default=0,
+                        help='Подробный вывод по каждому файлу (-vv - по каждому элементу)')
     parser.add_argument('--debug', action='store_true',
                         help='Включить отладочный вывод')
+    parser.add_argument('--log-json', metavar='FILE',
+                        help='Дописывать события в машиночитаемый журнал (JSON lines)')
+
+
+def shard_spec(value: str):
+    """Тип аргумента --shard: K/N"""
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
 
-    args = parser.parse_args()
+
+def prepare_environment(args: argparse.Namespace) -> Path:
+    """Проверяет окружение, применяет конфигурацию и возвращает анализируемую директорию"""
+    verbosity = 2 if args.debug else (-1 if args.quiet else args.verbose)
+    configure_logging(verbosity, args.log_json)
 
     # Обновляем конфигурацию
     Config.INCLUDE_LINE_NUMBERS = args.include_lines
     Config.DESCRIPTIONS_DIR = args.descriptions
 
-    # Проверяем PHP
-    if not check_php_environment():
-        print("Ошибка: PHP не установлен или не доступен")
-        exit(1)
+    # Проверяем PHP (результат сохраняется в директории кэша до смены исполняемого файла PHP)
+    php_available = EnvironmentProbe(None if args.no_cache else args.cache_dir).php_available()
+    if not php_available:
+        if args.engine != 'python':
+            logger.error("Ошибка: PHP не установлен или не доступен")
+            exit(1)
+        logger.warning("Предупреждение: PHP не найден, файлы, которые не разберет встроенный разбор, "
+                       "будут пропущены")
 
     # Устанавливаем PHP-Parser если нужно
-    if not args.skip_composer and not Path('vendor/nikic/php-parser').exists():
-        print("Установка PHP-Parser...")
+    if php_available and not args.skip_composer and not Path('vendor/nikic/php-parser').exists():
+        logger.info("Установка PHP-Parser...")
         try:
             subprocess.run(['composer', 'require', 'nikic/php-parser'], check=True)
         except subprocess.CalledProcessError as e:
-            print(f"Ошибка при установке PHP-Parser: {e}")
+            logger.error("Ошибка при установке PHP-Parser: %s", e)
             exit(1)
 
+    writer = PHPAnalyzer.WRITERS[args.output_format]
+    if args.compress and not writer.SUPPORTS_COMPRESSION:
+        logger.error("Ошибка: Формат %s не поддерживает сжатие", args.output_format)
+        exit(1)
+    if args.output is None:
+        args.output = writer.default_filename('php_analysis', args.compress)
+
+    if args.description_store and not Path(args.description_store).is_file():
+        logger.error("Ошибка: Хранилище описаний %s не найдено", args.description_store)
+        exit(1)
+
     # Проверяем существование директории
     directory_path = Path(args.directory)
     if not directory_path.exists():
-        print(f"Ошибка: Директория {args.directory} не существует")
+        logger.error("Ошибка: Директория %s не существует", args.directory)
         exit(1)
 
     if args.debug:
-        print(f"Анализируемая директория: {directory_path.absolute()}")
-        php_files = list(directory_path.rglob('*.php'))
-        print(f"Найдено PHP файлов: {len(php_files)}")
+        logger.debug("Анализируемая директория: %s", directory_path.absolute())
+        php_files = list(FileDiscovery(directory_path, **get_discovery_options(args)))
+        logger.debug("Найдено PHP файлов: %d", len(php_files))
         if php_files:
-            print("Первые 10 файлов:")
+            logger.debug("Первые 10 файлов:")
             for file in php_files[:10]:
-                print(f"  - {file}")
+                logger.debug("  - %s", file)
 
-    # Запускаем анализ
-    analyzer = PHPAnalyzer(
+    return directory_path
+
+
+def get_discovery_options(args: argparse.Namespace) -> dict:
+    """Собирает параметры обхода файлов из аргументов"""
+    return {
+        'extensions': [ext.strip() for ext in args.extensions.split(',') if ext.strip()],
+        'include': args.include,
+        'exclude': list(Config.DEFAULT_EXCLUDES) + args.exclude,
+        'use_gitignore': args.gitignore,
+        'follow_symlinks': args.follow_symlinks,
+    }
+
+
+def create_analyzer(args: argparse.Namespace) -> PHPAnalyzer:
+    """Создает анализатор по аргументам командной строки"""
+    return PHPAnalyzer(
         descriptions_dir=args.descriptions,
         exact_match=args.exact_match,
         full_names=args.full_names,
-        debug=args.debug  # Добавляем debug флаг
+        debug=args.debug,  # Добавляем debug флаг
+        timeout=args.timeout,
+        jobs=args.jobs,
+        flush_every=args.flush_every,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size_mb=args.cache_size,
+        sort_buffer=args.sort_buffer,
+        description_store=args.description_store,
+        description_snapshot=not args.no_description_snapshot,
+        output_format=args.output_format,
+        compression=args.compress,
+        engine=args.engine,
+        prefilter=args.prefilter,
+        memory_limit_mb=args.memory_limit,
+        recycle_files=args.recycle_files,
+        recycle_rss_mb=args.recycle_rss,
+        retry_quarantined=args.retry_quarantined,
+        failure_report=args.failure_report,
+        **get_discovery_options(args)
+    )
+
+
+def run_analysis(argv: list):
+    """Однократный анализ директории"""
+    parser = argparse.ArgumentParser(
+        description='Анализатор PHP-файлов с использованием AST парсера',
+        epilog='Команды: watch - следить за изменениями и обновлять отчет (python main.py watch --help), '
+               'import-descriptions - импортировать словари описаний в SQLite-хранилище, '
+               'merge - объединить результаты запусков с --shard',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    add_analysis_arguments(parser)
+    parser.add_argument('--since', metavar='REV',
+                        help='Обновить существующий отчет, проанализировав только файлы, измененные с ревизии git')
+    parser.add_argument('--changed-files-from', metavar='FILE',
+                        help='Обновить существующий отчет по списку измененных файлов (по одному на строку)')
+    parser.add_argument('--shard', type=shard_spec, metavar='K/N',
+                        help='Анализировать только K-ю из N частей файлов (по хэшу пути) и сохранить '
+                             'частичный результат для команды merge')
+    parser.add_argument('--shard-dir', default=Config.SHARD_DIR, metavar='DIR',
+                        help='Директория частичных результатов шардов')
+    parser.add_argument('--profile', action='store_true',
+                        help='Вывести время по фазам (p50/p95/max) и 20 самых медленных файлов')
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help='Сохранить дамп cProfile (pstats) основного потока в файл')
+
+    args = parser.parse_args(argv)
+    if args.shard and (args.since or args.changed_files_from):
+        parser.error("--shard нельзя совмещать с --since и --changed-files-from")
+    directory_path = prepare_environment(args)
+
+    profiler.enabled = args.profile
+    profile = cProfile.Profile() if args.profile_out else None
+    if profile is not None:
+        profile.enable()
+    try:
+        # Запускаем анализ
+        with create_analyzer(args) as analyzer:
+            if args.since or args.changed_files_from:
+                try:
+                    if args.since:
+                        changed = git_changed_files(directory_path, args.since)
+                    else:
+                        changed = read_changed_files(args.changed_files_from, directory_path)
+                except (subprocess.CalledProcessError, OSError) as e:
+                    logger.error("Ошибка получения списка измененных файлов: %s", e)
+                    exit(1)
+                analyzer.patch_report(args.directory, args.output, changed)
+            elif args.shard:
+                analyzer.analyze_shard(args.directory, args.output, args.shard, args.shard_dir)
+            else:
+                analyzer.analyze_directory(args.directory, args.output)
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(args.profile_out)
+            logger.info("Дамп cProfile сохранен в %s", args.profile_out)
+
+    if args.profile:
+        profiler.print_report()
+
+
+def run_watch(argv: list):
+    """Слежение за PHP-файлами и описаниями с обновлением отчета"""
+    parser = argparse.ArgumentParser(
+        prog='main.py watch',
+        description='Следит за PHP-файлами и файлами описаний и перезаписывает отчет после изменений',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    add_analysis_arguments(parser)
+    parser.add_argument('--interval', type=float, default=Config.WATCH_INTERVAL,
+                        help='Интервал опроса файлов без inotify, секунд')
+    parser.add_argument('--polling', action='store_true',
+                        help='Использовать опрос файлов вместо inotify')
+
+    args = parser.parse_args(argv)
+    directory_path = prepare_environment(args)
+
+    watcher = ReportWatcher(create_analyzer(args), directory_path, args.output,
+                            interval=args.interval, use_inotify=not args.polling)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logger.info("\nОстановка слежения")
+    finally:
+        watcher.close()
+
+
+def run_import_descriptions(argv: list):
+    """Импорт JSON-словарей описаний в SQLite-хранилище"""
+    parser = argparse.ArgumentParser(
+        prog='main.py import-descriptions',
+        description='Импортирует словари описаний (все три формата JSON) в SQLite-хранилище',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    analyzer.analyze_directory(args.directory, args.output)
+    parser.add_argument('store', help='Файл SQLite-хранилища (создается при необходимости)')
+    parser.add_argument('--descriptions', default=Config.DESCRIPTIONS_DIR,
+                        help='Директория, из которой импортируются все исходные словари')
+    parser.add_argument('--file', action='append', default=[], metavar='TYPE=PATH',
+                        help='Импортировать только указанный файл для типа, например method=shared/methods.json '
+                             '(можно повторять)')
+    parser.add_argument('--replace', action='store_true',
+                        help='Удалить имеющиеся записи импортируемых типов, иначе новые записи добавляются в конец')
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    sources = []
+    for spec in args.file:
+        item_type, _, path = spec.partition('=')
+        if item_type not in DescriptionManager.SOURCE_FILES or not path:
+            parser.error(f"Некорректный --file {spec}: ожидается TYPE=PATH, TYPE одно из "
+                         f"{', '.join(DescriptionManager.SOURCE_FILES)}")
+        sources.append((item_type, Path(path)))
+    if not args.file:
+        sources = [(item_type, Path(args.descriptions) / filename)
+                   for item_type, filename in DescriptionManager.SOURCE_FILES.items()
+                   if (Path(args.descriptions) / filename).exists()]
+
+    store = DescriptionStore(args.store, readonly=False)
+    try:
+        cleared = set()
+        for item_type, path in sources:
+            replace = args.replace and item_type not in cleared
+            cleared.add(item_type)
+            count = store.import_items(item_type, DescriptionManager.load_json_file(path), replace=replace)
+            logger.info("%s: импортировано %d записей из %s", item_type, count, path)
+        for item_type in DescriptionManager.SOURCE_FILES:
+            logger.info("  %s: %d записей в хранилище", item_type, store.count(item_type))
+    finally:
+        store.close()
+
+
+def run_merge(argv: list):
+    """Объединение результатов запусков с --shard"""
+    parser = argparse.ArgumentParser(
+        prog='main.py merge',
+        description='Собирает из результатов всех шардов отчет, found_*.json, empty_*.json и статистику, '
+                    'как у запуска без --shard',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('shards', nargs='*', default=[Config.SHARD_DIR],
+                        help='Директории результатов шардов или директория, в которой они лежат')
+    parser.add_argument('--output',
+                        help='Файл отчета (по умолчанию - --output запуска шардов)')
+    parser.add_argument('--descriptions',
+                        help='Директория описаний для found_- и empty_-файлов (по умолчанию - как у шардов)')
+    parser.add_argument('--failure-report', default=Config.FAILURE_REPORT, metavar='FILE',
+                        help='JSON-список файлов, которые не удалось разобрать ни одному шарду')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Выводить только предупреждения и ошибки')
+    parser.add_argument('--log-json', metavar='FILE',
+                        help='Дописывать события в машиночитаемый журнал (JSON lines)')
+    args = parser.parse_args(argv)
+    configure_logging(-1 if args.quiet else 0, args.log_json)
+
+    try:
+        results = load_shard_results(args.shards)
+    except ShardError as e:
+        logger.error("Ошибка: %s", e)
+        exit(1)
+
+    # Отчет записывается в формате и с настройками, с которыми собраны шарды
+    first = results[0]
+    fingerprint = first['fingerprint']
+    Config.INCLUDE_LINE_NUMBERS = fingerprint['include_lines']
+    Config.DESCRIPTIONS_DIR = args.descriptions or first['descriptions']
+    merger = ShardMerger(results, Config.DESCRIPTIONS_DIR, failure_report=args.failure_report)
+    merger.merge(args.output or first['output'])
+
+
+COMMANDS = {
+    'watch': run_watch,
+    'import-descriptions': run_import_descriptions,
+    'merge': run_merge,
+}
+
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+    else:
+        run_analysis(argv)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -18,7 +18,7 @@ class ElementVisitor extends NodeVisitorAbstract {
             $this->elements[] = [
                 'type' => 'class',
                 'name' => $this->currentClass,
-                'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                'doc' => $this->docComment($node),
                 'startLine' => $node->getStartLine()
             ];
         }
@@ -27,7 +27,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                 'type' => 'method',
                 'name' => $this->currentClass . '::' . $node->name->toString(),
                 'short_name' => $node->name->toString(),
-                'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                'doc' => $this->docComment($node),
                 'startLine' => $node->getStartLine()
             ];
             $this->inFunction = true;
@@ -38,7 +38,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                     'type' => 'property',
                     'name' => $this->currentClass . '::$' . $prop->name->toString(),
                     'short_name' => $prop->name->toString(),
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -49,7 +49,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                     'type' => 'class_constant',
                     'name' => $this->currentClass . '::' . $const->name->toString(),
                     'short_name' => $const->name->toString(),
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -58,7 +58,7 @@ class ElementVisitor extends NodeVisitorAbstract {
             $this->elements[] = [
                 'type' => 'function',
                 'name' => $node->name->toString(),
-                'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                'doc' => $this->docComment($node),
                 'startLine' => $node->getStartLine()
             ];
             $this->inFunction = true;
@@ -69,7 +69,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                 $this->elements[] = [
                     'type' => 'variable',
                     'name' => '$' . $varName,
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -79,7 +79,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                 $this->elements[] = [
                     'type' => 'constant',
                     'name' => $const->name->toString(),
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -95,66 +95,119 @@ class ElementVisitor extends NodeVisitorAbstract {
         }
     }
 
-    private function cleanComment(string $comment): string {
-        // Удаляем открывающие и закрывающие теги комментариев PHP
-        $comment = preg_replace('/^\/\*\*|\*\/$/', '', $comment);
-        
-        $lines = explode("\n", $comment);
-        $result = [];
-        
-        foreach ($lines as $line) {
-            $line = trim($line);
-            
-            // Удаляем начальные звездочки и пробелы
-            if (str_starts_with($line, '*')) {
-                $line = substr($line, 1);
-            }
-            
-            $line = trim($line);
-            
-            // Пропускаем пустые строки и аннотации
-            if (!$line || str_starts_with($line, '@')) {
-                continue;
-            }
-            
-            $result[] = $line;
-        }
-        
-        $cleanText = implode(' ', $result);
-        
-        // Проверяем, содержит ли текст латинские символы
-        if (preg_match('/[a-zA-Z]/', $cleanText)) {
-            // Ищем первую точку в тексте
-            $firstDotPos = strpos($cleanText, '.');
-            
-            if ($firstDotPos !== false) {
-                // Обрезаем до первой точки (включая саму точку)
-                $cleanText = substr($cleanText, 0, $firstDotPos + 1);
-            } else {
-                // Если точки нет, ограничиваем 10 словами
-                $words = preg_split('/\s+/', $cleanText);
-                if (count($words) > 10) {
-                    $cleanText = implode(' ', array_slice($words, 0, 10)) . '...';
-                }
-            }
-        }
-        
-        return trim($cleanText);
+    /**
+     * Возвращает исходный текст DocBlock узла: описание из него получает
+     * анализатор и только для элементов, которых нет в JSON-словарях
+     */
+    private function docComment(Node $node): string {
+        $comment = $node->getDocComment();
+        return $comment ? $comment->getText() : '';
     }
 }
 
-$code = file_get_contents($argv[1]);
-$parser = (new ParserFactory())->createForHostVersion();
-$traverser = new NodeTraverser();
-$visitor = new ElementVisitor();
-$traverser->addVisitor($visitor);
+/**
+ * Извлекает элементы из PHP-кода
+ */
+function extractElements($parser, string $code): array {
+    $traverser = new NodeTraverser();
+    $visitor = new ElementVisitor();
+    $traverser->addVisitor($visitor);
 
-try {
     $stmts = $parser->parse($code);
     if ($stmts !== null) {
         $traverser->traverse($stmts);
     }
-    echo json_encode($visitor->elements);
+    return $visitor->elements;
+}
+
+// Версия протокола воркера и коды типов элементов (совпадают с PHPParser в Python)
+const PROTOCOL_VERSION = 3;
+const ELEMENT_TYPES = [
+    'class' => 0,
+    'method' => 1,
+    'property' => 2,
+    'function' => 3,
+    'variable' => 4,
+    'constant' => 5,
+    'class_constant' => 6,
+];
+
+/**
+ * Упаковывает элементы по столбцам: имена полей передаются один раз на файл
+ */
+function packElements(array $elements): array {
+    $columns = ['type' => [], 'name' => [], 'short_name' => [], 'doc' => [], 'line' => []];
+    foreach ($elements as $element) {
+        $columns['type'][] = ELEMENT_TYPES[$element['type']];
+        $columns['name'][] = $element['name'];
+        $columns['short_name'][] = $element['short_name'] ?? '';
+        $columns['doc'][] = $element['doc'];
+        $columns['line'][] = $element['startLine'];
+    }
+    return $columns;
+}
+
+/**
+ * Обрабатывает один запрос воркера и возвращает ответ
+ */
+function handleRequest($parser, array $request): array {
+    $path = (string)($request['path'] ?? '');
+    $response = ['v' => PROTOCOL_VERSION, 'elements' => packElements([]), 'error' => null];
+
+    try {
+        $code = array_key_exists('code', $request) ? $request['code'] : @file_get_contents($path);
+        if ($code === false || $code === null) {
+            $response['error'] = "Cannot read {$path}";
+        } else {
+            $response['elements'] = packElements(extractElements($parser, $code));
+        }
+    } catch (Error $error) {
+        $response['error'] = "Parse error in {$path}: {$error->getMessage()}";
+    } catch (Throwable $error) {
+        $response['error'] = "Failure in {$path}: {$error->getMessage()}";
+    }
+
+    return $response;
+}
+
+$parser = (new ParserFactory())->createForHostVersion();
+
+if (($argv[1] ?? '') === '--worker') {
+    // Режим постоянного воркера: один JSON-запрос на строку stdin,
+    // ответ - строка с длиной в байтах и JSON-документ этой длины
+    // с элементами по столбцам (см. packElements)
+    while (($line = fgets(STDIN)) !== false) {
+        $line = trim($line);
+        if ($line === '') {
+            continue;
+        }
+
+        $request = json_decode($line, true);
+        $response = is_array($request)
+            ? handleRequest($parser, $request)
+            : ['v' => PROTOCOL_VERSION, 'elements' => packElements([]),
+               'error' => 'Invalid request: ' . json_last_error_msg()];
+
+        // Кириллица в описаниях передается байтами UTF-8, а не шестибайтовыми \uXXXX
+        $payload = json_encode($response, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES);
+        if ($payload === false) {
+            $payload = json_encode(
+                ['v' => PROTOCOL_VERSION, 'elements' => packElements([]),
+                 'error' => 'JSON encode error: ' . json_last_error_msg()],
+                JSON_INVALID_UTF8_SUBSTITUTE
+            );
+        }
+
+        fwrite(STDOUT, strlen($payload) . "\n" . $payload);
+        fflush(STDOUT);
+    }
+    exit(0);
+}
+
+$code = file_get_contents($argv[1]);
+
+try {
+    echo json_encode(extractElements($parser, $code));
 } catch (Error $error) {
     file_put_contents('php://stderr', "Parse error in {$argv[1]}: {$error->getMessage()}\n");
     echo '[]';
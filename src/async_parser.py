@@ -0,0 +1,133 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Dict, List
+from .php_parser import PHPParser
+from .php_worker import PHPWorker, PHPWorkerError, PHPWorkerStartError, PHPWorkerTimeout
+from .report_item import Element
+
+
+class AsyncPHPWorker(PHPWorker):
+    """PHP-воркер для событийного цикла asyncio.
+
+    Протокол и правила перезапуска те же, что у PHPWorker, но процесс создается
+    через asyncio.create_subprocess_exec, а start, close, kill и request - корутины:
+    ожидание ответа не блокирует цикл. Прерванный запрос останавливает процесс,
+    чтобы его ответ не достался следующему запросу.
+    """
+
+    def is_alive(self) -> bool:
+        """Проверяет, запущен ли процесс воркера"""
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        """Запускает процесс воркера"""
+        await self.close()
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            raise PHPWorkerStartError(f"Не удалось запустить воркер: {e}")
+        self.served = 0
+        self.starts += 1
+
+    async def close(self):
+        """Останавливает процесс воркера"""
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=1)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def kill(self):
+        """Принудительно завершает процесс воркера"""
+        if self.is_alive():
+            self.process.kill()
+        await self.close()
+
+    async def request(self, payload: Dict) -> Dict:
+        """Отправляет запрос воркеру и возвращает декодированный ответ"""
+        line = (json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8')
+
+        if not self.is_alive():
+            await self.start()
+        try:
+            await self._send(line)
+        except OSError:
+            # Воркер упал между запросами - перезапускаем и повторяем отправку
+            await self.start()
+            try:
+                await self._send(line)
+            except OSError as e:
+                await self.kill()
+                raise PHPWorkerError(f"Не удалось отправить запрос воркеру: {e}")
+
+        try:
+            body = await asyncio.wait_for(self._read_response(), timeout=self.timeout or None)
+        except asyncio.TimeoutError:
+            await self.kill()
+            raise PHPWorkerTimeout(f"Нет ответа за {self.timeout} с")
+        except (PHPWorkerError, asyncio.CancelledError):
+            await self.kill()
+            raise
+
+        self.served += 1
+        if self._needs_recycle():
+            await self.close()
+            self.recycles += 1
+        return json.loads(body)
+
+    async def _send(self, line: bytes):
+        """Записывает строку запроса в stdin воркера"""
+        self.process.stdin.write(line)
+        await self.process.stdin.drain()
+
+    async def _read_response(self) -> bytes:
+        """Читает заголовок с длиной и тело ответа из stdout воркера"""
+        stdout = self.process.stdout
+        try:
+            header = await stdout.readline()
+        except ValueError:
+            raise PHPWorkerError("Некорректный заголовок ответа: слишком длинная строка")
+        if not header.endswith(b'\n'):
+            raise PHPWorkerError(f"Воркер неожиданно завершился (код {self.process.returncode})")
+        try:
+            size = int(header)
+        except ValueError:
+            raise PHPWorkerError(f"Некорректный заголовок ответа: {header.strip()[:200]!r}")
+        try:
+            return await stdout.readexactly(size)
+        except asyncio.IncompleteReadError:
+            raise PHPWorkerError(f"Воркер неожиданно завершился (код {self.process.returncode})")
+
+
+class AsyncPHPParser(PHPParser):
+    """PHPParser с воркером AsyncPHPWorker: parse_file и close - корутины"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        worker = self.worker
+        # Команда запуска с ограничением памяти - та же, что у синхронного воркера
+        self.worker = AsyncPHPWorker(timeout=worker.timeout, command=worker.command,
+                                     max_files=worker.max_files, max_rss_mb=worker.max_rss_mb)
+
+    async def parse_file(self, file_path: Path) -> List[Element]:
+        """Парсит PHP-файл и возвращает элементы"""
+        self._begin_parse(file_path)
+        try:
+            response = await self.worker.request({'path': str(file_path)})
+            return self._read_response(file_path, response)
+        except self.PARSE_ERRORS as e:
+            return self._parse_failed(file_path, e)
+
+    async def close(self):
+        """Останавливает PHP-воркер"""
+        await self.worker.close()
@@ -0,0 +1,102 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Tuple, TypeVar
+from .async_parser import AsyncPHPParser
+from .log import VERBOSE, get_logger, log_event
+from .parser_pool import ParseFailure, ParserPool
+from .report_item import Element
+
+logger = get_logger('parser')
+
+T = TypeVar('T')
+
+
+class AsyncParserPool(ParserPool):
+    """Пул PHP-парсеров для событийного цикла asyncio.
+
+    Одновременно разбирается не больше jobs файлов, пары (файл, элементы)
+    выдаются в порядке завершения разбора. Предфильтр, кэш, карантин и разбор
+    одинакового содержимого - как у ParserPool. Встроенный разбор выполняется
+    в потоках, а обход файлов, чтение, предфильтр и обращения к кэшу - в отдельном
+    потоке пула по очереди, поэтому цикл событий ими не занят.
+    """
+
+    def __init__(self, jobs: int = 1, **options):
+        super().__init__(jobs=jobs, **options)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for parser in self.parsers:
+            self._idle.put_nowait(parser)
+        # Один поток: обращения к кэшу и счетчикам пула не пересекаются
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='async-parser-pool')
+
+    async def run_blocking(self, func: Callable[..., T], *args) -> T:
+        """Выполняет блокирующую функцию в потоке пула, по очереди с обходом и кэшем"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    @staticmethod
+    def _create_parser(**options) -> AsyncPHPParser:
+        """Создает парсер с асинхронным PHP-воркером"""
+        return AsyncPHPParser(**options)
+
+    async def parse_files(self, files: Iterable[Path]) -> AsyncIterator[Tuple[Path, List[Element]]]:
+        """Разбирает файлы и выдает пары (файл, элементы) по мере готовности"""
+        files = iter(files)
+        running = set()
+        try:
+            while True:
+                # Следующий файл берется из обхода, только когда есть свободное место
+                while len(running) < self.jobs:
+                    file_path = await self.run_blocking(next, files, None)
+                    if file_path is None:
+                        break
+                    key, elements = await self.run_blocking(self._lookup, file_path)
+                    if elements is None:
+                        running.add(asyncio.create_task(self._parse_and_store(file_path, key)))
+                    else:
+                        yield file_path, elements
+
+                if not running:
+                    return
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def close(self):
+        """Останавливает все PHP-воркеры и поток пула"""
+        await asyncio.gather(*(parser.close() for parser in self.parsers))
+        # Дожидаемся начатого обращения к кэшу, не занимая цикл событий
+        await asyncio.to_thread(self._executor.shutdown)
+
+    async def _parse_and_store(self, file_path: Path, key: Optional[str]) -> Tuple[Path, List[Element]]:
+        """Разбирает файл и сохраняет результат в кэш"""
+        elements, failure = await self._parse(file_path)
+        await self.run_blocking(self._store, key, elements, failure)
+        return file_path, elements
+
+    async def _parse(self, file_path: Path) -> Tuple[List[Element], Optional[ParseFailure]]:
+        """Разбирает файл свободным парсером из пула, возвращает элементы и сбой воркера"""
+        if self.extractor is not None:
+            elements = await asyncio.to_thread(self._extract, file_path)
+            if elements is not None:
+                return elements, None
+
+        parser = await self._idle.get()
+        try:
+            for attempt in range(1, self.attempts + 1):
+                if attempt > 1:
+                    # После сбоя воркер уже остановлен, повтор идет в новом процессе
+                    log_event(logger, VERBOSE, 'parse_retry', "  Повторный разбор %s, попытка %d",
+                              file_path, attempt, path=str(file_path), attempt=attempt)
+                elements = await parser.parse_file(file_path)
+                if parser.last_error is None:
+                    return elements, None
+                if parser.last_unavailable:
+                    return [], ParseFailure(file_path, parser.last_error, attempt, False)
+            return [], ParseFailure(file_path, parser.last_error, self.attempts, True)
+        finally:
+            self._idle.put_nowait(parser)
@@ -13,5 +13,45 @@ class Config:
     JSON_DESC_VARS = 'variables.json'
     JSON_DESC_CONST = 'constants.json'
     JSON_DESC_CLASS_CONST = 'class_constants.json'
+    # Скомпилированный снимок словарей в папке описаний
+    DESCRIPTIONS_SNAPSHOT = '.descriptions.snapshot'
 
-    PHP_PARSER_SCRIPT = 'php_ast_parser.php'
\ No newline at end of file
+    # Обход файлов
+    PHP_EXTENSIONS = ('.php',)
+    DEFAULT_EXCLUDES = ('.git',)
+
+    PHP_PARSER_SCRIPT = 'php_ast_parser.php'
+    PHP_BINARY = 'php'
+    # Максимальное время разбора одного файла воркером, секунд
+    PARSE_TIMEOUT = 60
+    # Ограничение памяти PHP-воркера (memory_limit), МБ; 0 - без ограничения
+    PARSE_MEMORY_LIMIT_MB = 512
+    # Воркер перезапускается после N файлов или при RSS больше M МБ (0 - без перезапуска)
+    WORKER_MAX_FILES = 5000
+    WORKER_MAX_RSS_MB = 256
+    # Попыток разбора файла при сбое воркера; после последней файл попадает в карантин
+    PARSE_ATTEMPTS = 2
+    # Отчет о файлах, которые не удалось разобрать
+    FAILURE_REPORT = 'parse_failures.json'
+    # Способ извлечения элементов: php - PHP-Parser в воркере, python - встроенный
+    # разбор с передачей PHP-воркеру файлов, которые он не разбирает уверенно
+    PARSE_ENGINES = ('php', 'python')
+    PARSE_ENGINE = 'php'
+    # Пропускать разбор файлов без лексем объявлений (class, function, const, $x =)
+    PREFILTER = True
+    # Разбирать одинаковое содержимое один раз (вендорные копии библиотек)
+    DEDUPLICATE = True
+    # Сколько последних разобранных содержимых держать в памяти для повторных копий
+    DEDUPLICATE_FILES = 2000
+
+    # Кэш результатов разбора
+    CACHE_DIR = '.php_analyzer_cache'
+    CACHE_MAX_SIZE_MB = 256
+
+    # Директория частичных результатов запусков с --shard для команды merge
+    SHARD_DIR = 'shards'
+
+    # Сколько элементов отчета держать в памяти до сброса отсортированного прогона на диск
+    SORT_BUFFER_ITEMS = 200000
+    # Интервал опроса файлов в режиме слежения без inotify, секунд
+    WATCH_INTERVAL = 0.5
@@ -1,27 +1,42 @@
 import csv
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Set
 from .config import Config
+from .incremental import read_report_items
+from .profiler import profiler
+from .report_item import ReportItem
+from .report_writer import ReportWriter, open_report
 
-class CSVWriter:
-    def __init__(self):
-        self.global_row_number = 1
+class CSVWriter(ReportWriter):
+    FORMAT = 'csv'
+    EXTENSION = '.csv'
 
-    def write_to_csv(self, items: List[Dict], output_path: str | Path):
+    def write_to_csv(self, items: List[ReportItem], output_path: str | Path):
         """Записывает данные в CSV файл"""
+        self.write_sorted(sorted(items, key=lambda x: (x.relative_path, x.line_number)), output_path)
+
+    @profiler.timed('csv_write')
+    def write_sorted(self, items: Iterable[ReportItem], output_path: str | Path):
+        """Построчно записывает уже упорядоченные элементы в CSV файл"""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.global_row_number = 1
 
-        with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with open_report(output_path, 'w', self.compression) as csvfile:
             headers = self._get_headers()
             writer = csv.writer(csvfile)
             writer.writerow(headers)
 
-            for item in sorted(items, key=lambda x: (x['relative_path'], x.get('line_number', 0))):
+            for item in items:
                 row = self._prepare_row(item)
                 writer.writerow(row)
                 self.global_row_number += 1
 
+    def read_items(self, report_path: str | Path, skip_paths: Set[str],
+                   type_mapping: Dict[str, str]) -> Iterator[ReportItem]:
+        """Читает строки существующего CSV-отчета как элементы, пропуская skip_paths"""
+        return read_report_items(report_path, skip_paths, type_mapping, self.compression)
+
     def _get_headers(self) -> List[str]:
         """Возвращает заголовки CSV"""
         headers = ['№', 'Относительный путь', '№ в классе', 'Наименование', 'Тип', 'Описание']
@@ -29,16 +44,16 @@ class CSVWriter:
             headers.append('Строка')
         return headers
 
-    def _prepare_row(self, item: Dict) -> List:
+    def _prepare_row(self, item: ReportItem) -> List:
         """Подготавливает строку для CSV"""
         row = [
             self.global_row_number,
-            item['relative_path'],
-            item['item_number'],
-            item['name'],
-            item['type_ru'],
-            item['description']
+            item.relative_path,
+            item.item_number,
+            item.name,
+            item.type_ru,
+            item.description
         ]
         if Config.INCLUDE_LINE_NUMBERS:
-            row.append(item.get('line_number', ''))
+            row.append(item.line_number)
         return row
\ No newline at end of file
@@ -0,0 +1,89 @@
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+
+class DescriptionIndex:
+    """Индексы поиска по списку описаний одного типа.
+
+    Строится один раз при загрузке и возвращает позицию первой подходящей
+    записи - так же, как последовательный перебор списка.
+    """
+
+    # Разделитель записей в общей строке like-шаблонов; в именах PHP не встречается
+    LIKE_SEPARATOR = '\x00'
+
+    def __init__(self, descriptions: List[Dict]):
+        self.descriptions = descriptions
+        # Полные имена с классом (Class::method) -> позиция первой записи
+        self.exact: Dict[str, int] = {}
+        # Имена без '::' - с ними сравнивается короткое имя элемента
+        self.short: Dict[str, int] = {}
+        # Имена в нижнем регистре для --partial-match
+        self.folded: Dict[str, int] = {}
+        # Записи с cond: like склеены в одну строку для поиска подстроки
+        self.like_text = ''
+        self.like_offsets: List[int] = []
+        self.like_positions: List[int] = []
+        self._build()
+
+    def _build(self):
+        """Заполняет индексы по списку описаний"""
+        like_names = []
+        offset = 0
+
+        for position, item in enumerate(self.descriptions):
+            item_name = item.get('name', '')
+            if not item_name or not isinstance(item_name, str):
+                continue
+
+            if item.get('cond') == 'like':
+                folded_name = item_name.lower()
+                like_names.append(folded_name)
+                self.like_offsets.append(offset)
+                self.like_positions.append(position)
+                offset += len(folded_name) + len(self.LIKE_SEPARATOR)
+                continue
+
+            target = self.exact if '::' in item_name else self.short
+            target.setdefault(item_name, position)
+            self.folded.setdefault(item_name.lower(), position)
+
+        self.like_text = self.LIKE_SEPARATOR.join(like_names)
+
+    def find(self, compare_names: Iterable[str], exact_match: bool = True) -> Optional[int]:
+        """Возвращает позицию первой записи, совпадающей с любым из имен"""
+        best = None
+
+        for compare_name in compare_names:
+            if not compare_name:
+                continue
+
+            if exact_match:
+                index = self.exact if '::' in compare_name else self.short
+                position = index.get(compare_name)
+            else:
+                position = self.folded.get(compare_name.lower())
+            if position is not None and (best is None or position < best):
+                best = position
+
+            position = self._find_like(compare_name.lower())
+            if position is not None and (best is None or position < best):
+                best = position
+
+        return best
+
+    def description(self, position: int):
+        """Возвращает описание записи по позиции"""
+        return self.descriptions[position].get('desc', '')
+
+    def _find_like(self, needle: str) -> Optional[int]:
+        """Ищет первую like-запись, имя которой содержит needle"""
+        if not self.like_text or self.LIKE_SEPARATOR in needle:
+            return None
+
+        # Записи склеены в исходном порядке, поэтому первое вхождение
+        # принадлежит записи с наименьшей позицией
+        offset = self.like_text.find(needle)
+        if offset < 0:
+            return None
+        return self.like_positions[bisect_right(self.like_offsets, offset) - 1]
@@ -2,21 +2,72 @@ import json
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
 from .config import Config
+from .description_index import DescriptionIndex
+from .description_snapshot import DescriptionSnapshot
+from .description_store import DescriptionStore
+from .incremental import describe_files
+from .log import VERBOSE, get_logger
+from .profiler import profiler
+from .utils import atomic_write_json
+
+logger = get_logger('descriptions')
 
 
 class DescriptionManager:
-    def __init__(self, descriptions_dir: str = Config.DESCRIPTIONS_DIR, debug: bool = False):
+    # Файлы словарей описаний по типам элементов
+    SOURCE_FILES = {
+        'class': Config.JSON_DESC_CLASSES,
+        'method': Config.JSON_DESC_METHODS,
+        'property': Config.JSON_DESC_PROPS,
+        'function': Config.JSON_DESC_FUNC,
+        'variable': Config.JSON_DESC_VARS,
+        'constant': Config.JSON_DESC_CONST,
+        'class_constant': Config.JSON_DESC_CLASS_CONST,
+    }
+
+    FOUND_FILENAMES = {
+        'class': 'found_classes.json',
+        'method': 'found_methods.json',
+        'property': 'found_properties.json',
+        'function': 'found_functions.json',
+        'variable': 'found_variables.json',
+        'constant': 'found_constants.json',
+        'class_constant': 'found_constants.json'  # Константы классов тоже в constants
+    }
+
+    def __init__(self, descriptions_dir: str = Config.DESCRIPTIONS_DIR, debug: bool = False,
+                 flush_every: int = 0, store_path: Optional[str | Path] = None, use_snapshot: bool = True):
         self.descriptions_dir = Path(descriptions_dir)
         self.debug = debug
+        # Словари из SQLite-хранилища вместо JSON-файлов descriptions_dir
+        self.store = DescriptionStore(store_path) if store_path else None
+        # Сбрасывать found_-файлы на диск каждые N новых описаний (0 - только в конце)
+        self.flush_every = flush_every
+        # Скомпилированный снимок словарей и индексов рядом с JSON-файлами
+        self.snapshot = None
+        if use_snapshot and self.store is None:
+            self.snapshot = DescriptionSnapshot(self.descriptions_dir / Config.DESCRIPTIONS_SNAPSHOT,
+                                                self.descriptions_dir, self.SOURCE_FILES.values())
         # Создаем папку descriptions если она не существует
         if not self.descriptions_dir.exists():
-            print(f"Создаем папку описаний: {self.descriptions_dir.absolute()}")
+            logger.info("Создаем папку описаний: %s", self.descriptions_dir.absolute())
             self.descriptions_dir.mkdir(parents=True, exist_ok=True)
 
-        self.descriptions = self._load_all_descriptions()
+        with profiler.span('load_descriptions'):
+            if self.store is not None:
+                # Записи остаются в базе, поиск выполняется индексированными запросами
+                self.descriptions = {item_type: [] for item_type in self.SOURCE_FILES}
+                self.indexes = {item_type: self.store.index(item_type) for item_type in self.SOURCE_FILES}
+            else:
+                self.descriptions, self.indexes = self._load_compiled_descriptions()
         self.missing_descriptions: Dict[str, Set[str]] = {}
         self.empty_descriptions: Dict[str, Set[str]] = {}
         self.found_descriptions: Dict[str, Set[str]] = {}
+        # Буфер найденных описаний по found_-файлам и уже известные в них имена
+        self.pending_found: Dict[str, List[Dict]] = {}
+        self._found_data: Dict[str, List[Dict]] = {}
+        self._found_names: Dict[str, Set[str]] = {}
+        self._pending_found_count = 0
         self._initialize_sets()
 
     def _initialize_sets(self):
@@ -26,16 +77,29 @@ class DescriptionManager:
             self.empty_descriptions[key] = set()
             self.found_descriptions[key] = set()  # статистика по найденным описаниям
 
+    def _load_compiled_descriptions(self) -> Tuple[Dict[str, List[Dict]], Dict[str, DescriptionIndex]]:
+        """Загружает описания и индексы из снимка или собирает их из JSON-файлов"""
+        key = None
+        if self.snapshot is not None:
+            # Ключ снимается до чтения файлов: изменение во время загрузки даст другой ключ
+            key = self.snapshot.source_key()
+            compiled = self.snapshot.load(key)
+            if compiled is not None:
+                logger.debug("Описания загружены из снимка %s", self.snapshot.path)
+                return compiled
+
+        descriptions = self._load_all_descriptions()
+        # Индексы строятся один раз, чтобы не перебирать списки для каждого элемента
+        indexes = {item_type: DescriptionIndex(items) for item_type, items in descriptions.items()}
+        if self.snapshot is not None:
+            self.snapshot.save(key, descriptions, indexes)
+        return descriptions, indexes
+
     def _load_all_descriptions(self) -> Dict[str, List[Dict]]:
         """Загружает все файлы описаний"""
         return {
-            'class': self._load_description_file(Config.JSON_DESC_CLASSES),
-            'method': self._load_description_file(Config.JSON_DESC_METHODS),
-            'property': self._load_description_file(Config.JSON_DESC_PROPS),
-            'function': self._load_description_file(Config.JSON_DESC_FUNC),
-            'variable': self._load_description_file(Config.JSON_DESC_VARS),
-            'constant': self._load_description_file(Config.JSON_DESC_CONST),
-            'class_constant': self._load_description_file(Config.JSON_DESC_CLASS_CONST),
+            item_type: self._load_description_file(filename)
+            for item_type, filename in self.SOURCE_FILES.items()
         }
 
     def _load_description_file(self, filename: str) -> List[Dict]:
@@ -48,11 +112,24 @@ class DescriptionManager:
             return self._load_different_file_types(file_path)
 
         except (json.JSONDecodeError, OSError) as e:
-            print(f"Ошибка загрузки файла {file_path}: {e}")
+            logger.warning("Ошибка загрузки файла %s: %s", file_path, e)
             return []
 
+    def reload(self, item_type: str):
+        """Перечитывает файл описаний одного типа и перестраивает его индекс"""
+        if self.store is not None:
+            # Хранилище читается запросами, перечитывать нечего
+            return
+        self.descriptions[item_type] = self._load_description_file(self.SOURCE_FILES[item_type])
+        self.indexes[item_type] = DescriptionIndex(self.descriptions[item_type])
+
     def _load_different_file_types(self, file_path: Path) -> List[Dict]:
         """Загружает JSON-файл из конкретного пути"""
+        return self.load_json_file(file_path)
+
+    @staticmethod
+    def load_json_file(file_path: str | Path) -> List[Dict]:
+        """Загружает словарь описаний в любом из трех форматов и приводит к списку {name, desc}"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -61,12 +138,24 @@ class DescriptionManager:
             if not data:
                 return []
 
+            # Формат определяется за один проход по списку
+            named = single = isinstance(data, list)
+            if named:
+                for item in data:
+                    if not isinstance(item, dict):
+                        named = single = False
+                        break
+                    named = named and 'name' in item
+                    single = single and len(item) == 1
+                    if not named and not single:
+                        break
+
             # Формат 1: [{"name": "value", "desc": "description"}]
-            if isinstance(data, list) and all(isinstance(item, dict) and 'name' in item for item in data):
+            if named:
                 return data
 
             # Формат 2: [{"key": "description"}, {"key2": "description2"}]
-            elif isinstance(data, list) and all(isinstance(item, dict) and len(item) == 1 for item in data):
+            elif single:
                 converted_data = []
                 for item in data:
                     for key, value in item.items():
@@ -83,9 +172,10 @@ class DescriptionManager:
             return []
 
         except (json.JSONDecodeError, OSError) as e:
-            print(f"Ошибка загрузки файла {file_path}: {e}")
+            logger.warning("Ошибка загрузки файла %s: %s", file_path, e)
             return []
 
+    @profiler.timed('description_lookup')
     def get_description(self, item_type: str, name: str, short_name: str = '',
                         exact_match: bool = True, full_names: bool = True) -> Tuple[Optional[str], bool]:
         """Получает описание для элемента"""
@@ -94,90 +184,94 @@ class DescriptionManager:
         description = None
 
         if self.debug and len(descriptions) > 0:  # Теперь self.debug существует
-            print(f"Поиск описания для: {item_type} '{name}' (short: '{short_name}')")
-            print(f"  Доступно описаний: {len(descriptions)}")
+            logger.debug("Поиск описания для: %s '%s' (short: '%s')", item_type, name, short_name)
+            logger.debug("  Доступно описаний: %d", len(descriptions))
             if len(descriptions) <= 10:  # Показываем первые 10 для отладки
                 for i, desc in enumerate(descriptions[:10]):
-                    print(f"    {i}: {desc.get('name', 'N/A')}")
+                    logger.debug("    %d: %s", i, desc.get('name', 'N/A'))
 
         search_name, compare_names = self._prepare_search_names(item_type, name, short_name, full_names, exact_match)
 
-        for item in descriptions:
-            item_name = item.get('name', '')
-            if not item_name:
-                continue
-
-            item_desc = item.get('desc', '')
-
-            if self._matches(item, item_name, compare_names, exact_match):
-                description = item_desc
-                found = True
-                break
+        index = self.indexes.get(item_type)
+        position = index.find(compare_names, exact_match) if index else None
+        if position is not None:
+            description = index.description(position)
+            found = True
 
         self._update_statistics(item_type, name, found, description)
 
         return description, found
 
-    def _save_found_description(self, item_type: str, name: str, description: str):
-        """Сохраняет найденное описание в файл с префиксом found_"""
+    def _save_found_description(self, item_type: str, name: str, description: str) -> bool:
+        """Запоминает найденное описание для файла с префиксом found_, True - если оно новое"""
         if not description.strip():
-            return  # Не сохраняем пустые описания
+            return False  # Не сохраняем пустые описания
 
         # Определяем файл для сохранения
-        filename_map = {
-            'class': 'found_classes.json',
-            'method': 'found_methods.json',
-            'property': 'found_properties.json',
-            'function': 'found_functions.json',
-            'variable': 'found_variables.json',
-            'constant': 'found_constants.json',
-            'class_constant': 'found_constants.json'  # Константы классов тоже в constants
-        }
-
-        filename = filename_map.get(item_type)
+        filename = self.FOUND_FILENAMES.get(item_type)
         if not filename:
-            return
-
-        file_path = self.descriptions_dir / filename
-
-        #   existing_data = self._load_found_description_file(filename)
-            # Загружаем существующие данные
-        try:
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            else:
-                existing_data = []
-        except:
-            existing_data = []
+            return False
 
+        # Для методов, свойств и констант классов сохраняем полное имя с классом
+        save_name = name
 
-        # Подготавливаем имя для сохранения
-        if item_type in ['method', 'property', 'class_constant'] and '::' in name:
-            # Для методов, свойств и констант классов сохраняем полное имя с классом
-            save_name = name
-        else:
-            # Для остальных сохраняем как есть
-            save_name = name
+        # Проверяем, есть ли уже такое описание в файле или в буфере
+        existing_names = self._get_found_names(filename)
+        if save_name in existing_names:
+            return False
 
-        # Проверяем, есть ли уже такое описание
-        existing_names = {item['name'] for item in existing_data}
+        existing_names.add(save_name)
+        self.pending_found.setdefault(filename, []).append({'name': save_name, 'desc': description})
+        self._pending_found_count += 1
+        logger.debug("  Сохранено найденное описание: %s '%s'", item_type, save_name)
+        # Здесь добавляем в статистику найденных описаний
+        if item_type not in self.found_descriptions:
+            self.found_descriptions[item_type] = set()
+        self.found_descriptions[item_type].add(save_name)
+
+        if self.flush_every and self._pending_found_count >= self.flush_every:
+            self.flush_found_descriptions()
+        return True
+
+    def _get_found_names(self, filename: str) -> Set[str]:
+        """Возвращает имена из found_-файла, загружая его один раз за запуск"""
+        if filename not in self._found_data:
+            file_path = self.descriptions_dir / filename
+            try:
+                if file_path.exists():
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        existing_data = json.load(f)
+                else:
+                    existing_data = []
+            except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+                existing_data = []
 
-        if save_name not in existing_names:
-            new_item = {'name': save_name, 'desc': description}
-            updated_data = existing_data + [new_item]
+            if not isinstance(existing_data, list):
+                existing_data = []
+            self._found_data[filename] = existing_data
+            self._found_names[filename] = {
+                item['name'] for item in existing_data if isinstance(item, dict) and 'name' in item
+            }
+        return self._found_names[filename]
+
+    @profiler.timed('found_write')
+    def flush_found_descriptions(self):
+        """Записывает накопленные найденные описания в found_-файлы"""
+        for filename, new_items in self.pending_found.items():
+            if not new_items:
+                continue
 
+            file_path = self.descriptions_dir / filename
+            updated_data = self._found_data[filename] + new_items
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(updated_data, f, ensure_ascii=False, indent=2)
-                print(f"  Сохранено найденное описание: {item_type} '{save_name}'")
-                # Здесь добавляем в статистику найденных описаний
-                if item_type not in self.found_descriptions:
-                    self.found_descriptions[item_type] = set()
-                self.found_descriptions[item_type].add(save_name)
+                atomic_write_json(file_path, updated_data)
+                self._found_data[filename] = updated_data
+            except OSError as e:
+                logger.warning("  Ошибка сохранения найденных описаний в %s: %s", file_path, e)
+                continue
+            new_items.clear()
 
-            except Exception as e:
-                print(f"  Ошибка сохранения найденного описания: {e}")
+        self._pending_found_count = sum(len(items) for items in self.pending_found.values())
 
     def _load_found_description_file(self, filename: str) -> List[Dict]:
         """Загружает файл с найденными описаниями"""
@@ -192,7 +286,7 @@ class DescriptionManager:
             return self._load_different_file_types(file_path)
 
         except (json.JSONDecodeError, OSError) as e:
-            print(f"Ошибка загрузки файла {file_path}: {e}")
+            logger.warning("Ошибка загрузки файла %s: %s", file_path, e)
             return []
 
     def _prepare_search_names(self, item_type: str, name: str, short_name: str,
@@ -257,21 +351,22 @@ class DescriptionManager:
         if not found:
             clean_name = name.lstrip(Config.VARIABLE_PREFIX) if item_type == 'variable' else name
             self.missing_descriptions[item_type].add(clean_name)
-            print(f"  Добавлено в missing: {clean_name}")
+            logger.debug("  Добавлено в missing: %s", clean_name)
 
         if not description:
             clean_name = name.lstrip(Config.VARIABLE_PREFIX) if item_type == 'variable' else name
             self.empty_descriptions[item_type].add(clean_name)
-            print(f"  Добавлено в empty: {clean_name}")
+            logger.debug("  Добавлено в empty: %s", clean_name)
 
+    @profiler.timed('empty_write')
     def save_empty_descriptions(self):
         """Сохраняет элементы с пустыми описаниями"""
-        print("\nСохранение пустых описаний...")
+        logger.log(VERBOSE, "\nСохранение пустых описаний...")
         for item_type, items in self.empty_descriptions.items():
             if not items:
                 continue
 
-            print(f"  {item_type}: {len(items)} элементов")
+            logger.log(VERBOSE, "  %s: %d элементов", item_type, len(items))
 
             # Специальная обработка для множественного числа
             if item_type == 'class':
@@ -285,26 +380,31 @@ class DescriptionManager:
             new_items = []
 
             for name in items:
+                if item_type == 'variable' and not name.startswith(Config.VARIABLE_PREFIX):
+                    name = Config.VARIABLE_PREFIX + name
                 if name not in existing_names:
-                    if item_type == 'variable' and not name.startswith(Config.VARIABLE_PREFIX):
-                        name = Config.VARIABLE_PREFIX + name
                     new_items.append({'name': name, 'desc': ''})
-                    print(f"    Новый: {name}")
+                    logger.debug("    Новый: %s", name)
 
             if new_items:
                 updated_data = existing_data + new_items
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(updated_data, f, ensure_ascii=False, indent=2)
-                print(f"  Сохранено {len(new_items)} новых элементов в {file_path}")
+                atomic_write_json(file_path, updated_data)
+                logger.log(VERBOSE, "  Сохранено %d новых элементов в %s", len(new_items), file_path)
+
+    def describe_sources(self) -> Dict[str, list]:
+        """Состояние источников описаний: файлов JSON или SQLite-хранилища"""
+        if self.store is not None:
+            return describe_files(self.store.path.parent, [self.store.path.name])
+        return describe_files(self.descriptions_dir, self.SOURCE_FILES.values())
 
     def print_found_statistics(self):
         """Выводит статистику найденных описаний"""
-        print("\nСтатистика найденных описаний:")
+        logger.info("\nСтатистика найденных описаний:")
         total_found = 0
         for item_type, items in self.found_descriptions.items():
             count = len(items)
             if count > 0:
-                print(f"  {item_type}: {count} описаний найдено")
+                logger.info("  %s: %d описаний найдено", item_type, count)
                 total_found += count
 
-        print(f"  Всего найдено: {total_found} описаний")
\ No newline at end of file
+        logger.info("  Всего найдено: %d описаний", total_found)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import gc
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from .description_index import DescriptionIndex
+from .log import get_logger
+
+logger = get_logger('descriptions')
+
+
+class DescriptionSnapshot:
+    """Скомпилированный снимок словарей описаний вместе с индексами поиска.
+
+    Ключ снимка - время изменения и размер каждого исходного JSON-файла:
+    если хотя бы один файл изменился, появился или удален, снимок не
+    используется и пересобирается при следующей загрузке.
+    """
+
+    # Меняется при изменении структуры снимка или DescriptionIndex
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str | Path, source_dir: str | Path, filenames: Iterable[str]):
+        self.path = Path(path)
+        self.source_dir = Path(source_dir)
+        self.filenames = sorted(set(filenames))
+
+    def source_key(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Время изменения и размер исходных файлов (None - файла нет)"""
+        key = {}
+        for filename in self.filenames:
+            try:
+                stat = (self.source_dir / filename).stat()
+            except OSError:
+                key[filename] = None
+                continue
+            key[filename] = (stat.st_mtime_ns, stat.st_size)
+        return key
+
+    def load(self, key: Dict) -> Optional[Tuple[Dict[str, List[Dict]], Dict[str, DescriptionIndex]]]:
+        """Возвращает описания и индексы из снимка, если он соответствует ключу"""
+        try:
+            with open(self.path, 'rb') as f:
+                # Заголовок записан отдельно, чтобы устаревший снимок не читать целиком
+                header = pickle.load(f)
+                if header != {'version': self.FORMAT_VERSION, 'key': key}:
+                    return None
+                # Сборщик мусора на сотнях тысяч создаваемых словарей только тратит время
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    descriptions, indexes = pickle.load(f)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Поврежденный или несовместимый снимок просто пересобирается
+            logger.debug("Снимок описаний %s не прочитан: %s", self.path, e)
+            return None
+        return descriptions, indexes
+
+    def save(self, key: Dict, descriptions: Dict[str, List[Dict]], indexes: Dict[str, DescriptionIndex]):
+        """Атомарно записывает снимок; ошибки записи не прерывают анализ"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix='.tmp', dir=self.path.parent)
+        except OSError as e:
+            logger.debug("Снимок описаний %s не сохранен: %s", self.path, e)
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'version': self.FORMAT_VERSION, 'key': key}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                # Индексы ссылаются на те же списки, pickle сохраняет их один раз
+                pickle.dump((descriptions, indexes), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug("Снимок описаний %s не сохранен: %s", self.path, e)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -0,0 +1,157 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+class DescriptionStore:
+    """Словари описаний в одном файле SQLite.
+
+    Записи каждого типа хранятся с позицией в исходном порядке, поэтому
+    поиск возвращает ту же запись, что и DescriptionIndex по спискам из JSON.
+    Анализатор открывает базу только на чтение, и ее могут одновременно
+    использовать несколько процессов.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: str | Path, readonly: bool = True):
+        self.path = Path(path)
+        self.readonly = readonly
+        if readonly:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Хранилище описаний не найдено: {self.path}")
+            # analyze_iter ищет описания в потоке асинхронного пула, запросы идут по очереди
+            self.connection = sqlite3.connect(f"{self.path.absolute().as_uri()}?mode=ro", uri=True,
+                                              check_same_thread=False)
+            self._check_schema()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self._create_schema()
+
+    def _create_schema(self):
+        """Создает таблицы и индексы"""
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS descriptions (
+                type TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                name_lower TEXT NOT NULL,
+                short_name TEXT NOT NULL,
+                desc,
+                is_like INTEGER NOT NULL,
+                PRIMARY KEY (type, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS descriptions_name
+                ON descriptions (type, name, position) WHERE is_like = 0;
+            CREATE INDEX IF NOT EXISTS descriptions_name_lower
+                ON descriptions (type, name_lower, position) WHERE is_like = 0;
+            CREATE INDEX IF NOT EXISTS descriptions_like
+                ON descriptions (type, position) WHERE is_like = 1;
+            -- Короткие имена ищутся по name вместе с полными, отдельный индекс только замедлял импорт
+            DROP INDEX IF EXISTS descriptions_short_name;
+        ''')
+        self.connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                ('schema_version', str(self.SCHEMA_VERSION)))
+        self.connection.commit()
+
+    def _check_schema(self):
+        """Проверяет версию схемы хранилища"""
+        try:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"{self.path} не является хранилищем описаний: {e}")
+        if row is None or int(row[0]) != self.SCHEMA_VERSION:
+            raise ValueError(f"Неподдерживаемая версия хранилища описаний {self.path}: {row and row[0]}")
+
+    def import_items(self, item_type: str, items: Iterable[Dict], replace: bool = False) -> int:
+        """Добавляет записи типа после уже импортированных, возвращает их количество"""
+        if replace:
+            self.connection.execute('DELETE FROM descriptions WHERE type = ?', (item_type,))
+        start = self.connection.execute(
+            'SELECT COALESCE(MAX(position) + 1, 0) FROM descriptions WHERE type = ?', (item_type,)
+        ).fetchone()[0]
+
+        rows = self._rows(item_type, items, start)
+        before = self.connection.total_changes
+        self.connection.executemany(
+            'INSERT INTO descriptions (type, position, name, name_lower, short_name, desc, is_like)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+        )
+        self.connection.commit()
+        return self.connection.total_changes - before
+
+    @staticmethod
+    def _rows(item_type: str, items: Iterable[Dict], start: int):
+        """Преобразует записи словаря в строки таблицы"""
+        position = start
+        for item in items:
+            name = item.get('name', '')
+            # Такие записи не находит и DescriptionIndex, но позиция сохраняет порядок
+            if name and isinstance(name, str):
+                yield (item_type, position, name, name.lower(), name.split('::')[-1],
+                       item.get('desc', ''), int(item.get('cond') == 'like'))
+            position += 1
+
+    def count(self, item_type: str) -> int:
+        """Количество записей типа"""
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM descriptions WHERE type = ?', (item_type,)).fetchone()[0]
+
+    def index(self, item_type: str) -> 'StoreIndex':
+        """Возвращает индекс поиска по записям одного типа"""
+        return StoreIndex(self, item_type)
+
+    def close(self):
+        """Закрывает базу"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class StoreIndex:
+    """Поиск по записям одного типа в DescriptionStore с интерфейсом DescriptionIndex"""
+
+    def __init__(self, store: DescriptionStore, item_type: str):
+        self.connection = store.connection
+        self.item_type = item_type
+        self.has_like = self.connection.execute(
+            'SELECT 1 FROM descriptions WHERE type = ? AND is_like = 1 LIMIT 1', (item_type,)
+        ).fetchone() is not None
+
+    def find(self, compare_names: Iterable[str], exact_match: bool = True) -> Optional[int]:
+        """Возвращает позицию первой записи, совпадающей с любым из имен"""
+        names = [name for name in compare_names if name]
+        if not names:
+            return None
+
+        placeholders = ', '.join('?' * len(names))
+        column = 'name' if exact_match else 'name_lower'
+        values = names if exact_match else [name.lower() for name in names]
+        best = self.connection.execute(
+            f'SELECT MIN(position) FROM descriptions WHERE type = ? AND is_like = 0 AND {column} IN ({placeholders})',
+            [self.item_type, *values]
+        ).fetchone()[0]
+
+        if self.has_like:
+            position = self._find_like([name.lower() for name in names])
+            if position is not None and (best is None or position < best):
+                best = position
+        return best
+
+    def description(self, position: int):
+        """Возвращает описание записи по позиции"""
+        row = self.connection.execute(
+            'SELECT desc FROM descriptions WHERE type = ? AND position = ?', (self.item_type, position)
+        ).fetchone()
+        return row[0] if row else ''
+
+    def _find_like(self, needles: List[str]) -> Optional[int]:
+        """Ищет первую like-запись, имя которой содержит любое из имен"""
+        condition = ' OR '.join('instr(name_lower, ?) > 0' for _ in needles)
+        return self.connection.execute(
+            f'SELECT MIN(position) FROM descriptions WHERE type = ? AND is_like = 1 AND ({condition})',
+            [self.item_type, *needles]
+        ).fetchone()[0]
@@ -0,0 +1,46 @@
+import re
+
+# Пробельные символы PHP trim() и \s в PCRE без модификатора /u
+_PHP_TRIM = ' \t\n\r\0\x0b'
+_COMMENT_TAGS = re.compile(r'^/\*\*|\*/$')
+_LATIN = re.compile(r'[a-zA-Z]')
+_WORD_SEPARATOR = re.compile(r'[ \t\n\x0b\x0c\r]+')
+
+
+def clean_comment(comment: str) -> str:
+    """Возвращает описание из текста DocBlock (как прежний ElementVisitor::cleanComment)"""
+    if not comment:
+        return ''
+
+    # Удаляем открывающие и закрывающие теги комментариев PHP
+    comment = _COMMENT_TAGS.sub('', comment)
+
+    result = []
+    for line in comment.split('\n'):
+        line = line.strip(_PHP_TRIM)
+
+        # Удаляем начальные звездочки и пробелы
+        if line.startswith('*'):
+            line = line[1:]
+
+        line = line.strip(_PHP_TRIM)
+
+        # Пропускаем пустые строки и аннотации ('0' в PHP тоже ложь)
+        if not line or line == '0' or line.startswith('@'):
+            continue
+
+        result.append(line)
+
+    clean_text = ' '.join(result)
+
+    # Для текста с латинскими символами оставляем первое предложение или 10 слов
+    if _LATIN.search(clean_text):
+        first_dot = clean_text.find('.')
+        if first_dot != -1:
+            clean_text = clean_text[:first_dot + 1]
+        else:
+            words = _WORD_SEPARATOR.split(clean_text)
+            if len(words) > 10:
+                clean_text = ' '.join(words[:10]) + '...'
+
+    return clean_text.strip(_PHP_TRIM)
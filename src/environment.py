@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+from .config import Config
+from .log import get_logger
+from .utils import atomic_write_json, check_php_environment, create_directory, get_php_parser_version
+
+logger = get_logger('environment')
+
+
+class EnvironmentProbe:
+    """Проверка PHP и PHP-Parser с сохранением результата между запусками.
+
+    Результат `php -v` хранится по пути и mtime исполняемого файла PHP, версия
+    PHP-Parser - по mtime vendor/composer/installed.json и composer.lock. Пока
+    они не меняются, при запуске не создается процесс PHP и не читается JSON
+    composer. cache_dir=None - только запоминание в пределах процесса.
+    """
+
+    FILENAME = 'environment.json'
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: Optional[str | Path] = Config.CACHE_DIR, php_binary: str = Config.PHP_BINARY,
+                 project_dir: str | Path = '.'):
+        self.path = None if cache_dir is None else Path(cache_dir) / self.FILENAME
+        self.php_binary = php_binary
+        self.project_dir = Path(project_dir)
+        self.hits = 0
+        self.misses = 0
+        self._entries = self._load()
+
+    def php_available(self) -> bool:
+        """Проверяет, что PHP установлен и запускается"""
+        binary = shutil.which(self.php_binary)
+        if binary is None:
+            return False
+        return self._cached('php', [binary, self._mtime(binary)], lambda: check_php_environment(binary))
+
+    def php_parser_version(self) -> str:
+        """Возвращает версию nikic/php-parser из vendor или composer.lock"""
+        key = [str(self.project_dir.absolute())] + [
+            self._mtime(self.project_dir / path) for path in ('vendor/composer/installed.json', 'composer.lock')]
+        return self._cached('php_parser', key, lambda: get_php_parser_version(self.project_dir))
+
+    def _cached(self, name: str, key: list, probe) -> Any:
+        """Возвращает сохраненный результат проверки или выполняет ее и сохраняет"""
+        entry = self._entries.get(name)
+        if entry is not None and entry.get('key') == key:
+            self.hits += 1
+            return entry['value']
+
+        self.misses += 1
+        value = probe()
+        self._entries[name] = {'key': key, 'value': value}
+        self._save()
+        return value
+
+    def _load(self) -> dict:
+        """Читает сохраненные результаты, при ошибке или другой версии формата - пустые"""
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('v') != self.FORMAT_VERSION:
+            return {}
+        entries = data.get('entries')
+        return entries if isinstance(entries, dict) else {}
+
+    def _save(self):
+        """Сохраняет результаты; ошибка записи не мешает анализу"""
+        if self.path is None:
+            return
+        try:
+            create_directory(self.path.parent)
+            atomic_write_json(self.path, {'v': self.FORMAT_VERSION, 'entries': self._entries})
+        except OSError as e:
+            logger.debug("Не удалось сохранить проверку окружения в %s: %s", self.path, e)
+
+    @staticmethod
+    def _mtime(path: str | Path) -> Optional[int]:
+        """Время изменения файла в наносекундах, None - файла нет"""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
@@ -0,0 +1,356 @@
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+from .php_tokenizer import COMMENT, DOC_COMMENT, NAME, OP, VARIABLE, UnsupportedSyntax, tokenize
+from .report_item import Element
+
+ACCESSORS = frozenset(('::', '->', '?->'))
+CLASS_MODIFIERS = frozenset(('abstract', 'final', 'readonly'))
+MEMBER_MODIFIERS = frozenset(('public', 'protected', 'private', 'static', 'abstract', 'final', 'readonly', 'var'))
+OPENING = frozenset(('(', '[', '{'))
+CLOSING = frozenset((')', ']', '}'))
+
+
+class _Token(NamedTuple):
+    """Значимая лексема с DocBlock, который PHP-Parser присоединил бы к узлу, начинающемуся с нее"""
+
+    kind: str
+    key: str  # имя в нижнем регистре или текст оператора
+    text: str
+    line: int
+    doc: str
+
+
+class FastExtractor:
+    """Извлечение элементов PHP-файла без PHP.
+
+    Повторяет правила ElementVisitor из php_ast_parser.php для простых файлов:
+    классы, методы, свойства, константы, функции и переменные верхнего уровня.
+    Конструкции, которые разбираются неуверенно (трейты, перечисления, атрибуты,
+    анонимные и вложенные классы, вложенные функции), вызывают UnsupportedSyntax -
+    такие файлы разбирает PHP-воркер. Синтаксис файла полностью не проверяется.
+    """
+
+    # Версия правил извлечения, входит в ключ кэша разбора
+    VERSION = 1
+
+    def extract_file(self, file_path: Path) -> List[Element]:
+        """Извлекает элементы из файла"""
+        try:
+            code = Path(file_path).read_bytes().decode('utf-8')
+        except UnicodeDecodeError:
+            raise UnsupportedSyntax('файл не в кодировке UTF-8')
+        return self.extract(code)
+
+    def extract(self, code: str) -> List[Element]:
+        """Извлекает элементы из PHP-кода в порядке обхода ElementVisitor"""
+        return _Extraction(code).run()
+
+
+class _Extraction:
+    """Разбор одного файла: объявления ищутся по значимым лексемам"""
+
+    def __init__(self, code: str):
+        self.tokens: List[_Token] = []
+        self.elements: List[Element] = []
+        self.pos = 0
+
+        # PHP-Parser берет последний DocBlock среди комментариев перед первой лексемой узла
+        doc = ''
+        line = 1
+        for token in tokenize(code):
+            if token.kind == COMMENT:
+                continue
+            if token.kind == DOC_COMMENT:
+                doc = token.text
+                continue
+            key = token.text.lower() if token.kind == NAME else token.text
+            self.tokens.append(_Token(token.kind, key, token.text, token.line, doc))
+            doc = ''
+            line = token.line
+        self.tokens.append(_Token('eof', '', '', line, ''))
+
+    def run(self) -> List[Element]:
+        self._scan(in_function=False, closing=False)
+        return self.elements
+
+    def _scan(self, in_function: bool, closing: bool):
+        """Разбирает операторы до конца файла или, если closing, до закрывающей скобки тела функции"""
+        braces: List[str] = []
+        while True:
+            token = self.tokens[self.pos]
+            kind, key = token.kind, token.key
+
+            if kind == 'eof':
+                if closing or braces:
+                    raise UnsupportedSyntax('незакрытая фигурная скобка')
+                return
+            if kind == OP:
+                if key == '{':
+                    braces.append('namespace' if self._after_namespace() else 'block')
+                elif key == '}':
+                    if braces:
+                        braces.pop()
+                    elif closing:
+                        self.pos += 1
+                        return
+                    else:
+                        raise UnsupportedSyntax(f"лишняя фигурная скобка в строке {token.line}")
+                self.pos += 1
+            elif kind == VARIABLE:
+                if not in_function:
+                    self._variable()
+                self.pos += 1
+            elif kind != NAME or self._after_accessor():
+                self.pos += 1
+            elif key == 'function':
+                if self._is_named_function():
+                    if in_function:
+                        raise UnsupportedSyntax(f"вложенное объявление функции в строке {token.line}")
+                    self._function()
+                else:
+                    self._closure_header()
+                    braces.append('closure')
+            elif key == 'fn':
+                self._arrow_function_header()
+            elif key in ('class', 'interface', 'trait', 'enum') and self._peek(1).kind == NAME:
+                self._declaration(key, nested=in_function or 'closure' in braces)
+            elif key == 'class':
+                self._check_anonymous_class()
+                self.pos += 1
+            elif key == 'const':
+                if in_function or any(brace != 'namespace' for brace in braces):
+                    # Вне пространства имен const - синтаксическая ошибка, ее сообщит PHP
+                    raise UnsupportedSyntax(f"const внутри блока в строке {token.line}")
+                self._constants('constant', token)
+            elif key == 'use':
+                self._statement()
+            elif key == 'static' and self._peek(1).kind == VARIABLE:
+                self._static_variables()
+            elif key == '__halt_compiler':
+                raise UnsupportedSyntax('__halt_compiler')
+            else:
+                self.pos += 1
+
+    def _declaration(self, key: str, nested: bool):
+        """Объявление класса, интерфейса, трейта или перечисления"""
+        first = self._check_anonymous_class() if key == 'class' else self.pos
+        if key in ('trait', 'enum'):
+            raise UnsupportedSyntax(f"{key} в строке {self.tokens[self.pos].line}")
+        if nested:
+            # ElementVisitor хранит текущий класс и функцию флагами, а не стеком
+            raise UnsupportedSyntax(f"вложенное объявление {key} в строке {self.tokens[self.pos].line}")
+
+        name = self._peek(1).text
+        self.pos += 2
+        self._skip_until('{')
+        if key == 'interface':
+            # Методы и константы интерфейсов ElementVisitor не выдает
+            self._skip_group()
+            return
+
+        self._add('class', name, '', self.tokens[first])
+        self.pos += 1
+        self._class_body(name)
+
+    def _check_anonymous_class(self) -> int:
+        """Возвращает позицию первого модификатора класса, анонимные классы не поддерживаются"""
+        first = self.pos
+        while first > 0 and self.tokens[first - 1].kind == NAME and self.tokens[first - 1].key in CLASS_MODIFIERS:
+            first -= 1
+        if first > 0 and self.tokens[first - 1].key == 'new':
+            raise UnsupportedSyntax(f"анонимный класс в строке {self.tokens[self.pos].line}")
+        return first
+
+    def _class_body(self, class_name: str):
+        """Члены класса до закрывающей скобки"""
+        while True:
+            start = self.tokens[self.pos]
+            if start.kind == OP and start.key == '}':
+                self.pos += 1
+                return
+
+            first = self.pos
+            while self.tokens[self.pos].kind == NAME and self.tokens[self.pos].key in MEMBER_MODIFIERS:
+                self.pos += 1
+            token = self.tokens[self.pos]
+            has_modifiers = self.pos > first
+
+            if token.kind == NAME and token.key == 'function':
+                self._method(class_name, start)
+            elif token.kind == NAME and token.key == 'const':
+                self._constants('class_constant', start, class_name)
+            elif token.kind == NAME and token.key == 'use' and not has_modifiers:
+                # Подключение трейтов, в том числе с блоком правил
+                self._skip_until(';', '{')
+                if self.tokens[self.pos].key == '{':
+                    self._skip_group()
+                else:
+                    self.pos += 1
+            elif has_modifiers:
+                self._properties(class_name, start)
+            else:
+                raise UnsupportedSyntax(f"неподдерживаемый член класса в строке {token.line}")
+
+    def _method(self, class_name: str, start: _Token):
+        self.pos += 1
+        if self.tokens[self.pos].key == '&':
+            self.pos += 1
+        name = self.tokens[self.pos]
+        if name.kind != NAME:
+            raise UnsupportedSyntax(f"имя метода в строке {name.line}")
+        self._add('method', f"{class_name}::{name.text}", name.text, start)
+        self.pos += 1
+        self._skip_group('(')
+        self._skip_until('{', ';')
+        if self.tokens[self.pos].key == ';':
+            self.pos += 1
+        else:
+            self.pos += 1
+            self._scan(in_function=True, closing=True)
+
+    def _properties(self, class_name: str, start: _Token):
+        for token, depth in self._statement():
+            if depth == 0 and token.kind == OP and token.key == '{':
+                raise UnsupportedSyntax(f"хуки свойства в строке {token.line}")
+            if depth == 0 and token.kind == VARIABLE:
+                name = token.text[1:]
+                self._add('property', f"{class_name}::${name}", name, start)
+
+    def _constants(self, item_type: str, start: _Token, class_name: str = ''):
+        """Константы объявления const: имена перед '=' вне скобок"""
+        self.pos += 1
+        tokens = self._statement()
+        for (token, depth), (following, _) in zip(tokens, tokens[1:]):
+            if depth == 0 and token.kind == NAME and following.kind == OP and following.key == '=':
+                if class_name:
+                    self._add(item_type, f"{class_name}::{token.text}", token.text, start)
+                else:
+                    self._add(item_type, token.text, '', start)
+
+    def _function(self):
+        start = self.tokens[self.pos]
+        self.pos += 1
+        if self.tokens[self.pos].key == '&':
+            self.pos += 1
+        self._add('function', self.tokens[self.pos].text, '', start)
+        self.pos += 1
+        self._skip_group('(')
+        self._skip_until('{')
+        self.pos += 1
+        self._scan(in_function=True, closing=True)
+
+    def _closure_header(self):
+        """Пропускает параметры, use и тип замыкания вместе с открывающей скобкой тела"""
+        self.pos += 1
+        if self.tokens[self.pos].key == '&':
+            self.pos += 1
+        self._skip_group('(')
+        if self.tokens[self.pos].kind == NAME and self.tokens[self.pos].key == 'use':
+            self.pos += 1
+            self._skip_group('(')
+        self._skip_until('{')
+        self.pos += 1
+
+    def _arrow_function_header(self):
+        """Пропускает параметры и тип стрелочной функции, тело разбирается как обычное выражение"""
+        self.pos += 1
+        if self.tokens[self.pos].key == '&':
+            self.pos += 1
+        if self.tokens[self.pos].key != '(':
+            return
+        self._skip_group('(')
+        self._skip_until('=>')
+        self.pos += 1
+
+    def _static_variables(self):
+        """Статические переменные - не присваивания, но в их значениях не должно быть вложенного кода"""
+        self.pos += 1
+        tokens = self._statement()
+        for (token, depth), (following, _) in zip(tokens, tokens[1:]):
+            nested_assign = depth > 0 and token.kind == VARIABLE and following.key == '='
+            if nested_assign or (token.kind == NAME and token.key in ('function', 'fn', 'class')):
+                raise UnsupportedSyntax(f"сложное значение статической переменной в строке {token.line}")
+
+    def _variable(self):
+        """Присваивание переменной: $name = ..., но не =&, $$name, ->$name и ::$name"""
+        token = self.tokens[self.pos]
+        previous = self.tokens[self.pos - 1] if self.pos else None
+        if previous is not None and previous.kind == OP and (previous.key == '$' or previous.key in ACCESSORS):
+            return
+        following, after = self._peek(1), self._peek(2)
+        if following.kind == OP and following.key == '=' and not (after.kind == OP and after.key == '&'):
+            self._add('variable', token.text, '', token)
+
+    def _is_named_function(self) -> bool:
+        offset = 2 if self._peek(1).key == '&' else 1
+        return self._peek(offset).kind == NAME and self._peek(offset + 1).key == '('
+
+    def _after_namespace(self) -> bool:
+        """Открывающая скобка принадлежит объявлению namespace"""
+        previous = self._peek(-1)
+        return previous.key == 'namespace' or (previous.kind == NAME and self._peek(-2).key == 'namespace')
+
+    def _after_accessor(self) -> bool:
+        return self.pos > 0 and self.tokens[self.pos - 1].key in ACCESSORS
+
+    def _peek(self, offset: int) -> _Token:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def _statement(self) -> List[tuple]:
+        """Лексемы до ';' вне скобок с глубиной вложенности, позиция - после ';'"""
+        tokens = []
+        depth = 0
+        while True:
+            token = self.tokens[self.pos]
+            if token.kind == 'eof':
+                raise UnsupportedSyntax('незавершенный оператор')
+            self.pos += 1
+            if token.kind == OP:
+                if token.key == ';' and depth == 0:
+                    return tokens
+                if token.key in CLOSING:
+                    depth -= 1
+                    if depth < 0:
+                        raise UnsupportedSyntax(f"лишняя скобка в строке {token.line}")
+            tokens.append((token, depth))
+            if token.kind == OP and token.key in OPENING:
+                depth += 1
+
+    def _skip_group(self, opening: Optional[str] = None):
+        """Пропускает скобочную группу вместе с вложенными"""
+        token = self.tokens[self.pos]
+        if token.kind != OP or token.key not in OPENING or (opening and token.key != opening):
+            raise UnsupportedSyntax(f"ожидалась скобка в строке {token.line}")
+        depth = 0
+        while True:
+            token = self.tokens[self.pos]
+            if token.kind == 'eof':
+                raise UnsupportedSyntax('незакрытая скобка')
+            self.pos += 1
+            if token.kind == OP:
+                if token.key in OPENING:
+                    depth += 1
+                elif token.key in CLOSING:
+                    depth -= 1
+                    if depth == 0:
+                        return
+
+    def _skip_until(self, *keys: str):
+        """Переходит к первой из лексем keys вне скобок (например, к телу после сигнатуры)"""
+        while True:
+            token = self.tokens[self.pos]
+            if token.kind == 'eof':
+                raise UnsupportedSyntax('незавершенное объявление')
+            if token.kind == OP:
+                if token.key in keys:
+                    return
+                if token.key in OPENING:
+                    self._skip_group()
+                    continue
+                if token.key in CLOSING or token.key == ';':
+                    raise UnsupportedSyntax(f"неожиданная лексема в строке {token.line}")
+            self.pos += 1
+
+    def _add(self, item_type: str, name: str, short_name: str, start: _Token):
+        """Добавляет элемент со строкой и DocBlock первой лексемы узла"""
+        self.elements.append(Element(item_type, name, short_name, start.doc, start.line))
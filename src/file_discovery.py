@@ -0,0 +1,211 @@
+import os
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from .config import Config
+
+# Скомпилированное правило .gitignore: (регулярное выражение, отрицание, только для директорий)
+GitIgnoreRule = Tuple[re.Pattern, bool, bool]
+
+
+def compile_gitignore_rule(line: str) -> Optional[GitIgnoreRule]:
+    """Преобразует строку .gitignore в регулярное выражение"""
+    line = line.rstrip('\r\n')
+    if not line.strip() or line.startswith('#'):
+        return None
+    if not line.endswith('\\ '):
+        line = line.rstrip(' ')
+
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    if line.startswith('\\'):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # Шаблон со слешем в начале или середине привязан к директории .gitignore
+    anchored = '/' in line
+    line = line.lstrip('/')
+
+    regex = ''
+    i = 0
+    while i < len(line):
+        if line.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif line.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif line[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif line[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif line[i] == '[':
+            end = line.find(']', i + 1)
+            if end < 0:
+                regex += re.escape(line[i])
+                i += 1
+            else:
+                body = line[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = end + 1
+        else:
+            regex += re.escape(line[i])
+            i += 1
+
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+    return re.compile(f'^{regex}$'), negate, dir_only
+
+
+class FileDiscovery:
+    """Обход директории через os.scandir с фильтрами.
+
+    Возвращает файлы генератором в детерминированном порядке: сначала файлы
+    директории по имени, затем поддиректории по имени (как rglob, но
+    независимо от порядка файловой системы).
+    """
+
+    def __init__(self, base_dir: str | Path, extensions: Sequence[str] = Config.PHP_EXTENSIONS,
+                 include: Iterable[str] = (), exclude: Iterable[str] = Config.DEFAULT_EXCLUDES,
+                 use_gitignore: bool = False, follow_symlinks: bool = False):
+        self.base_dir = Path(base_dir)
+        self.extensions = tuple(extensions)
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.use_gitignore = use_gitignore
+        self.follow_symlinks = follow_symlinks
+        # Статистика обхода
+        self.directories = 0
+        self.pruned = 0
+        self.symlink_loops = 0
+
+    def __iter__(self) -> Iterator[Path]:
+        return self.iter_files()
+
+    def iter_files(self) -> Iterator[Path]:
+        """Возвращает подходящие файлы по мере обхода"""
+        visited: Set[Tuple[int, int]] = set()
+        yield from self._walk(str(self.base_dir), '', [], visited)
+
+    def accepts(self, relative_path: str | Path) -> bool:
+        """Проверяет, попал бы файл с данным относительным путем в обход"""
+        parts = Path(relative_path).parts
+        if not parts:
+            return False
+
+        if len(parts) > 1 and not self.accepts_directory(Path(*parts[:-1])):
+            return False
+
+        ignore_stack = []
+        if self.use_gitignore:
+            ignore_stack = [('/'.join(parts[:depth]), self._load_gitignore(self.base_dir.joinpath(*parts[:depth])))
+                            for depth in range(len(parts))]
+        return self._accepts_file('/'.join(parts), parts[-1], ignore_stack)
+
+    def accepts_directory(self, relative_path: str | Path) -> bool:
+        """Проверяет, заходит ли обход в директорию с данным относительным путем"""
+        parts = Path(relative_path).parts
+        ignore_stack = []
+        for depth in range(len(parts)):
+            if self.use_gitignore:
+                ignore_stack = ignore_stack + [('/'.join(parts[:depth]), self._load_gitignore(self.base_dir.joinpath(*parts[:depth])))]
+            if not self._accepts_dir('/'.join(parts[:depth + 1]), parts[depth], ignore_stack):
+                return False
+        return True
+
+    def _walk(self, path: str, rel: str, ignore_stack: List[Tuple[str, List[GitIgnoreRule]]],
+              visited: Set[Tuple[int, int]]) -> Iterator[Path]:
+        """Рекурсивно обходит директорию"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        key = (stat.st_dev, stat.st_ino)
+        if key in visited:
+            self.symlink_loops += 1
+            return
+        visited.add(key)
+        self.directories += 1
+
+        if self.use_gitignore:
+            ignore_stack = ignore_stack + [(rel, self._load_gitignore(Path(path)))]
+
+        try:
+            with os.scandir(path) as scandir_it:
+                entries = sorted(scandir_it, key=lambda entry: entry.name)
+        except OSError:
+            return
+
+        subdirs = []
+        for entry in entries:
+            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=self.follow_symlinks)
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+
+            if is_dir:
+                if self._accepts_dir(entry_rel, entry.name, ignore_stack):
+                    subdirs.append((entry, entry_rel))
+                else:
+                    self.pruned += 1
+            elif is_file and self._accepts_file(entry_rel, entry.name, ignore_stack):
+                yield Path(entry.path)
+
+        for entry, entry_rel in subdirs:
+            yield from self._walk(entry.path, entry_rel, ignore_stack, visited)
+
+    def _accepts_dir(self, rel: str, name: str, ignore_stack) -> bool:
+        """Проверяет, нужно ли заходить в директорию"""
+        if self._matches_any(rel, name, self.exclude):
+            return False
+        return not self._is_ignored(rel, True, ignore_stack)
+
+    def _accepts_file(self, rel: str, name: str, ignore_stack) -> bool:
+        """Проверяет, подходит ли файл под фильтры"""
+        if not name.endswith(self.extensions):
+            return False
+        if self._matches_any(rel, name, self.exclude):
+            return False
+        if self.include and not self._matches_any(rel, name, self.include):
+            return False
+        return not self._is_ignored(rel, False, ignore_stack)
+
+    @staticmethod
+    def _matches_any(rel: str, name: str, patterns: List[str]) -> bool:
+        """Сопоставляет путь с glob-шаблонами по полному пути и по имени"""
+        return any(fnmatch(rel, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+    @staticmethod
+    def _is_ignored(rel: str, is_dir: bool, ignore_stack) -> bool:
+        """Применяет правила .gitignore от корня к листу, последнее совпадение побеждает"""
+        ignored = False
+        for prefix, rules in ignore_stack:
+            sub = rel[len(prefix) + 1:] if prefix else rel
+            for regex, negate, dir_only in rules:
+                if dir_only and not is_dir:
+                    continue
+                if regex.match(sub):
+                    ignored = not negate
+        return ignored
+
+    @staticmethod
+    def _load_gitignore(directory: Path) -> List[GitIgnoreRule]:
+        """Читает правила .gitignore из директории"""
+        try:
+            with open(directory / '.gitignore', 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        return [rule for rule in map(compile_gitignore_rule, lines) if rule]
@@ -0,0 +1,110 @@
+import csv
+import json
+import os
+import subprocess
+from pathlib import Path
+from sys import intern
+from typing import Dict, Iterable, Iterator, Optional, Set
+from .report_item import ReportItem
+from .report_writer import open_report
+from .utils import atomic_write_json
+
+
+def git_changed_files(base_dir: str | Path, rev: str) -> Set[str]:
+    """Возвращает пути (относительно base_dir), измененные с ревизии rev.
+
+    Учитываются добавленные, измененные, переименованные (старый и новый путь)
+    и удаленные файлы рабочей копии, а также неотслеживаемые файлы.
+    """
+    base_dir = Path(base_dir)
+    diff = subprocess.run(
+        ['git', '-C', str(base_dir), 'diff', '--name-status', '-M', '-z', '--relative', rev, '--'],
+        capture_output=True, check=True
+    ).stdout
+    untracked = subprocess.run(
+        ['git', '-C', str(base_dir), 'ls-files', '--others', '--exclude-standard', '-z'],
+        capture_output=True, check=True
+    ).stdout
+
+    changed = set()
+    fields = diff.decode('utf-8', errors='surrogateescape').split('\0')
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        # Для переименований и копий git выводит два пути
+        paths_count = 2 if status[0] in 'RC' else 1
+        changed.update(fields[i + 1:i + 1 + paths_count])
+        i += 1 + paths_count
+
+    changed.update(path for path in untracked.decode('utf-8', errors='surrogateescape').split('\0') if path)
+    return {str(Path(path)) for path in changed}
+
+
+def read_changed_files(list_file: str | Path, base_dir: str | Path) -> Set[str]:
+    """Читает список измененных файлов (по одному на строку).
+
+    Относительные пути считаются от текущей директории; пути вне base_dir игнорируются.
+    """
+    base = Path(base_dir).resolve()
+    changed = set()
+    with open(list_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            path = Path(line)
+            if not path.is_absolute():
+                path = Path.cwd() / path
+            try:
+                changed.add(str(Path(os.path.normpath(path)).relative_to(base)))
+            except ValueError:
+                continue
+    return changed
+
+
+def read_report_items(report_path: str | Path, skip_paths: Set[str],
+                      type_mapping: Dict[str, str], compression: Optional[str] = None) -> Iterator[ReportItem]:
+    """Читает строки существующего CSV-отчета как элементы, пропуская skip_paths"""
+    type_by_name = {ru_name: item_type for item_type, ru_name in type_mapping.items()}
+    with open_report(report_path, 'r', compression) as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        include_lines = header is not None and len(header) > 6
+        for row in reader:
+            if row[1] in skip_paths:
+                continue
+            type_ru = intern(row[4])
+            yield ReportItem(intern(row[1]), int(row[2]), row[3], type_by_name.get(type_ru, type_ru), type_ru,
+                             row[5], int(row[6]) if include_lines else 0)
+
+
+def meta_path(report_path: str | Path) -> Path:
+    """Путь к служебному файлу с параметрами, с которыми собран отчет"""
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.name + '.meta.json')
+
+
+def load_report_meta(report_path: str | Path) -> Optional[Dict]:
+    """Загружает параметры предыдущего отчета"""
+    try:
+        with open(meta_path(report_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_report_meta(report_path: str | Path, meta: Dict):
+    """Сохраняет параметры отчета рядом с ним"""
+    atomic_write_json(meta_path(report_path), meta)
+
+
+def describe_files(directory: str | Path, filenames: Iterable[str]) -> Dict[str, list]:
+    """Возвращает размер и время изменения файлов для контроля их неизменности"""
+    result = {}
+    for filename in filenames:
+        try:
+            stat = (Path(directory) / filename).stat()
+        except OSError:
+            continue
+        result[filename] = [stat.st_mtime_ns, stat.st_size]
+    return result
@@ -0,0 +1,99 @@
+import heapq
+import pickle
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, List
+from .config import Config
+from .report_item import ReportItem
+
+
+class ItemSorter:
+    """Упорядочивает элементы отчета по (относительный путь, строка) с ограниченной памятью.
+
+    Элементы добавляются пофайлово и сортируются внутри файла. Когда в буфере
+    накапливается больше buffer_items элементов, буфер упорядочивается по пути
+    и сбрасывается во временный файл; при чтении отсортированные прогоны
+    сливаются k-way слиянием.
+    """
+
+    def __init__(self, buffer_items: int = Config.SORT_BUFFER_ITEMS):
+        self.buffer_items = buffer_items
+        self.count = 0
+        self._buffer: List[List[ReportItem]] = []
+        self._buffered = 0
+        self._runs: List[BinaryIO] = []
+
+    @staticmethod
+    def line_key(item: ReportItem) -> int:
+        """Ключ сортировки внутри файла"""
+        return item.line_number
+
+    @staticmethod
+    def path_key(item: ReportItem) -> str:
+        """Ключ сортировки между файлами"""
+        return item.relative_path
+
+    def add_file_items(self, items: List[ReportItem]):
+        """Добавляет элементы одного файла"""
+        if not items:
+            return
+
+        self._buffer.append(sorted(items, key=self.line_key))
+        self._buffered += len(items)
+        self.count += len(items)
+
+        if self.buffer_items and self._buffered >= self.buffer_items:
+            self._spill()
+
+    def __iter__(self) -> Iterator[ReportItem]:
+        """Возвращает все элементы в порядке (путь, строка)"""
+        if not self._runs:
+            return self._iter_buffer()
+
+        for run in self._runs:
+            run.seek(0)
+        sources = [self._read_run(run) for run in self._runs] + [self._iter_buffer()]
+        # Файл целиком попадает в один прогон, поэтому достаточно сливать по пути
+        return heapq.merge(*sources, key=self.path_key)
+
+    @property
+    def spilled_runs(self) -> int:
+        """Количество сброшенных на диск прогонов"""
+        return len(self._runs)
+
+    def close(self):
+        """Удаляет временные файлы прогонов"""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer = []
+        self._buffered = 0
+
+    def _iter_buffer(self) -> Iterator[ReportItem]:
+        """Возвращает элементы буфера, упорядоченные по пути файла"""
+        for file_items in self._sorted_chunks():
+            yield from file_items
+
+    def _sorted_chunks(self) -> List[List[ReportItem]]:
+        """Пофайловые списки буфера, упорядоченные по пути файла"""
+        return sorted(self._buffer, key=lambda chunk: self.path_key(chunk[0]))
+
+    def _spill(self):
+        """Сбрасывает упорядоченный буфер во временный файл"""
+        run = tempfile.TemporaryFile(prefix='php_analyzer_run_')
+        # Файл записывается отдельным списком: путь и названия типов сохраняются один раз
+        # и после чтения снова общие для всех элементов файла
+        for file_items in self._sorted_chunks():
+            pickle.dump(file_items, run, protocol=pickle.HIGHEST_PROTOCOL)
+        self._runs.append(run)
+        self._buffer = []
+        self._buffered = 0
+
+    @staticmethod
+    def _read_run(run: BinaryIO) -> Iterable[ReportItem]:
+        """Читает элементы из временного файла прогона"""
+        while True:
+            try:
+                file_items = pickle.load(run)
+            except EOFError:
+                return
+            yield from file_items
@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+from sys import intern
+from typing import Dict, Iterable, Iterator, Set
+from .profiler import profiler
+from .report_item import ReportItem
+from .report_writer import ReportWriter, open_report
+
+
+class JsonLinesWriter(ReportWriter):
+    """Отчет в формате JSON Lines: одна запись с именованными полями на строку"""
+
+    FORMAT = 'jsonl'
+    EXTENSION = '.jsonl'
+
+    @profiler.timed('report_write')
+    def write_sorted(self, items: Iterable[ReportItem], output_path: str | Path):
+        """Построчно записывает уже упорядоченные элементы в JSON Lines"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.global_row_number = 1
+
+        with open_report(output_path, 'w', self.compression) as f:
+            for item in items:
+                f.write(json.dumps(self._prepare_record(item), ensure_ascii=False))
+                f.write('\n')
+                self.global_row_number += 1
+
+    def read_items(self, report_path: str | Path, skip_paths: Set[str],
+                   type_mapping: Dict[str, str]) -> Iterator[ReportItem]:
+        """Читает записи существующего отчета как элементы, пропуская skip_paths"""
+        with open_report(report_path, 'r', self.compression) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['relative_path'] in skip_paths:
+                    continue
+                # Номер строки пересчитывается при записи
+                yield ReportItem(
+                    intern(record['relative_path']), record['item_number'], record['name'],
+                    intern(record['type']), intern(record['type_ru']), record['description'],
+                    record.get('line_number', 0)
+                )
@@ -0,0 +1,165 @@
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Iterable, Optional, TextIO
+
+# Промежуточный уровень между INFO и DEBUG: сообщения по каждому файлу (-v)
+VERBOSE = 15
+logging.addLevelName(VERBOSE, 'VERBOSE')
+
+LOGGER_NAME = 'php_analyzer'
+
+# Уровни консольного вывода по значению verbosity
+LEVELS = {
+    -1: logging.WARNING,  # --quiet
+    0: logging.INFO,
+    1: VERBOSE,           # -v
+    2: logging.DEBUG,     # --debug или -vv
+}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Возвращает логгер компонента анализатора"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def log_event(logger: logging.Logger, level: int, event: str, message: str, *args, **data):
+    """Пишет сообщение с именем события и полями для JSON-журнала"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, extra={'event': event, 'data': data})
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Форматирует записи журнала как JSON-строки"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': getattr(record, 'event', None),
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'data', {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(verbosity: int = 0, json_log: Optional[str] = None):
+    """Настраивает консольный вывод и JSON-журнал событий"""
+    verbosity = max(-1, min(2, verbosity))
+    console_level = LEVELS[verbosity]
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = False
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(console_level)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(console)
+    level = console_level
+
+    if json_log:
+        # В журнал попадают как минимум сводные события, даже при --quiet
+        json_level = min(console_level, logging.INFO)
+        file_handler = logging.FileHandler(json_log, mode='a', encoding='utf-8')
+        file_handler.setLevel(json_level)
+        file_handler.setFormatter(JsonLinesFormatter())
+        logger.addHandler(file_handler)
+        level = min(level, json_level)
+
+    logger.setLevel(level)
+    # Строка прогресса нужна только в обычном режиме: при -v она смешается с сообщениями по файлам
+    ProgressReporter.enabled = console_level == logging.INFO
+
+
+class ProgressReporter:
+    """Строка прогресса с ограничением частоты обновления.
+
+    В терминале строка перерисовывается на месте не чаще раза в interval секунд,
+    в остальных случаях (CI, перенаправление в файл) выводится отдельными
+    строками не чаще раза в plain_interval секунд.
+    """
+
+    enabled = False
+
+    def __init__(self, total: Optional[int] = None, label: str = 'Обработано файлов',
+                 stream: Optional[TextIO] = None, interval: float = 0.5, plain_interval: float = 10.0):
+        self.total = total
+        self.label = label
+        self.stream = stream or sys.stderr
+        self.is_tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = interval if self.is_tty else plain_interval
+        self.done = 0
+        self.started = time.monotonic()
+        self._last_output = self.started
+        self._drawn = False
+        self._finished = False
+
+    def count_total(self, items: Iterable):
+        """Считает итог для ETA в фоновом потоке: до его окончания выводятся только число и скорость"""
+        if not self.enabled:
+            return
+
+        def count():
+            total = 0
+            for _ in items:
+                if self._finished:
+                    return
+                total += 1
+            self.total = total
+
+        threading.Thread(target=count, name='progress-total', daemon=True).start()
+
+    def update(self, count: int = 1):
+        """Учитывает обработанные файлы и при необходимости обновляет строку"""
+        self.done += count
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self._last_output >= self.interval:
+            self._last_output = now
+            self._write(self.format_line(now))
+
+    def finish(self):
+        """Завершает строку прогресса"""
+        self._finished = True
+        if self.enabled and self._drawn and self.is_tty:
+            self.stream.write('\r\033[K')
+            self.stream.flush()
+
+    def format_line(self, now: Optional[float] = None) -> str:
+        """Формирует текст строки прогресса"""
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        rate = self.done / elapsed
+        if self.total:
+            line = f"{self.label}: {self.done}/{self.total} ({self.done * 100 // self.total}%), {rate:.1f} файл/с"
+            if rate > 0 and self.done < self.total:
+                line += f", осталось ~{self._format_duration((self.total - self.done) / rate)}"
+            return line
+        return f"{self.label}: {self.done}, {rate:.1f} файл/с"
+
+    def _write(self, line: str):
+        """Выводит строку прогресса"""
+        if self.is_tty:
+            self.stream.write('\r\033[K' + line)
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+        self._drawn = True
+
+    @staticmethod
+    def _format_duration(seconds: float) -> str:
+        """Форматирует длительность для ETA"""
+        seconds = int(seconds + 0.5)
+        if seconds < 60:
+            return f"{seconds} с"
+        minutes, seconds = divmod(seconds, 60)
+        if minutes < 60:
+            return f"{minutes} мин {seconds} с"
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours} ч {minutes} мин"
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+from .config import Config
+
+
+class ParseCache:
+    """Кэш результатов разбора PHP-файлов в SQLite.
+
+    Ключ - хэш содержимого файла вместе с версией PHP-скрипта и PHP-Parser,
+    поэтому неизменившиеся файлы не отправляются в PHP повторно. Там же
+    хранится карантин - файлы, на которых воркер сбоил при каждой попытке.
+    """
+
+    FILENAME = 'parse_cache.sqlite'
+    # Версия формата сохраненных элементов, входит в ключ
+    FORMAT_VERSION = 3
+    # Как часто фиксировать транзакцию при записи
+    COMMIT_EVERY = 500
+
+    def __init__(self, cache_dir: str | Path = Config.CACHE_DIR, version: str = '',
+                 max_size_mb: float = Config.CACHE_MAX_SIZE_MB):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.version = version.encode('utf-8')
+        self.max_size = int(max_size_mb * 1024 * 1024)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._uncommitted = 0
+
+        # analyze_iter обращается к кэшу из потока асинхронного пула, обращения идут по очереди
+        self.connection = sqlite3.connect(self.cache_dir / self.FILENAME, timeout=30, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY,'
+            ' elements BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' accessed REAL NOT NULL)'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS quarantine ('
+            ' key TEXT PRIMARY KEY,'
+            ' error TEXT NOT NULL,'
+            ' created REAL NOT NULL)'
+        )
+        self.connection.commit()
+
+    def make_key(self, content: bytes) -> str:
+        """Вычисляет ключ кэша по содержимому файла"""
+        digest = hashlib.blake2b(self.version, digest_size=20)
+        digest.update(b'\0%d\0' % self.FORMAT_VERSION)
+        digest.update(content)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Возвращает элементы из кэша или None"""
+        row = self.connection.execute('SELECT elements FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        self._maybe_commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, elements: List[Dict]):
+        """Сохраняет элементы разобранного файла"""
+        blob = zlib.compress(json.dumps(elements, ensure_ascii=False).encode('utf-8'))
+        self.connection.execute(
+            'INSERT OR REPLACE INTO entries (key, elements, size, accessed) VALUES (?, ?, ?, ?)',
+            (key, blob, len(blob), time.time())
+        )
+        # Успешный разбор снимает файл с карантина
+        self.connection.execute('DELETE FROM quarantine WHERE key = ?', (key,))
+        self._maybe_commit()
+
+    def quarantined(self, key: str) -> Optional[str]:
+        """Возвращает ошибку, с которой файл попал в карантин, или None"""
+        row = self.connection.execute('SELECT error FROM quarantine WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def quarantine(self, key: str, error: str):
+        """Помещает файл в карантин: следующие запуски не отправляют его воркеру"""
+        self.connection.execute('INSERT OR REPLACE INTO quarantine (key, error, created) VALUES (?, ?, ?)',
+                                (key, error, time.time()))
+        self._maybe_commit()
+
+    def evict(self):
+        """Удаляет давно не использованные записи сверх лимита размера"""
+        total = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        excess = total - self.max_size
+        removed = []
+        for key, size in self.connection.execute('SELECT key, size FROM entries ORDER BY accessed'):
+            removed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self.connection.executemany('DELETE FROM entries WHERE key = ?', removed)
+        self.evictions += len(removed)
+        self.connection.commit()
+
+    def commit(self):
+        """Фиксирует накопленные изменения"""
+        self.connection.commit()
+        self._uncommitted = 0
+
+    def flush(self):
+        """Фиксирует изменения и применяет лимит размера, база остается открытой"""
+        if self.connection is None:
+            return
+        self.commit()
+        self.evict()
+
+    def close(self):
+        """Фиксирует изменения, применяет лимит размера и закрывает базу"""
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.close()
+        self.connection = None
+
+    def _maybe_commit(self):
+        """Периодически фиксирует накопленные изменения"""
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_EVERY:
+            self.connection.commit()
+            self._uncommitted = 0
@@ -0,0 +1,256 @@
+import hashlib
+import logging
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from .config import Config
+from .fast_extractor import FastExtractor
+from .log import VERBOSE, get_logger, log_event
+from .parse_cache import ParseCache
+from .php_parser import PHPParser
+from .php_tokenizer import UnsupportedSyntax
+from .prefilter import PreFilter
+from .profiler import profiler
+from .report_item import Element
+
+logger = get_logger('parser')
+
+
+class ParseFailure(NamedTuple):
+    """Файл, который PHP-воркер не разобрал"""
+
+    path: Path
+    error: str
+    # 0 - файл не разбирался: он в карантине или такое же содержимое уже не разобрано
+    attempts: int
+    # Сбой вызван файлом, а не окружением: при кэше файл помещается в карантин
+    quarantine: bool
+
+
+class ParserPool:
+    """Пул PHP-парсеров для параллельного разбора файлов"""
+
+    # Сколько файлов на воркер берется из обхода вперед при jobs > 1
+    WINDOW_PER_JOB = 4
+
+    def __init__(self, jobs: int = 1, debug: bool = False, timeout: float = Config.PARSE_TIMEOUT,
+                 cache: Optional[ParseCache] = None, engine: str = Config.PARSE_ENGINE,
+                 prefilter: bool = Config.PREFILTER, memory_limit_mb: int = Config.PARSE_MEMORY_LIMIT_MB,
+                 max_files: int = Config.WORKER_MAX_FILES, max_rss_mb: float = Config.WORKER_MAX_RSS_MB,
+                 attempts: int = Config.PARSE_ATTEMPTS, retry_quarantined: bool = False,
+                 deduplicate: bool = Config.DEDUPLICATE, shared_files: int = Config.DEDUPLICATE_FILES):
+        self.jobs = max(1, jobs)
+        self.debug = debug
+        self.cache = cache
+        self.attempts = max(1, attempts)
+        # Файлы из карантина кэша снова отправляются воркеру
+        self.retry_quarantined = retry_quarantined
+        self.failures: List[ParseFailure] = []
+        # Файлы без лексем объявлений не разбираются
+        self.prefilter = PreFilter() if prefilter else None
+        # Одинаковое содержимое разбирается один раз: элементы shared_files последних
+        # разобранных содержимых по ключу, давно не встречавшиеся вытесняются
+        self.deduplicate = deduplicate
+        self.deduplicated = 0
+        self.shared_files = max(1, shared_files)
+        self._shared: OrderedDict[str, List[Element]] = OrderedDict()
+        # Встроенный разбор (engine='python'), остальные файлы получает PHP-воркер
+        self.extractor = FastExtractor() if engine == 'python' else None
+        self.fast_parsed = 0
+        self.fallbacks = 0
+        self._counters_lock = threading.Lock()
+        self.parsers = [self._create_parser(debug=debug, timeout=timeout, memory_limit_mb=memory_limit_mb,
+                                            max_files=max_files, max_rss_mb=max_rss_mb) for _ in range(self.jobs)]
+        self._idle: queue.Queue = queue.Queue()
+        for parser in self.parsers:
+            self._idle.put(parser)
+
+    @staticmethod
+    def _create_parser(**options) -> PHPParser:
+        """Создает парсер с собственным PHP-воркером"""
+        return PHPParser(**options)
+
+    def parse_files(self, files: Iterable[Path]) -> Iterator[Tuple[Path, List[Element]]]:
+        """Разбирает файлы и возвращает пары (файл, элементы) в исходном порядке"""
+        if self.jobs == 1:
+            for file_path in files:
+                key, elements = self._lookup(file_path)
+                if elements is None:
+                    elements, failure = self._parse(file_path)
+                    self._store(key, elements, failure)
+                yield file_path, elements
+            return
+
+        # Файлы берутся из обхода по мере продвижения окна: в работе не больше jobs * WINDOW_PER_JOB
+        # файлов, а готовые результаты ждут в окне, пока не будут выданы файлы перед ними.
+        # Запись окна: [файл, ключ, элементы, future разбора, запись первой копии содержимого]
+        files = iter(files)
+        window: deque = deque()
+        # Разбор содержимого, которое уже есть в окне, не запускается второй раз
+        running: Dict[str, list] = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            try:
+                while True:
+                    added = []
+                    while len(window) < self.jobs * self.WINDOW_PER_JOB:
+                        file_path = next(files, None)
+                        if file_path is None:
+                            break
+                        key, elements = self._lookup(file_path)
+                        entry = [file_path, key, elements, None, None]
+                        if elements is None:
+                            entry[4] = running.get(key) if self.deduplicate and key is not None else None
+                            if entry[4] is None:
+                                added.append(entry)
+                                if key is not None:
+                                    running[key] = entry
+                        window.append(entry)
+                    # Крупные файлы отправляются первыми, чтобы большой файл не задерживал окно в конце
+                    for entry in sorted(added, key=lambda entry: self._file_size(entry[0]), reverse=True):
+                        entry[3] = executor.submit(self._parse, entry[0])
+                    if not window:
+                        return
+
+                    entry = window.popleft()
+                    file_path, key, elements, future, source = entry
+                    if source is not None:
+                        elements, failure = source[3].result()
+                        self.deduplicated += 1
+                        if failure is not None:
+                            self.failures.append(failure._replace(path=file_path, attempts=0))
+                    elif future is not None:
+                        elements, failure = future.result()
+                        if running.get(key) is entry:
+                            del running[key]
+                        self._store(key, elements, failure)
+                    yield file_path, elements
+            finally:
+                for entry in window:
+                    if entry[3] is not None:
+                        entry[3].cancel()
+
+    @property
+    def recycles(self) -> int:
+        """Плановые перезапуски PHP-воркеров по числу файлов или памяти"""
+        return sum(parser.worker.recycles for parser in self.parsers)
+
+    def close(self):
+        """Останавливает все PHP-воркеры"""
+        for parser in self.parsers:
+            parser.close()
+
+    def _parse(self, file_path: Path) -> Tuple[List[Element], Optional[ParseFailure]]:
+        """Разбирает файл свободным парсером из пула, возвращает элементы и сбой воркера"""
+        if self.extractor is not None:
+            elements = self._extract(file_path)
+            if elements is not None:
+                return elements, None
+
+        parser = self._idle.get()
+        try:
+            for attempt in range(1, self.attempts + 1):
+                if attempt > 1:
+                    # После сбоя воркер уже остановлен, повтор идет в новом процессе
+                    log_event(logger, VERBOSE, 'parse_retry', "  Повторный разбор %s, попытка %d",
+                              file_path, attempt, path=str(file_path), attempt=attempt)
+                elements = parser.parse_file(file_path)
+                if parser.last_error is None:
+                    return elements, None
+                if parser.last_unavailable:
+                    return [], ParseFailure(file_path, parser.last_error, attempt, False)
+            return [], ParseFailure(file_path, parser.last_error, self.attempts, True)
+        finally:
+            self._idle.put(parser)
+
+    def _extract(self, file_path: Path) -> Optional[List[Element]]:
+        """Разбирает файл встроенным извлекателем, None - файл нужно передать PHP-воркеру"""
+        try:
+            with profiler.span('fast_extract', file_path):
+                elements = self.extractor.extract_file(file_path)
+        except (UnsupportedSyntax, OSError) as e:
+            log_event(logger, VERBOSE, 'fast_fallback', "  Файл %s передан PHP-парсеру: %s", file_path, e,
+                      path=str(file_path), reason=str(e))
+            with self._counters_lock:
+                self.fallbacks += 1
+            return None
+
+        with self._counters_lock:
+            self.fast_parsed += 1
+        return elements
+
+    def _lookup(self, file_path: Path) -> Tuple[Optional[str], Optional[List[Element]]]:
+        """Ищет готовый результат разбора: пустой после предфильтра или для файла в карантине, иначе в кэше"""
+        if self.prefilter is not None:
+            with profiler.span('prefilter', file_path):
+                accepted = self.prefilter.accepts(file_path)
+            if not accepted:
+                log_event(logger, VERBOSE, 'prefilter_skip', "  Файл %s пропущен: нет объявлений", file_path,
+                          path=str(file_path))
+                return None, []
+
+        if self.cache is None and not self.deduplicate:
+            return None, None
+        with profiler.span('cache_lookup', file_path):
+            try:
+                content = file_path.read_bytes()
+            except OSError:
+                return None, None
+            if self.cache is not None:
+                key = self.cache.make_key(content)
+            else:
+                key = hashlib.blake2b(content, digest_size=20).hexdigest()
+            shared = self._shared.get(key)
+            if shared is not None:
+                self._shared.move_to_end(key)
+                self.deduplicated += 1
+                return key, shared
+            if self.cache is None:
+                return key, None
+            rows = self.cache.get(key)
+            if rows is not None:
+                elements = [Element.from_row(row) for row in rows]
+                self._remember(key, elements)
+                return key, elements
+            error = None if self.retry_quarantined else self.cache.quarantined(key)
+
+        if error is None:
+            return key, None
+        log_event(logger, logging.WARNING, 'parse_quarantined', "  Файл %s в карантине: %s", file_path, error,
+                  path=str(file_path), error=error)
+        self.failures.append(ParseFailure(file_path, error, 0, True))
+        return key, []
+
+    def _store(self, key: Optional[str], elements: List[Element], failure: Optional[ParseFailure]):
+        """Сохраняет результат разбора в кэш, а файл, на котором сбоил воркер, - в карантин"""
+        if failure is not None:
+            self.failures.append(failure)
+        if key is None:
+            return
+        if failure is None:
+            self._remember(key, elements)
+        if self.cache is None:
+            return
+        if failure is None:
+            self.cache.put(key, elements)
+        elif failure.quarantine:
+            self.cache.quarantine(key, failure.error)
+
+    def _remember(self, key: str, elements: List[Element]):
+        """Запоминает элементы разобранного содержимого для следующих копий"""
+        if not self.deduplicate:
+            return
+        self._shared[key] = elements
+        self._shared.move_to_end(key)
+        if len(self._shared) > self.shared_files:
+            self._shared.popitem(last=False)
+
+    @staticmethod
+    def _file_size(file_path: Path) -> int:
+        """Возвращает размер файла в байтах"""
+        try:
+            return file_path.stat().st_size
+        except OSError:
+            return 0
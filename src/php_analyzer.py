@@ -1,11 +1,36 @@
+import asyncio
+import heapq
+import logging
+import os
+import sys
+import time
 from collections import defaultdict
+from contextlib import aclosing
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+from .async_parser_pool import AsyncParserPool
 from .config import Config
 from .description_manager import DescriptionManager
+from .docblock import clean_comment
+from .environment import EnvironmentProbe
+from .fast_extractor import FastExtractor
+from .file_discovery import FileDiscovery
+from .incremental import load_report_meta, save_report_meta
+from .parse_cache import ParseCache
+from .parser_pool import ParseFailure, ParserPool
 from .php_parser import PHPParser
 from .csv_writer import CSVWriter
-from .utils import get_relative_path
+from .item_sorter import ItemSorter
+from .jsonl_writer import JsonLinesWriter
+from .sqlite_writer import SQLiteWriter
+from .log import VERBOSE, ProgressReporter, get_logger, log_event
+from .profiler import profiler
+from .report_item import Element, ReportItem
+from .sharding import save_shard_result, shard_directory, shard_of
+from .utils import atomic_write_json, create_directory, get_relative_path
+
+logger = get_logger('analyzer')
 
 
 class PHPAnalyzer:
@@ -21,24 +46,98 @@ class PHPAnalyzer:
 
     CLASS_ITEMS = {'class', 'method', 'property', 'class_constant'}
 
+    # Форматы отчета (--format)
+    WRITERS = {
+        'csv': CSVWriter,
+        'jsonl': JsonLinesWriter,
+        'sqlite': SQLiteWriter,
+    }
+
     def __init__(self, descriptions_dir: str = Config.DESCRIPTIONS_DIR,
-                 exact_match: bool = True, full_names: bool = True, debug: bool = False):
+                 exact_match: bool = True, full_names: bool = True, debug: bool = False,
+                 timeout: float = Config.PARSE_TIMEOUT, jobs: int = 1, flush_every: int = 0,
+                 cache_dir: Optional[str | Path] = Config.CACHE_DIR,
+                 cache_size_mb: float = Config.CACHE_MAX_SIZE_MB,
+                 sort_buffer: int = Config.SORT_BUFFER_ITEMS,
+                 extensions: Sequence[str] = Config.PHP_EXTENSIONS, include: Iterable[str] = (),
+                 exclude: Iterable[str] = Config.DEFAULT_EXCLUDES, use_gitignore: bool = False,
+                 follow_symlinks: bool = False, description_store: Optional[str | Path] = None,
+                 description_snapshot: bool = True, output_format: str = 'csv',
+                 compression: Optional[str] = None, engine: str = Config.PARSE_ENGINE,
+                 prefilter: bool = Config.PREFILTER, memory_limit_mb: int = Config.PARSE_MEMORY_LIMIT_MB,
+                 recycle_files: int = Config.WORKER_MAX_FILES, recycle_rss_mb: float = Config.WORKER_MAX_RSS_MB,
+                 retry_quarantined: bool = False,
+                 failure_report: Optional[str | Path] = Config.FAILURE_REPORT):
         self.descriptions_dir = descriptions_dir
+        self.description_store = description_store
         self.exact_match = exact_match
         self.full_names = full_names
         self.debug = debug
 
-        self.description_manager = DescriptionManager(descriptions_dir, debug=debug)
-        self.php_parser = PHPParser(debug=debug)
-        self.csv_writer = CSVWriter()
+        self.description_manager = DescriptionManager(descriptions_dir, debug=debug, flush_every=flush_every,
+                                                      store_path=description_store,
+                                                      use_snapshot=description_snapshot)
+        # Проверка окружения хранится рядом с кэшем разбора
+        self.environment = EnvironmentProbe(cache_dir)
+        # cache_dir=None отключает кэш результатов разбора
+        self.parse_cache = None
+        if cache_dir is not None:
+            version = f"{PHPParser.script_version()}:{self.environment.php_parser_version()}"
+            if engine == 'python':
+                # Результаты встроенного разбора не смешиваются с результатами PHP-Parser
+                version += f":fast{FastExtractor.VERSION}"
+            self.parse_cache = ParseCache(cache_dir, version=version, max_size_mb=cache_size_mb)
+        # Параметры пула нужны и асинхронному пулу analyze_iter
+        self.pool_options = {
+            'debug': debug,
+            'timeout': timeout,
+            'cache': self.parse_cache,
+            'engine': engine,
+            'prefilter': prefilter,
+            'memory_limit_mb': memory_limit_mb,
+            'max_files': recycle_files,
+            'max_rss_mb': recycle_rss_mb,
+            'retry_quarantined': retry_quarantined,
+        }
+        self.parser_pool = ParserPool(jobs=jobs, **self.pool_options)
+        # failure_report=None - не записывать отчет о файлах, которые не удалось разобрать
+        self.failure_report = failure_report
+        self.report_writer = self.WRITERS[output_format](compression=compression)
+        self.sort_buffer = sort_buffer
+        self.discovery_options = {
+            'extensions': tuple(extensions),
+            'include': list(include),
+            'exclude': list(exclude),
+            'use_gitignore': use_gitignore,
+            'follow_symlinks': follow_symlinks,
+        }
 
         self.base_dir = Path()
-        self.current_class = ""
-        self.current_class_items = 0
+        # Описания из DocBlock, новые для шарда, с путем файла (только при запуске с --shard)
+        self.shard_found: Optional[List[Tuple[str, str, str, str]]] = None
+
+        self.stats = self.initialize_stats()
+
+    def close(self):
+        """Останавливает PHP-воркеры и закрывает кэш разбора; анализатор больше не используется"""
+        self.parser_pool.close()
+        if self.parse_cache is not None:
+            self.parse_cache.close()
 
-        self.stats = self._initialize_stats()
+    def __enter__(self) -> 'PHPAnalyzer':
+        return self
 
-    def _initialize_stats(self) -> Dict[str, defaultdict]:
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self) -> 'PHPAnalyzer':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.to_thread(self.close)
+
+    @staticmethod
+    def initialize_stats() -> Dict[str, defaultdict]:
         """Инициализирует статистику"""
         return {
             'found': defaultdict(int),
@@ -47,70 +146,310 @@ class PHPAnalyzer:
             'total': defaultdict(int)
         }
 
-    def analyze_directory(self, directory: str | Path, output_csv: str | Path) -> None:
+    @profiler.timed('analyze_directory')
+    def analyze_directory(self, directory: str | Path, output_path: str | Path) -> None:
         """Анализирует директорию с PHP файлами"""
         self.base_dir = Path(directory)
-        all_items = []
-        duplicates = defaultdict(list)
+        duplicates = defaultdict(int)
 
-        print(f"Поиск PHP файлов в: {self.base_dir.absolute()}")
+        started = time.monotonic()
+        log_event(logger, logging.INFO, 'analysis_started', "Поиск PHP файлов в: %s", self.base_dir.absolute(),
+                  directory=str(self.base_dir.absolute()))
 
-        php_files = list(self.base_dir.rglob('*.php'))
-        print(f"Найдено PHP файлов: {len(php_files)}")
+        # Файлы выдаются генератором, разбор начинается до окончания обхода
+        discovery = self.create_discovery(self.base_dir)
+        php_files = profiler.timed_iter('discovery', discovery)
+        first_file = next(php_files, None)
 
-        if not php_files:
-            print("Предупреждение: PHP файлы не найдены!")
+        if first_file is None:
+            logger.warning("Предупреждение: PHP файлы не найдены!")
             # Покажем структуру директории для диагностики
-            print("Содержимое директории:")
+            logger.info("Содержимое директории:")
             for item in self.base_dir.rglob('*'):
-                print(f"  - {item}")
+                logger.info("  - %s", item)
             return
 
-        for file_path in php_files:
-            if self.debug:
-                print(f"Обработка файла: {file_path}")
-            file_items = self._process_file(file_path)
-
-            if self.debug and file_items:
-                print(f"  Извлечено элементов: {len(file_items)}")
+        # Итог для ETA считается отдельным обходом в фоне, разбор его не ждет
+        all_items, files_count = self._collect_items(chain([first_file], php_files), duplicates,
+                                                     self.create_discovery(self.base_dir))
 
-            for item in file_items:
-                self._check_duplicates(item, duplicates)
-                all_items.append(item)
+        logger.info("Найдено PHP файлов: %d", files_count)
+        logger.log(VERBOSE, "  Просмотрено директорий: %d, пропущено по фильтрам: %d, циклов ссылок: %d",
+                   discovery.directories, discovery.pruned, discovery.symlink_loops)
 
-        if all_items:
-            self._write_results(all_items, output_csv, duplicates)
+        if all_items.count:
+            try:
+                self._write_results(all_items, output_path, duplicates)
+            finally:
+                all_items.close()
+            save_report_meta(output_path, self._report_fingerprint())
             self._print_statistics()
         else:
-            print("PHP-файлы не найдены или не содержат анализируемых элементов.")
+            logger.warning("PHP-файлы не найдены или не содержат анализируемых элементов.")
             if self.debug:
                 # Протестируем парсинг на одном файле с максимальной отладкой
-                test_file = php_files[0]
-                print(f"\nТестовый парсинг файла: {test_file}")
+                test_file = first_file
+                logger.debug("\nТестовый парсинг файла: %s", test_file)
                 self._test_parse_file(test_file)
 
-    def _process_file(self, file_path: Path) -> List[Dict]:
-        """Обрабатывает один файл"""
-        elements = self.php_parser.parse_file(file_path)
-        items = []
-        relative_path = get_relative_path(file_path, self.base_dir)
+        log_event(logger, logging.INFO, 'analysis_finished', "Анализ завершен за %.2f с",
+                  time.monotonic() - started, files=files_count, rows=all_items.count,
+                  seconds=round(time.monotonic() - started, 3))
+
+    async def analyze_iter(self, directory: str | Path, concurrency: Optional[int] = None) -> AsyncIterator[ReportItem]:
+        """Асинхронно анализирует директорию и выдает строки отчета по мере разбора файлов.
+
+        PHP-воркеры запускаются через asyncio.create_subprocess_exec, одновременно
+        разбирается не больше concurrency файлов (по умолчанию - jobs анализатора).
+        Строки файла выдаются сразу после его разбора, файлы - в порядке завершения.
+        Отмена задачи или выход из цикла останавливает разбор и воркеры. Статистика
+        накапливается в stats, found_-файлы и отчет о сбоях записываются, как при
+        analyze_directory; одновременные анализы - разные экземпляры анализатора.
+        """
+        self.base_dir = Path(directory)
+        pool = AsyncParserPool(jobs=concurrency or self.parser_pool.jobs, **self.pool_options)
+        log_event(logger, logging.INFO, 'analysis_started', "Поиск PHP файлов в: %s", self.base_dir.absolute(),
+                  directory=str(self.base_dir.absolute()))
+        try:
+            async with aclosing(pool.parse_files(self.create_discovery(self.base_dir))) as parsed:
+                async for file_path, elements in parsed:
+                    # Поиск описаний (и запросы к хранилищу), запись found_-файлов - в потоке пула
+                    items = await pool.run_blocking(self._process_file, file_path, elements)
+                    for item in sorted(items, key=ItemSorter.line_key):
+                        yield item
+            await pool.run_blocking(self._write_failure_report, pool.failures)
+        finally:
+            await pool.close()
+            # Запись кэша и found_-файлов не занимает цикл событий
+            await asyncio.to_thread(self._finish_async_run)
+
+    def _finish_async_run(self):
+        """Сохраняет кэш разбора и найденные описания после analyze_iter"""
+        if self.parse_cache is not None:
+            self.parse_cache.flush()
+        self.description_manager.flush_found_descriptions()
+
+    @profiler.timed('analyze_shard')
+    def analyze_shard(self, directory: str | Path, output_path: str | Path, shard: Tuple[int, int],
+                      shard_dir: str | Path = Config.SHARD_DIR) -> Path:
+        """Анализирует часть файлов директории и сохраняет частичный результат для команды merge"""
+        self.base_dir = Path(directory)
+        index, count = shard
+        result_dir = shard_directory(shard_dir, shard)
+        create_directory(result_dir)
+        report_path = result_dir / Path(output_path).name
+        if self.failure_report is not None:
+            self.failure_report = result_dir / Path(self.failure_report).name
+        # found_- и empty_-файлы пишет merge, шард только передает ему описания
+        self.description_manager.flush_every = 0
+        self.shard_found = []
+
+        started = time.monotonic()
+        log_event(logger, logging.INFO, 'analysis_started', "Шард %d из %d, поиск PHP файлов в: %s",
+                  index, count, self.base_dir.absolute(), directory=str(self.base_dir.absolute()),
+                  shard=f"{index}/{count}")
+
+        # Все шарды обходят проект целиком: номер файла в общем порядке обхода
+        # нужен merge, чтобы записать found_-файлы в порядке запуска без шардов
+        positions = {}
+        discovered = 0
+
+        def shard_files():
+            nonlocal discovered
+            for file_path in profiler.timed_iter('discovery', self.create_discovery(self.base_dir)):
+                relative_path = get_relative_path(file_path, self.base_dir)
+                if shard_of(relative_path, count) == index:
+                    positions[relative_path] = discovered
+                    yield file_path
+                discovered += 1
+
+        all_items, files_count = self._collect_items(shard_files(), defaultdict(int))
+        logger.info("Найдено PHP файлов: %d из %d", files_count, discovered)
+        try:
+            if all_items.count:
+                self.report_writer.write_sorted(all_items, report_path)
+            else:
+                report_path.unlink(missing_ok=True)
+        finally:
+            all_items.close()
+
+        save_shard_result(result_dir, {
+            'shard': [index, count],
+            'fingerprint': self._report_fingerprint(),
+            'output': str(output_path),
+            'descriptions': str(self.descriptions_dir),
+            'description_store': None if self.description_store is None else str(self.description_store),
+            'report': report_path.name if all_items.count else None,
+            'rows': all_items.count,
+            'files': files_count,
+            'discovered': discovered,
+            'stats': {key: dict(values) for key, values in self.stats.items()},
+            'empty': {item_type: sorted(names)
+                      for item_type, names in self.description_manager.empty_descriptions.items()},
+            'found': [[positions[relative_path], item_type, name, desc]
+                      for relative_path, item_type, name, desc in self.shard_found],
+            'failures': self._failure_entries(self.parser_pool.failures),
+        })
+        log_event(logger, logging.INFO, 'shard_written', "Результат шарда сохранен в %s", result_dir,
+                  output=str(result_dir), files=files_count, rows=all_items.count)
+        if all_items.count:
+            self._print_statistics()
+
+        log_event(logger, logging.INFO, 'analysis_finished', "Анализ завершен за %.2f с",
+                  time.monotonic() - started, files=files_count, rows=all_items.count,
+                  seconds=round(time.monotonic() - started, 3))
+        return result_dir
+
+    @profiler.timed('patch_report')
+    def patch_report(self, directory: str | Path, output_path: str | Path, changed_paths: Iterable[str]) -> None:
+        """Обновляет существующий отчет, заново анализируя только измененные файлы"""
+        self.base_dir = Path(directory)
+        output_path = Path(output_path)
+
+        # Строки неизмененных файлов берутся из прошлого отчета, поэтому он должен
+        # быть собран с теми же настройками и словарями описаний
+        if not output_path.exists() or load_report_meta(output_path) != self._report_fingerprint():
+            logger.info("Предыдущий отчет не найден или собран с другими настройками - выполняем полный анализ")
+            self.analyze_directory(directory, output_path)
+            return
 
-        for element in elements:
-            item = self._process_element(element, relative_path)
-            if item:
-                items.append(item)
+        discovery = self.create_discovery(self.base_dir)
+        changed = {str(Path(path)) for path in changed_paths}
+        to_analyze = sorted(path for path in changed
+                            if (self.base_dir / path).is_file() and discovery.accepts(path))
+        logger.info("Изменено файлов: %d, к повторному анализу: %d", len(changed), len(to_analyze))
+
+        duplicates = defaultdict(int)
+        new_items, _ = self._collect_items((self.base_dir / path for path in to_analyze), duplicates,
+                                           len(to_analyze))
+        try:
+            old_items = self.report_writer.read_items(output_path, changed, self.TYPE_MAPPING)
+            # Каждый путь целиком либо в старом отчете, либо среди новых элементов
+            merged = heapq.merge(old_items, new_items, key=ItemSorter.path_key)
+            tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+            self.report_writer.write_sorted(merged, tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            new_items.close()
+
+        self.description_manager.save_empty_descriptions()
+        log_event(logger, logging.INFO, 'report_written', "Результаты обновлены в %s", output_path,
+                  output=str(output_path), files=len(to_analyze))
+        self._print_statistics()
+
+    def _collect_items(self, files: Iterable[Path], duplicates: Dict,
+                       total: int | Iterable[Path] | None = None) -> Tuple[ItemSorter, int]:
+        """Разбирает файлы и собирает упорядоченные элементы отчета.
+
+        total - число файлов для ETA или обход, по которому оно считается в фоне.
+        """
+        # Элементы упорядочиваются пофайлово, а при превышении буфера сбрасываются на диск
+        all_items = ItemSorter(self.sort_buffer)
+        files_count = 0
+        progress = ProgressReporter(total=total if isinstance(total, int) else None)
+        if total is not None and not isinstance(total, int):
+            progress.count_total(total)
+        self.parser_pool.failures.clear()
+
+        try:
+            for file_path, elements in self.parser_pool.parse_files(files):
+                files_count += 1
+                progress.update()
+                logger.log(VERBOSE, "Обработка файла: %s", file_path)
+                file_items = self._process_file(file_path, elements)
+
+                if file_items:
+                    logger.log(VERBOSE, "  Извлечено элементов: %d", len(file_items))
+
+                for item in file_items:
+                    self._check_duplicates(item, duplicates)
+                all_items.add_file_items(file_items)
+            self._write_failure_report()
+        except BaseException:
+            all_items.close()
+            raise
+        finally:
+            progress.finish()
+            self.parser_pool.close()
+            if self.parse_cache is not None:
+                self.parse_cache.flush()
+            if self.shard_found is None:
+                self.description_manager.flush_found_descriptions()
+
+        return all_items, files_count
+
+    def _write_failure_report(self, failures: Optional[List[ParseFailure]] = None):
+        """Записывает список файлов, которые не удалось разобрать, или удаляет список прошлого запуска"""
+        if self.failure_report is not None:
+            self.write_failure_report(self.failure_report,
+                                      self._failure_entries(self.parser_pool.failures if failures is None
+                                                            else failures))
+
+    def _failure_entries(self, failures: List[ParseFailure]) -> List[Dict]:
+        """Записи отчета о сбоях разбора с путями относительно директории анализа"""
+        return [{
+            'path': get_relative_path(failure.path, self.base_dir),
+            'error': failure.error,
+            'attempts': failure.attempts,
+            'quarantine': failure.quarantine,
+        } for failure in sorted(failures, key=lambda failure: failure.path)]
+
+    @staticmethod
+    def write_failure_report(path: str | Path, entries: List[Dict]):
+        """Записывает отчет о сбоях разбора, пустой список удаляет отчет прошлого запуска"""
+        path = Path(path)
+        if not entries:
+            path.unlink(missing_ok=True)
+            return
+
+        atomic_write_json(path, entries)
+        log_event(logger, logging.WARNING, 'parse_failures', "Не удалось разобрать файлов: %d, список в %s",
+                  len(entries), path, output=str(path), files=len(entries))
+
+    def _report_fingerprint(self) -> Dict:
+        """Параметры, от которых зависит содержимое отчета"""
+        return {
+            'parser': PHPParser.script_version(),
+            'php_parser': self.environment.php_parser_version(),
+            'exact_match': self.exact_match,
+            'full_names': self.full_names,
+            'include_lines': Config.INCLUDE_LINE_NUMBERS,
+            'format': self.report_writer.FORMAT,
+            'compression': self.report_writer.compression,
+            'discovery': {key: list(value) if isinstance(value, (list, tuple)) else value
+                          for key, value in self.discovery_options.items()},
+            'descriptions': self.description_manager.describe_sources(),
+        }
+
+    def create_discovery(self, directory: str | Path) -> FileDiscovery:
+        """Создает обход файлов директории с настройками анализатора"""
+        return FileDiscovery(directory, **self.discovery_options)
+
+    def _process_file(self, file_path: Path, elements: List[Element]) -> List[ReportItem]:
+        """Обрабатывает элементы одного файла"""
+        items = []
+        # Одна строка пути на все элементы файла
+        relative_path = sys.intern(get_relative_path(file_path, self.base_dir))
+        # Нумерация элементов класса ведется отдельно для каждого файла
+        class_items = 0
+
+        with profiler.span('process_file', file_path):
+            for element in elements:
+                item_number, class_items = self._get_item_number(element.type, class_items)
+                item = self._process_element(element, relative_path, item_number)
+                if item:
+                    items.append(item)
 
         return items
 
-    def _process_element(self, element: Dict, relative_path: str) -> Optional[Dict]:
+    def _process_element(self, element: Element, relative_path: str, item_number: int) -> Optional[ReportItem]:
         """Обрабатывает один элемент"""
-        item_type = element['type']
+        item_type = element.type
         self.stats['total'][item_type] += 1
 
-        name = element['name']
-        short_name = element.get('short_name', '')
-        desc = element['desc']  # Описание из PHP DocBlock
-        line_number = element.get('startLine', 0)
+        name = element.name
+        short_name = element.short_name
+        line_number = element.line
 
         # Ищем описание в JSON файлах
         json_description, found = self.description_manager.get_description(
@@ -119,20 +458,23 @@ class PHPAnalyzer:
 
         if found:
             self.stats['found'][item_type] += 1
-            desc = json_description or desc  # Используем описание из JSON если найдено
         else:
             self.stats['missing'][item_type] += 1
 
+        # Используем описание из JSON если найдено, DocBlock разбираем только без него
+        desc = json_description if found and json_description else clean_comment(element.doc)
+
         # ВАЖНО: Сохраняем описание из PHP DocBlock в found_ файлы ТОЛЬКО если не нашли в JSON
         if desc.strip() and not found:  # Если есть описание из DocBlock И не нашли в JSON
-            self.description_manager._save_found_description(item_type, name, desc)
+            saved = self.description_manager._save_found_description(item_type, name, desc)
+            if saved and self.shard_found is not None:
+                self.shard_found.append((relative_path, item_type, name, desc))
 
         # Обновляем статистику пустых описаний
         if not desc.strip():
             self.stats['empty'][item_type] += 1
 
         display_name = self._get_display_name(name, short_name)
-        item_number = self._get_item_number(item_type, name)
 
         item_data = self._build_item_data(
             relative_path, display_name, item_type, desc, item_number, line_number
@@ -144,76 +486,79 @@ class PHPAnalyzer:
         """Возвращает отображаемое имя"""
         return short_name if (not self.full_names and short_name) else name
 
-    def _get_item_number(self, item_type: str, name: str) -> int:
-        """Определяет номер элемента"""
+    def _get_item_number(self, item_type: str, class_items: int) -> Tuple[int, int]:
+        """Определяет номер элемента и новое значение счетчика элементов класса"""
         if item_type in self.CLASS_ITEMS:
             if item_type == 'class':
-                self.current_class = name
-                self.current_class_items = 1
-                return 1
-            else:
-                item_number = self.current_class_items
-                self.current_class_items += 1
-                return item_number
-        return 1
+                return 1, 1
+            return class_items, class_items + 1
+        return 1, class_items
 
     def _build_item_data(self, relative_path: str, name: str, item_type: str,
-                         description: str, item_number: int, line_number: int) -> Dict:
+                         description: str, item_number: int, line_number: int) -> ReportItem:
         """Создает данные элемента"""
-        item_data = {
-            'relative_path': relative_path,
-            'name': name,
-            'type': item_type,
-            'type_ru': self.TYPE_MAPPING.get(item_type, item_type),
-            'description': description,
-            'item_number': item_number
-        }
-
-        if Config.INCLUDE_LINE_NUMBERS:
-            item_data['line_number'] = line_number
-
-        return item_data
+        # Без номеров строк элементы файла остаются в порядке вывода парсера
+        return ReportItem(relative_path, item_number, name, item_type,
+                          self.TYPE_MAPPING.get(item_type, item_type), description,
+                          line_number if Config.INCLUDE_LINE_NUMBERS else 0)
 
-    def _check_duplicates(self, item: Dict, duplicates: Dict):
+    def _check_duplicates(self, item: ReportItem, duplicates: Dict):
         """Проверяет дубликаты"""
         if not Config.CHECK_FOR_DUPLICATES:
             return
 
-        if item['type'] in ['method', 'property', 'class_constant', 'function', 'variable']:
-            key = self._get_duplicate_key(item)
-            duplicates[key].append({
-                'file': item['relative_path'],
-                'line': item.get('line_number', 0)
-            })
+        if item.type in ['method', 'property', 'class_constant', 'function', 'variable']:
+            # Храним только количество вхождений, чтобы память не росла с числом элементов
+            duplicates[self._get_duplicate_key(item)] += 1
 
-    def _get_duplicate_key(self, item: Dict) -> tuple:
+    def _get_duplicate_key(self, item: ReportItem) -> tuple:
         """Возвращает ключ для проверки дубликатов"""
-        if item['type'] in ['method', 'property', 'class_constant']:
-            return (item['name'].split('::')[-1], item['type'])
-        return (item['name'], item['type'])
+        if item.type in ['method', 'property', 'class_constant']:
+            return (item.name.split('::')[-1], item.type)
+        return (item.name, item.type)
 
-    def _write_results(self, items: List[Dict], output_csv: str | Path, duplicates: Dict):
+    def _write_results(self, items: ItemSorter, output_path: str | Path, duplicates: Dict):
         """Записывает результаты"""
-        self.csv_writer.write_to_csv(items, output_csv)
+        self.report_writer.write_sorted(items, output_path)
         self.description_manager.save_empty_descriptions()
-        print(f"Результаты сохранены в {output_csv}")
+        log_event(logger, logging.INFO, 'report_written', "Результаты сохранены в %s", output_path,
+                  output=str(output_path), rows=items.count)
 
     def _print_statistics(self):
         """Выводит статистику"""
-        print("\nСтатистика анализа:")
-        print("{:<15} {:<10} {:<10} {:<10} {:<10}".format(
+        self.print_item_statistics(self.stats)
+        if self.parse_cache is not None:
+            logger.info("\nКэш разбора: попаданий %d, промахов %d, вытеснено %d",
+                        self.parse_cache.hits, self.parse_cache.misses, self.parse_cache.evictions)
+        if self.parser_pool.prefilter is not None:
+            logger.info("Предфильтр: пропущено файлов без объявлений %d из %d",
+                        self.parser_pool.prefilter.skipped, self.parser_pool.prefilter.checked)
+        if self.parser_pool.deduplicated:
+            logger.info("Одинаковое содержимое: разборов сэкономлено %d", self.parser_pool.deduplicated)
+        if self.parser_pool.recycles:
+            logger.info("Плановых перезапусков PHP-воркеров: %d", self.parser_pool.recycles)
+        if self.parser_pool.extractor is not None:
+            logger.info("Встроенный разбор: файлов %d, передано PHP-парсеру %d",
+                        self.parser_pool.fast_parsed, self.parser_pool.fallbacks)
+        # Выводим статистику найденных описаний
+        self.description_manager.print_found_statistics()
+
+    @classmethod
+    def print_item_statistics(cls, stats: Dict[str, Dict[str, int]]):
+        """Выводит таблицу элементов по типам"""
+        log_event(logger, logging.INFO, 'statistics', "\nСтатистика анализа:",
+                  **{key: dict(values) for key, values in stats.items()})
+        logger.info("{:<15} {:<10} {:<10} {:<10} {:<10}".format(
             "Тип", "Всего", "Найдено", "Нет опис.", "Пустые"))
 
-        for item_type, ru_name in self.TYPE_MAPPING.items():
-            print("{:<15} {:<10} {:<10} {:<10} {:<10}".format(
+        for item_type, ru_name in cls.TYPE_MAPPING.items():
+            logger.info("{:<15} {:<10} {:<10} {:<10} {:<10}".format(
                 ru_name,
-                self.stats['total'].get(item_type, 0),
-                self.stats['found'].get(item_type, 0),
-                self.stats['missing'].get(item_type, 0),
-                self.stats['empty'].get(item_type, 0)
+                stats['total'].get(item_type, 0),
+                stats['found'].get(item_type, 0),
+                stats['missing'].get(item_type, 0),
+                stats['empty'].get(item_type, 0)
             ))
-        # Выводим статистику найденных описаний
-        self.description_manager.print_found_statistics()
 
     def _test_parse_file(self, file_path: Path):
         """Тестовый парсинг файла для диагностики"""
@@ -221,8 +566,8 @@ class PHPAnalyzer:
             # Прочитаем содержимое файла
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            print(f"Размер файла: {len(content)} символов")
-            print(f"Первые 200 символов: {content[:200]}...")
+            logger.debug("Размер файла: %d символов", len(content))
+            logger.debug("Первые 200 символов: %s...", content[:200])
 
             # Запустим PHP парсер вручную для отладки
             result = subprocess.run(
@@ -232,9 +577,9 @@ class PHPAnalyzer:
                 check=True
             )
 
-            print(f"PHP stdout: {result.stdout[:500]}...")
+            logger.debug("PHP stdout: %s...", result.stdout[:500])
             if result.stderr:
-                print(f"PHP stderr: {result.stderr}")
+                logger.debug("PHP stderr: %s", result.stderr)
 
         except Exception as e:
-            print(f"Ошибка тестового парсинга: {e}")
\ No newline at end of file
+            logger.debug("Ошибка тестового парсинга: %s", e)
\ No newline at end of file
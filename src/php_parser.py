@@ -1,18 +1,26 @@
+import hashlib
 import json
-import subprocess
+import logging
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .config import Config
+from .log import get_logger, log_event
+from .php_worker import PHPWorker, PHPWorkerError, PHPWorkerStartError, PHPWorkerTimeout
+from .profiler import profiler
+from .report_item import Element
+
+logger = get_logger('parser')
 
 
 class PHPParser:
-    def __init__(self, debug: bool = False):
-        self.debug = debug
-        self._create_php_parser_script()
+    # Версия протокола воркера и типы элементов по кодам (PROTOCOL_VERSION и ELEMENT_TYPES в PHP_SCRIPT)
+    PROTOCOL_VERSION = 3
+    ELEMENT_TYPES = ('class', 'method', 'property', 'function', 'variable', 'constant', 'class_constant')
+    # Ошибки разбора одного файла: файл получает пустой список элементов
+    PARSE_ERRORS = (PHPWorkerError, json.JSONDecodeError, KeyError, IndexError, TypeError)
 
-    def _create_php_parser_script(self):
-        """Создает PHP-скрипт для анализа AST"""
-        php_script = r"""<?php
+    # PHP-скрипт для анализа AST, записывается в Config.PHP_PARSER_SCRIPT
+    PHP_SCRIPT = r"""<?php
 require 'vendor/autoload.php';
 
 use PhpParser\Error;
@@ -32,7 +40,7 @@ class ElementVisitor extends NodeVisitorAbstract {
             $this->elements[] = [
                 'type' => 'class',
                 'name' => $this->currentClass,
-                'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                'doc' => $this->docComment($node),
                 'startLine' => $node->getStartLine()
             ];
         }
@@ -41,7 +49,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                 'type' => 'method',
                 'name' => $this->currentClass . '::' . $node->name->toString(),
                 'short_name' => $node->name->toString(),
-                'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                'doc' => $this->docComment($node),
                 'startLine' => $node->getStartLine()
             ];
             $this->inFunction = true;
@@ -52,7 +60,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                     'type' => 'property',
                     'name' => $this->currentClass . '::$' . $prop->name->toString(),
                     'short_name' => $prop->name->toString(),
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -63,7 +71,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                     'type' => 'class_constant',
                     'name' => $this->currentClass . '::' . $const->name->toString(),
                     'short_name' => $const->name->toString(),
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -72,7 +80,7 @@ class ElementVisitor extends NodeVisitorAbstract {
             $this->elements[] = [
                 'type' => 'function',
                 'name' => $node->name->toString(),
-                'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                'doc' => $this->docComment($node),
                 'startLine' => $node->getStartLine()
             ];
             $this->inFunction = true;
@@ -83,7 +91,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                 $this->elements[] = [
                     'type' => 'variable',
                     'name' => '$' . $varName,
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -93,7 +101,7 @@ class ElementVisitor extends NodeVisitorAbstract {
                 $this->elements[] = [
                     'type' => 'constant',
                     'name' => $const->name->toString(),
-                    'desc' => $node->getDocComment() ? $this->cleanComment($node->getDocComment()->getText()) : '',
+                    'doc' => $this->docComment($node),
                     'startLine' => $node->getStartLine()
                 ];
             }
@@ -109,103 +117,220 @@ class ElementVisitor extends NodeVisitorAbstract {
         }
     }
 
-    private function cleanComment(string $comment): string {
-        // Удаляем открывающие и закрывающие теги комментариев PHP
-        $comment = preg_replace('/^\/\*\*|\*\/$/', '', $comment);
-        
-        $lines = explode("\n", $comment);
-        $result = [];
-        
-        foreach ($lines as $line) {
-            $line = trim($line);
-            
-            // Удаляем начальные звездочки и пробелы
-            if (str_starts_with($line, '*')) {
-                $line = substr($line, 1);
-            }
-            
-            $line = trim($line);
-            
-            // Пропускаем пустые строки и аннотации
-            if (!$line || str_starts_with($line, '@')) {
-                continue;
-            }
-            
-            $result[] = $line;
-        }
-        
-        $cleanText = implode(' ', $result);
-        
-        // Проверяем, содержит ли текст латинские символы
-        if (preg_match('/[a-zA-Z]/', $cleanText)) {
-            // Ищем первую точку в тексте
-            $firstDotPos = strpos($cleanText, '.');
-            
-            if ($firstDotPos !== false) {
-                // Обрезаем до первой точки (включая саму точку)
-                $cleanText = substr($cleanText, 0, $firstDotPos + 1);
-            } else {
-                // Если точки нет, ограничиваем 10 словами
-                $words = preg_split('/\s+/', $cleanText);
-                if (count($words) > 10) {
-                    $cleanText = implode(' ', array_slice($words, 0, 10)) . '...';
-                }
-            }
-        }
-        
-        return trim($cleanText);
+    /**
+     * Возвращает исходный текст DocBlock узла: описание из него получает
+     * анализатор и только для элементов, которых нет в JSON-словарях
+     */
+    private function docComment(Node $node): string {
+        $comment = $node->getDocComment();
+        return $comment ? $comment->getText() : '';
     }
 }
 
-$code = file_get_contents($argv[1]);
-$parser = (new ParserFactory())->createForHostVersion();
-$traverser = new NodeTraverser();
-$visitor = new ElementVisitor();
-$traverser->addVisitor($visitor);
+/**
+ * Извлекает элементы из PHP-кода
+ */
+function extractElements($parser, string $code): array {
+    $traverser = new NodeTraverser();
+    $visitor = new ElementVisitor();
+    $traverser->addVisitor($visitor);
 
-try {
     $stmts = $parser->parse($code);
     if ($stmts !== null) {
         $traverser->traverse($stmts);
     }
-    echo json_encode($visitor->elements);
+    return $visitor->elements;
+}
+
+// Версия протокола воркера и коды типов элементов (совпадают с PHPParser в Python)
+const PROTOCOL_VERSION = 3;
+const ELEMENT_TYPES = [
+    'class' => 0,
+    'method' => 1,
+    'property' => 2,
+    'function' => 3,
+    'variable' => 4,
+    'constant' => 5,
+    'class_constant' => 6,
+];
+
+/**
+ * Упаковывает элементы по столбцам: имена полей передаются один раз на файл
+ */
+function packElements(array $elements): array {
+    $columns = ['type' => [], 'name' => [], 'short_name' => [], 'doc' => [], 'line' => []];
+    foreach ($elements as $element) {
+        $columns['type'][] = ELEMENT_TYPES[$element['type']];
+        $columns['name'][] = $element['name'];
+        $columns['short_name'][] = $element['short_name'] ?? '';
+        $columns['doc'][] = $element['doc'];
+        $columns['line'][] = $element['startLine'];
+    }
+    return $columns;
+}
+
+/**
+ * Обрабатывает один запрос воркера и возвращает ответ
+ */
+function handleRequest($parser, array $request): array {
+    $path = (string)($request['path'] ?? '');
+    $response = ['v' => PROTOCOL_VERSION, 'elements' => packElements([]), 'error' => null];
+
+    try {
+        $code = array_key_exists('code', $request) ? $request['code'] : @file_get_contents($path);
+        if ($code === false || $code === null) {
+            $response['error'] = "Cannot read {$path}";
+        } else {
+            $response['elements'] = packElements(extractElements($parser, $code));
+        }
+    } catch (Error $error) {
+        $response['error'] = "Parse error in {$path}: {$error->getMessage()}";
+    } catch (Throwable $error) {
+        $response['error'] = "Failure in {$path}: {$error->getMessage()}";
+    }
+
+    return $response;
+}
+
+$parser = (new ParserFactory())->createForHostVersion();
+
+if (($argv[1] ?? '') === '--worker') {
+    // Режим постоянного воркера: один JSON-запрос на строку stdin,
+    // ответ - строка с длиной в байтах и JSON-документ этой длины
+    // с элементами по столбцам (см. packElements)
+    while (($line = fgets(STDIN)) !== false) {
+        $line = trim($line);
+        if ($line === '') {
+            continue;
+        }
+
+        $request = json_decode($line, true);
+        $response = is_array($request)
+            ? handleRequest($parser, $request)
+            : ['v' => PROTOCOL_VERSION, 'elements' => packElements([]),
+               'error' => 'Invalid request: ' . json_last_error_msg()];
+
+        // Кириллица в описаниях передается байтами UTF-8, а не шестибайтовыми \uXXXX
+        $payload = json_encode($response, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES);
+        if ($payload === false) {
+            $payload = json_encode(
+                ['v' => PROTOCOL_VERSION, 'elements' => packElements([]),
+                 'error' => 'JSON encode error: ' . json_last_error_msg()],
+                JSON_INVALID_UTF8_SUBSTITUTE
+            );
+        }
+
+        fwrite(STDOUT, strlen($payload) . "\n" . $payload);
+        fflush(STDOUT);
+    }
+    exit(0);
+}
+
+$code = file_get_contents($argv[1]);
+
+try {
+    echo json_encode(extractElements($parser, $code));
 } catch (Error $error) {
     file_put_contents('php://stderr', "Parse error in {$argv[1]}: {$error->getMessage()}\n");
     echo '[]';
 }
 """
-        with open(Config.PHP_PARSER_SCRIPT, 'w', encoding='utf-8') as f:
-            f.write(php_script)
 
-    def parse_file(self, file_path: Path) -> List[Dict]:
+    def __init__(self, debug: bool = False, timeout: float = Config.PARSE_TIMEOUT,
+                 memory_limit_mb: int = Config.PARSE_MEMORY_LIMIT_MB,
+                 max_files: int = Config.WORKER_MAX_FILES, max_rss_mb: float = Config.WORKER_MAX_RSS_MB):
+        self.debug = debug
+        # Ошибка последнего разбора при сбое воркера (результат нельзя кэшировать)
+        self.last_error: Optional[str] = None
+        # Воркер не запустился: сбой не связан с содержимым файла
+        self.last_unavailable = False
+        self._create_php_parser_script()
+        # Один PHP-процесс обслуживает файлы до планового перезапуска
+        self.worker = PHPWorker(Config.PHP_PARSER_SCRIPT, timeout=timeout, memory_limit_mb=memory_limit_mb,
+                                max_files=max_files, max_rss_mb=max_rss_mb)
+
+    @property
+    def last_failed(self) -> bool:
+        """Последний разбор завершился сбоем воркера"""
+        return self.last_error is not None
+
+    def _create_php_parser_script(self):
+        """Создает PHP-скрипт для анализа AST, если его еще нет или содержимое отличается"""
+        script_path = Path(Config.PHP_PARSER_SCRIPT)
+        try:
+            if hashlib.sha256(script_path.read_bytes()).hexdigest()[:16] == self.script_version():
+                return
+        except OSError:
+            pass
+        script_path.write_bytes(self.PHP_SCRIPT.encode('utf-8'))
+
+    @classmethod
+    def script_version(cls) -> str:
+        """Возвращает хэш PHP-скрипта для ключей кэша"""
+        return hashlib.sha256(cls.PHP_SCRIPT.encode('utf-8')).hexdigest()[:16]
+
+    def parse_file(self, file_path: Path) -> List[Element]:
         """Парсит PHP-файл и возвращает элементы"""
+        self._begin_parse(file_path)
         try:
-            if self.debug:
-                print(f"  Парсинг файла: {file_path}")
-
-            result = subprocess.run(
-                ['php', Config.PHP_PARSER_SCRIPT, str(file_path)],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-
-            if result.stderr:
-                print(f"  Предупреждение: {result.stderr.strip()}")
-
-            elements = json.loads(result.stdout) if result.stdout else []
-
-            if self.debug:
-                print(f"  Найдено элементов: {len(elements)}")
-                for element in elements:
-                    print(f"    - {element['type']}: {element['name']}")
-
-            return elements
-
-        except subprocess.CalledProcessError as e:
-            print(f"  Ошибка парсинга: {e.stderr}")
-            return []
-        except json.JSONDecodeError as e:
-            print(f"  Ошибка декодирования JSON: {e}")
-            print(f"  Raw output: {result.stdout[:200]}...")
-            return []
\ No newline at end of file
+            with profiler.span('parse_file', file_path):
+                response = self.worker.request({'path': str(file_path)})
+            return self._read_response(file_path, response)
+        except self.PARSE_ERRORS as e:
+            return self._parse_failed(file_path, e)
+
+    def _begin_parse(self, file_path: Path):
+        """Сбрасывает результат прошлого разбора"""
+        self.last_error = None
+        self.last_unavailable = False
+        if self.debug:
+            logger.debug("  Парсинг файла: %s", file_path)
+
+    def _read_response(self, file_path: Path, response: Dict) -> List[Element]:
+        """Проверяет ответ воркера и возвращает элементы файла"""
+        if response.get('error'):
+            log_event(logger, logging.WARNING, 'parse_warning', "  Предупреждение: %s", response['error'],
+                      path=str(file_path), error=response['error'])
+
+        if response.get('v') != self.PROTOCOL_VERSION:
+            raise PHPWorkerError(f"Неподдерживаемая версия протокола воркера: {response.get('v')!r}")
+        elements = self.unpack_elements(response['elements'])
+
+        if self.debug:
+            logger.debug("  Найдено элементов: %d", len(elements))
+            for element in elements:
+                logger.debug("    - %s: %s", element.type, element.name)
+
+        return elements
+
+    def _parse_failed(self, file_path: Path, error: Exception) -> List[Element]:
+        """Запоминает сбой разбора и возвращает пустой список элементов"""
+        if isinstance(error, PHPWorkerTimeout):
+            log_event(logger, logging.WARNING, 'parse_timeout', "  Превышено время разбора %s: %s", file_path, error,
+                      path=str(file_path), error=str(error))
+            self.last_error = f"Превышено время разбора: {error}"
+        elif isinstance(error, PHPWorkerError):
+            log_event(logger, logging.WARNING, 'parse_error', "  Ошибка парсинга %s: %s", file_path, error,
+                      path=str(file_path), error=str(error))
+            self.last_error = str(error)
+            self.last_unavailable = isinstance(error, PHPWorkerStartError)
+        elif isinstance(error, json.JSONDecodeError):
+            log_event(logger, logging.WARNING, 'parse_error', "  Ошибка декодирования JSON %s: %s", file_path, error,
+                      path=str(file_path), error=str(error))
+            self.last_error = f"Ошибка декодирования JSON: {error}"
+        else:
+            log_event(logger, logging.WARNING, 'parse_error', "  Некорректный ответ воркера для %s: %r",
+                      file_path, error, path=str(file_path), error=repr(error))
+            self.last_error = f"Некорректный ответ воркера: {error!r}"
+        return []
+
+    @classmethod
+    def unpack_elements(cls, columns: Dict[str, list]) -> List[Element]:
+        """Собирает элементы из ответа воркера, упакованного по столбцам"""
+        types = [cls.ELEMENT_TYPES[code] for code in columns['type']]
+        return list(map(Element._make, zip(types, columns['name'], columns['short_name'],
+                                           columns['doc'], columns['line'])))
+
+    def close(self):
+        """Останавливает PHP-воркер"""
+        self.worker.close()
@@ -0,0 +1,136 @@
+import re
+from typing import Iterator, NamedTuple
+
+# Виды лексем
+OPEN_TAG = 'open_tag'
+INLINE_HTML = 'html'
+COMMENT = 'comment'
+DOC_COMMENT = 'doc'
+VARIABLE = 'variable'
+NAME = 'name'
+NUMBER = 'number'
+STRING = 'string'
+OP = 'op'
+
+_IDENT = r'[a-zA-Z_\x80-\U0010ffff][a-zA-Z0-9_\x80-\U0010ffff]*'
+
+# Лексемы PHP-кода. Пробельные символы - только [ \t\n\r], как в лексере PHP;
+# незавершенные комментарии и строки, атрибуты #[...] попадают в группу bad
+_PHP_TOKEN = re.compile('[ \t\n\r]*(?:' + '|'.join((
+    r'(?P<doc>/\*\*[ \t\n\r].*?\*/)',
+    r'(?P<comment>/\*.*?\*/|(?://|#(?!\[))(?:[^\n?]|\?(?!>))*)',
+    rf'(?P<variable>\${_IDENT})',
+    rf'(?P<name>\\?{_IDENT}(?:\\{_IDENT})*)',
+    r'(?P<number>0[xX][0-9a-fA-F_]+|0[bB][01_]+|0[oO][0-7_]+'
+    r'|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d[\d_]*)?)',
+    r"(?P<string>'[^'\\]*(?:\\.[^'\\]*)*'|\"[^\"\\]*(?:\\.[^\"\\]*)*\"|`[^`\\]*(?:\\.[^`\\]*)*`)",
+    rf'(?P<heredoc><<<[ \t]*(?P<quote>["\']?)(?P<label>{_IDENT})(?P=quote)\r?\n)',
+    r'(?P<close_tag>\?>(?:\r?\n)?)',
+    r'(?P<bad>/\*|[\'"`]|#\[|<<<)',
+    r'(?P<op><=>|\*\*=|\.\.\.|<<=|>>=|===|!==|\?\?=|\?->|::|->|=>|==|!=|<>|<=|>=|&&|\|\||\?\?|\+\+|--'
+    r'|\+=|-=|\*=|/=|\.=|%=|&=|\|=|\^=|<<|>>|\*\*|[-+*/%=<>!&|^~.,;:?@$(){}\[\]\\])',
+)) + ')', re.S)
+# Лексемы, которые могут занимать несколько строк
+_MULTILINE = frozenset((DOC_COMMENT, COMMENT, STRING))
+
+# Открывающий тег: <?php с пробельным символом (или в конце файла) либо <?=
+_OPEN_TAG = re.compile(r'<\?(php(?:[ \t\n]|\r\n?|$)|=)?', re.I)
+_INTERPOLATION = re.compile(r'\{\$|\$\{')
+_LONE_CR = re.compile(r'\r(?!\n)')
+
+
+class UnsupportedSyntax(Exception):
+    """Конструкция, которую встроенный разбор не обрабатывает уверенно"""
+
+
+class Token(NamedTuple):
+    """Лексема PHP-кода"""
+
+    kind: str
+    text: str
+    line: int
+
+
+def tokenize(code: str) -> Iterator[Token]:
+    """Потоково разбирает PHP-код на лексемы (без пробельных), номера строк - как у лексера PHP"""
+    if _LONE_CR.search(code):
+        # Одиночный \r лексер PHP тоже считает переводом строки
+        raise UnsupportedSyntax('переводы строк \\r')
+
+    line = 1
+    pos = 0
+    length = len(code)
+    while pos < length:
+        # Встроенный HTML до открывающего тега
+        tag = _OPEN_TAG.search(code, pos)
+        end = tag.start() if tag else length
+        if end > pos:
+            yield Token(INLINE_HTML, code[pos:end], line)
+            line += code.count('\n', pos, end)
+        if tag is None:
+            return
+        if tag.group(1) is None:
+            raise UnsupportedSyntax('короткий открывающий тег <?')
+        yield Token(OPEN_TAG, tag.group(0), line)
+        line += tag.group(0).count('\n')
+        pos = tag.end()
+
+        # Код до закрывающего тега; пробельные символы входят в совпадение перед лексемой
+        while pos < length:
+            match = _PHP_TOKEN.match(code, pos)
+            if match is None:
+                if code[pos:].strip(' \t\n\r'):
+                    raise UnsupportedSyntax(f"нераспознанная конструкция в строке {line}")
+                return
+
+            kind = match.lastgroup
+            start = match.start(kind)
+            line += code.count('\n', pos, start)
+            if kind == 'bad':
+                raise UnsupportedSyntax(f"нераспознанная конструкция в строке {line}")
+
+            text = match.group(kind)
+            pos = match.end()
+            if kind == 'heredoc':
+                text, pos = _heredoc(code, match, line)
+                kind = STRING
+            elif kind == STRING and text[0] != "'":
+                _check_interpolation(text, line)
+
+            if kind == 'close_tag':
+                # Закрывающий тег завершает оператор, как точка с запятой
+                yield Token(OP, ';', line)
+                line += text.count('\n')
+                break
+            yield Token(kind, text, line)
+            if kind in _MULTILINE:
+                line += text.count('\n')
+
+
+def _heredoc(code: str, opener: re.Match, line: int):
+    """Возвращает текст heredoc/nowdoc целиком и позицию после закрывающей метки"""
+    label = re.compile(rf'^[ \t]*{re.escape(opener.group("label"))}(?![a-zA-Z0-9_\x80-\U0010ffff])', re.M)
+    closing = label.search(code, opener.end())
+    if closing is None:
+        raise UnsupportedSyntax(f"незавершенный heredoc в строке {line}")
+    text = code[opener.start('heredoc'):closing.end()]
+    if opener.group('quote') != "'":
+        _check_interpolation(text, line)
+    return text, closing.end()
+
+
+def _check_interpolation(text: str, line: int):
+    """Проверяет, что в выражениях {$...} и ${...} строки нет присваиваний"""
+    for match in _INTERPOLATION.finditer(text):
+        depth = 0
+        for end in range(match.start(), len(text)):
+            if text[end] == '{':
+                depth += 1
+            elif text[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            raise UnsupportedSyntax(f"незавершенная подстановка в строке {line}")
+        if '=' in text[match.start():end]:
+            raise UnsupportedSyntax(f"выражение в подстановке строки {line}")
@@ -0,0 +1,197 @@
+import json
+import os
+import selectors
+import subprocess
+import time
+from typing import Dict, List, Optional
+from .config import Config
+from .profiler import profiler
+
+# Размер страницы памяти для RSS из /proc/<pid>/statm
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class PHPWorkerError(Exception):
+    """Ошибка обмена данными с PHP-воркером"""
+
+
+class PHPWorkerTimeout(PHPWorkerError):
+    """PHP-воркер не ответил за отведенное время"""
+
+
+class PHPWorkerStartError(PHPWorkerError):
+    """Не удалось запустить процесс PHP-воркера"""
+
+
+class PHPWorker:
+    """Долгоживущий PHP-процесс, разбирающий файлы по одному запросу за раз.
+
+    Запрос - строка JSON в stdin, ответ - строка с длиной в байтах
+    и JSON-документ этой длины в stdout. Процесс перезапускается после
+    max_files ответов или когда его RSS превышает max_rss_mb (только Linux).
+    """
+
+    def __init__(self, script: str = Config.PHP_PARSER_SCRIPT,
+                 timeout: Optional[float] = Config.PARSE_TIMEOUT,
+                 command: Optional[List[str]] = None,
+                 memory_limit_mb: int = Config.PARSE_MEMORY_LIMIT_MB,
+                 max_files: int = Config.WORKER_MAX_FILES,
+                 max_rss_mb: float = Config.WORKER_MAX_RSS_MB):
+        memory_limit = f"{memory_limit_mb}M" if memory_limit_mb > 0 else '-1'
+        self.command = command or [
+            Config.PHP_BINARY, '-d', 'display_errors=stderr', '-d', f"memory_limit={memory_limit}",
+            script, '--worker'
+        ]
+        self.timeout = timeout
+        self.max_files = max_files
+        self.max_rss_mb = max_rss_mb
+        self.process: Optional[subprocess.Popen] = None
+        self.starts = 0
+        # Плановые перезапуски по числу файлов или памяти
+        self.recycles = 0
+        self.served = 0
+        self._buffer = b''
+
+    @property
+    def restarts(self) -> int:
+        """Количество перезапусков воркера"""
+        return max(self.starts - 1, 0)
+
+    def is_alive(self) -> bool:
+        """Проверяет, запущен ли процесс воркера"""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Запускает процесс воркера"""
+        self.close()
+        try:
+            with profiler.span('php_startup'):
+                self.process = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE
+                )
+        except OSError as e:
+            raise PHPWorkerStartError(f"Не удалось запустить воркер: {e}")
+        self._buffer = b''
+        self.served = 0
+        self.starts += 1
+
+    def close(self):
+        """Останавливает процесс воркера"""
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def kill(self):
+        """Принудительно завершает процесс воркера"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+        self.close()
+
+    def request(self, payload: Dict) -> Dict:
+        """Отправляет запрос воркеру и возвращает декодированный ответ"""
+        line = (json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8')
+
+        if not self.is_alive():
+            self.start()
+        try:
+            self._send(line)
+        except OSError:
+            # Воркер упал между запросами - перезапускаем и повторяем отправку
+            self.start()
+            try:
+                self._send(line)
+            except OSError as e:
+                self.kill()
+                raise PHPWorkerError(f"Не удалось отправить запрос воркеру: {e}")
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        try:
+            # Ожидание ответа - это время разбора AST на стороне PHP
+            with profiler.span('php_wait'):
+                header = self._read_line(deadline)
+                try:
+                    size = int(header)
+                except ValueError:
+                    raise PHPWorkerError(f"Некорректный заголовок ответа: {header[:200]!r}")
+                body = self._read_exact(size, deadline)
+        except PHPWorkerError:
+            self.kill()
+            raise
+
+        self.served += 1
+        if self._needs_recycle():
+            self.close()
+            self.recycles += 1
+
+        with profiler.span('json_decode'):
+            # json.loads разбирает UTF-8 байты без промежуточной строки
+            return json.loads(body)
+
+    def rss_mb(self) -> Optional[float]:
+        """Резидентная память процесса воркера в МБ, None - недоступно"""
+        if self.process is None:
+            return None
+        try:
+            with open(f"/proc/{self.process.pid}/statm", 'rb') as f:
+                pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return pages * _PAGE_SIZE / (1024 * 1024)
+
+    def _needs_recycle(self) -> bool:
+        """Проверяет, пора ли перезапустить воркер после очередного ответа"""
+        if self.max_files > 0 and self.served >= self.max_files:
+            return True
+        if self.max_rss_mb > 0:
+            rss = self.rss_mb()
+            return rss is not None and rss > self.max_rss_mb
+        return False
+
+    def _send(self, line: bytes):
+        """Записывает строку запроса в stdin воркера"""
+        self.process.stdin.write(line)
+        self.process.stdin.flush()
+
+    def _read_line(self, deadline: Optional[float]) -> bytes:
+        """Читает строку заголовка из stdout воркера"""
+        while b'\n' not in self._buffer:
+            self._fill_buffer(deadline)
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line.strip()
+
+    def _read_exact(self, size: int, deadline: Optional[float]) -> bytes:
+        """Читает ровно size байт из stdout воркера"""
+        while len(self._buffer) < size:
+            self._fill_buffer(deadline)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _fill_buffer(self, deadline: Optional[float]):
+        """Дочитывает порцию данных из stdout с учетом таймаута"""
+        fd = self.process.stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise PHPWorkerTimeout(f"Нет ответа за {self.timeout} с")
+            if not selector.select(remaining):
+                raise PHPWorkerTimeout(f"Нет ответа за {self.timeout} с")
+
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            code = self.process.poll()
+            raise PHPWorkerError(f"Воркер неожиданно завершился (код {code})")
+        self._buffer += chunk
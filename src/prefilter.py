@@ -0,0 +1,44 @@
+import mmap
+import re
+from pathlib import Path
+
+# Лексемы, с которых начинаются элементы отчета: объявления class, function и const
+# (за ключевым словом - пробел, комментарий или &) и присваивание переменной $x = ...
+# Шаблон намеренно шире синтаксиса PHP: лишнее совпадение стоит только разбора файла
+DECLARATION = re.compile(
+    rb'(?i:\b(?:class|function|const)(?:\s|/[*/]|#|&))'
+    rb'|\$[a-zA-Z_\x80-\xff][a-zA-Z0-9_\x80-\xff]*\s*(?:=(?![=>])|/[*/]|#)'
+)
+
+
+class PreFilter:
+    """Быстрая проверка файла перед разбором AST.
+
+    Файл без открывающего тега PHP или без лексем объявлений (шаблоны
+    представлений, массивы конфигурации) не может дать элементов, и его
+    разбор пропускается. Содержимое просматривается через mmap без чтения
+    файла в память.
+    """
+
+    def __init__(self):
+        self.checked = 0
+        self.skipped = 0
+
+    def accepts(self, file_path: Path) -> bool:
+        """Проверяет, может ли файл содержать элементы отчета"""
+        self.checked += 1
+        try:
+            with open(file_path, 'rb') as f:
+                if not f.seek(0, 2):
+                    # Пустой файл нельзя отобразить в память, элементов в нем нет
+                    self.skipped += 1
+                    return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    found = content.find(b'<?') != -1 and DECLARATION.search(content) is not None
+        except (OSError, ValueError):
+            # Ошибку чтения сообщит парсер
+            return True
+
+        if not found:
+            self.skipped += 1
+        return found
@@ -0,0 +1,145 @@
+import functools
+import math
+import statistics
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from .log import get_logger
+
+logger = get_logger('profiler')
+
+
+class _Span:
+    """Замер одного участка кода"""
+
+    __slots__ = ('profiler', 'phase', 'file', 'started')
+
+    def __init__(self, profiler: 'Profiler', phase: str, file: Optional[str]):
+        self.profiler = profiler
+        self.phase = phase
+        self.file = file
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.phase, time.perf_counter() - self.started, self.file)
+        return False
+
+
+class _NullSpan:
+    """Пустой замер, когда профилирование выключено"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """Сбор времени выполнения фаз анализа для --profile.
+
+    Фазы могут быть вложены (parse_file включает php_wait и json_decode),
+    поэтому их суммы не складываются в общее время.
+    """
+
+    # Внешние фазы обработки файла: время файла - их сумма, вложенные фазы только в подробностях
+    FILE_PHASES = ('prefilter', 'cache_lookup', 'fast_extract', 'parse_file', 'process_file')
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает накопленные замеры"""
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.file_times: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def span(self, phase: str, file: Optional[object] = None):
+        """Контекстный менеджер замера фазы, при наличии file время относится к файлу"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, phase, None if file is None else str(file))
+
+    def timed(self, phase: str) -> Callable:
+        """Декоратор, замеряющий каждый вызов функции как фазу"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, phase, None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def timed_iter(self, phase: str, iterable: Iterable) -> Iterator:
+        """Замеряет время получения каждого элемента итератора (например, обхода файлов)"""
+        if not self.enabled:
+            yield from iterable
+            return
+
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.record(phase, time.perf_counter() - started)
+                return
+            self.record(phase, time.perf_counter() - started)
+            yield item
+
+    def record(self, phase: str, seconds: float, file: Optional[str] = None):
+        """Добавляет замер фазы"""
+        with self._lock:
+            self.samples[phase].append(seconds)
+            if file is not None:
+                self.file_times[file][phase] += seconds
+
+    def report(self, top: int = 20) -> List[str]:
+        """Формирует таблицу фаз и список самых медленных файлов"""
+        lines = ["Профиль выполнения (время в мс):",
+                 "{:<20} {:>9} {:>11} {:>9} {:>9} {:>9}".format(
+                     "Фаза", "Вызовов", "Всего", "p50", "p95", "max")]
+        for phase, samples in sorted(self.samples.items(), key=lambda item: -sum(item[1])):
+            ordered = sorted(samples)
+            lines.append("{:<20} {:>9} {:>11.1f} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+                phase, len(ordered), sum(ordered) * 1000, statistics.median(ordered) * 1000,
+                self._percentile(ordered, 0.95) * 1000, ordered[-1] * 1000))
+
+        if self.file_times:
+            totals = {file: self._file_total(phases) for file, phases in self.file_times.items()}
+            slowest = sorted(self.file_times.items(), key=lambda item: -totals[item[0]])[:top]
+            lines.append("")
+            lines.append(f"Самые медленные файлы ({len(slowest)} из {len(self.file_times)}):")
+            for file, phases in slowest:
+                details = ', '.join(f"{phase} {seconds * 1000:.1f}" for phase, seconds in sorted(phases.items()))
+                lines.append(f"  {totals[file] * 1000:>9.1f}  {file} ({details})")
+        return lines
+
+    def print_report(self, top: int = 20):
+        """Выводит отчет профилирования в журнал, как остальной вывод анализа"""
+        logger.info("\n%s", '\n'.join(self.report(top)))
+
+    @classmethod
+    def _file_total(cls, phases: Dict[str, float]) -> float:
+        """Время файла по внешним фазам, без повторного учета вложенных"""
+        return sum(seconds for phase, seconds in phases.items() if phase in cls.FILE_PHASES)
+
+    @staticmethod
+    def _percentile(ordered: List[float], fraction: float) -> float:
+        """Перцентиль по отсортированной выборке (метод ближайшего ранга)"""
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+# Общий профилировщик процесса, включается из main.py флагом --profile
+profiler = Profiler()
@@ -0,0 +1,41 @@
+import sys
+from typing import Dict, NamedTuple, Sequence
+
+_intern = sys.intern
+
+
+class Element(NamedTuple):
+    """Элемент PHP-файла из вывода парсера"""
+
+    type: str
+    name: str
+    short_name: str
+    doc: str  # Исходный текст DocBlock, описание из него - docblock.clean_comment
+    line: int
+
+    @classmethod
+    def from_dict(cls, element: Dict) -> 'Element':
+        """Создает элемент из записи php_ast_parser.php"""
+        return cls(_intern(element['type']), element['name'], element.get('short_name', ''),
+                   element.get('doc', ''), element.get('startLine', 0))
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'Element':
+        """Создает элемент из сохраненного кортежа полей (кэш разбора)"""
+        return cls(_intern(row[0]), row[1], row[2], row[3], row[4])
+
+
+class ReportItem(NamedTuple):
+    """Строка отчета.
+
+    Путь и названия типов - интернированные строки, поэтому путь файла
+    хранится один раз на файл, а не в каждой строке.
+    """
+
+    relative_path: str
+    item_number: int
+    name: str
+    type: str
+    type_ru: str
+    description: str
+    line_number: int = 0
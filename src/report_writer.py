@@ -0,0 +1,74 @@
+import gzip
+import lzma
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, TextIO
+from .config import Config
+from .report_item import ReportItem
+
+# Поддерживаемое сжатие отчета и расширения сжатых файлов
+COMPRESSIONS = {
+    'gzip': (gzip.open, '.gz'),
+    'xz': (lzma.open, '.xz'),
+}
+
+
+def open_report(path: str | Path, mode: str, compression: Optional[str] = None) -> TextIO:
+    """Открывает текстовый файл отчета, при необходимости со сжатием"""
+    if compression is None:
+        return open(path, mode, newline='', encoding='utf-8')
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Неизвестное сжатие: {compression}")
+    opener, _ = COMPRESSIONS[compression]
+    return opener(path, mode + 't', newline='', encoding='utf-8')
+
+
+class ReportWriter:
+    """Базовый класс форматов отчета.
+
+    Элементы передаются уже упорядоченными и записываются потоково,
+    по одному, без накопления всего отчета в памяти.
+    """
+
+    FORMAT = ''
+    EXTENSION = ''
+    # Поддерживает ли формат сжатие всего файла
+    SUPPORTS_COMPRESSION = True
+
+    def __init__(self, compression: Optional[str] = None):
+        if compression is not None:
+            if compression not in COMPRESSIONS:
+                raise ValueError(f"Неизвестное сжатие: {compression}")
+            if not self.SUPPORTS_COMPRESSION:
+                raise ValueError(f"Формат {self.FORMAT} не поддерживает сжатие")
+        self.compression = compression
+        self.global_row_number = 1
+
+    @classmethod
+    def default_filename(cls, stem: str, compression: Optional[str] = None) -> str:
+        """Имя файла отчета по умолчанию с расширением формата и сжатия"""
+        suffix = COMPRESSIONS[compression][1] if compression else ''
+        return f"{stem}{cls.EXTENSION}{suffix}"
+
+    def write_sorted(self, items: Iterable[ReportItem], output_path: str | Path):
+        """Построчно записывает уже упорядоченные элементы в файл отчета"""
+        raise NotImplementedError
+
+    def read_items(self, report_path: str | Path, skip_paths: Set[str],
+                   type_mapping: Dict[str, str]) -> Iterator[ReportItem]:
+        """Читает элементы существующего отчета, пропуская skip_paths"""
+        raise NotImplementedError
+
+    def _prepare_record(self, item: ReportItem) -> Dict:
+        """Подготавливает запись отчета с именованными полями"""
+        record = {
+            'row_number': self.global_row_number,
+            'relative_path': item.relative_path,
+            'item_number': item.item_number,
+            'name': item.name,
+            'type': item.type,
+            'type_ru': item.type_ru,
+            'description': item.description,
+        }
+        if Config.INCLUDE_LINE_NUMBERS:
+            record['line_number'] = item.line_number
+        return record
@@ -0,0 +1,85 @@
+import heapq
+import logging
+import time
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional
+from .config import Config
+from .description_manager import DescriptionManager
+from .incremental import save_report_meta
+from .item_sorter import ItemSorter
+from .log import get_logger, log_event
+from .php_analyzer import PHPAnalyzer
+from .profiler import profiler
+
+logger = get_logger('analyzer')
+
+
+class ShardMerger:
+    """Объединяет результаты запусков с --shard.
+
+    Разбор не нужен, поэтому PHP, кэш разбора и воркеры не используются:
+    достаточно словарей описаний и формата отчета, с которым собраны шарды.
+    """
+
+    def __init__(self, results: List[Dict], descriptions_dir: str | Path,
+                 failure_report: Optional[str | Path] = Config.FAILURE_REPORT):
+        self.results = results
+        fingerprint = results[0]['fingerprint']
+        self.description_manager = DescriptionManager(descriptions_dir,
+                                                      store_path=results[0]['description_store'])
+        self.report_writer = PHPAnalyzer.WRITERS[fingerprint['format']](compression=fingerprint['compression'])
+        # failure_report=None - не записывать общий отчет о сбоях разбора
+        self.failure_report = failure_report
+        self.stats = PHPAnalyzer.initialize_stats()
+
+    @profiler.timed('merge_shards')
+    def merge(self, output_path: str | Path) -> None:
+        """Записывает отчет, found_-, empty_-файлы, отчет о сбоях и статистику, как у запуска без шардов"""
+        results = self.results
+        started = time.monotonic()
+        log_event(logger, logging.INFO, 'merge_started', "Объединение результатов шардов: %d", len(results),
+                  shards=len(results))
+        if not results[0]['discovered']:
+            logger.warning("Предупреждение: PHP файлы не найдены!")
+            return
+
+        files_count = sum(result['files'] for result in results)
+        for result in results:
+            for key, values in result['stats'].items():
+                for item_type, value in values.items():
+                    self.stats[key][item_type] += value
+
+        # Повтор в общем порядке обхода: из одинаковых имен сохраняется первое, как без шардов
+        found = sorted(chain.from_iterable(result['found'] for result in results), key=lambda entry: entry[0])
+        for _, item_type, name, desc in found:
+            self.description_manager._save_found_description(item_type, name, desc)
+        self.description_manager.flush_found_descriptions()
+        for result in results:
+            for item_type, names in result['empty'].items():
+                self.description_manager.empty_descriptions.setdefault(item_type, set()).update(names)
+        if self.failure_report is not None:
+            PHPAnalyzer.write_failure_report(self.failure_report, sorted(
+                chain.from_iterable(result['failures'] for result in results), key=lambda entry: entry['path']))
+
+        logger.info("Найдено PHP файлов: %d", files_count)
+        rows = sum(result['rows'] for result in results)
+        if rows:
+            # Каждый файл целиком в одном шарде, частичные отчеты упорядочены по пути
+            parts = [self.report_writer.read_items(Path(result['directory'], result['report']), set(),
+                                                   PHPAnalyzer.TYPE_MAPPING)
+                     for result in results if result['rows']]
+            self.report_writer.write_sorted(heapq.merge(*parts, key=ItemSorter.path_key), output_path)
+            self.description_manager.save_empty_descriptions()
+            log_event(logger, logging.INFO, 'report_written', "Результаты сохранены в %s", output_path,
+                      output=str(output_path), rows=rows)
+            save_report_meta(output_path, dict(results[0]['fingerprint'],
+                                               descriptions=self.description_manager.describe_sources()))
+            PHPAnalyzer.print_item_statistics(self.stats)
+            self.description_manager.print_found_statistics()
+        else:
+            logger.warning("PHP-файлы не найдены или не содержат анализируемых элементов.")
+
+        log_event(logger, logging.INFO, 'analysis_finished', "Объединение завершено за %.2f с",
+                  time.monotonic() - started, files=files_count, rows=rows,
+                  seconds=round(time.monotonic() - started, 3))
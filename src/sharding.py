@@ -0,0 +1,88 @@
+import hashlib
+import json
+from pathlib import Path, PurePath
+from typing import Dict, Iterable, List, Tuple
+from .utils import atomic_write_json
+
+# Служебный файл результата шарда
+SHARD_FILE = 'shard.json'
+FORMAT_VERSION = 2
+
+
+class ShardError(Exception):
+    """Результаты шардов нельзя объединить"""
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Разбирает номер шарда в виде K/N, где 1 <= K <= N"""
+    index, _, count = spec.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"ожидается K/N, например 1/4: {spec!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"номер шарда должен быть от 1 до N: {spec!r}")
+    return index, count
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """Номер шарда (с 1) для файла по стабильному хэшу его относительного пути"""
+    # Хэш не зависит от PYTHONHASHSEED и разделителя путей ОС
+    digest = hashlib.blake2b(PurePath(relative_path).as_posix().encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count + 1
+
+
+def shard_directory(base_dir: str | Path, shard: Tuple[int, int]) -> Path:
+    """Директория результата шарда K/N"""
+    return Path(base_dir) / f"{shard[0]}-of-{shard[1]}"
+
+
+def save_shard_result(directory: str | Path, result: Dict):
+    """Сохраняет служебные данные шарда рядом с частичным отчетом"""
+    atomic_write_json(Path(directory) / SHARD_FILE, {'v': FORMAT_VERSION, **result})
+
+
+def find_shard_directories(paths: Iterable[str | Path]) -> List[Path]:
+    """Директории результатов: сами пути или их поддиректории с shard.json"""
+    directories = []
+    for path in map(Path, paths):
+        if (path / SHARD_FILE).is_file():
+            directories.append(path)
+        else:
+            directories.extend(sorted(result.parent for result in path.glob(f"*/{SHARD_FILE}")))
+    return directories
+
+
+def load_shard_results(paths: Iterable[str | Path]) -> List[Dict]:
+    """Загружает результаты шардов по порядку номеров и проверяет, что их можно объединить"""
+    results = []
+    for directory in find_shard_directories(paths):
+        try:
+            with open(directory / SHARD_FILE, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ShardError(f"не удалось прочитать {directory / SHARD_FILE}: {e}") from None
+        if not isinstance(result, dict) or result.get('v') != FORMAT_VERSION:
+            raise ShardError(f"неподдерживаемый формат {directory / SHARD_FILE}")
+        result['directory'] = str(directory)
+        results.append(result)
+
+    if not results:
+        raise ShardError("результаты шардов не найдены")
+    results.sort(key=lambda result: result['shard'])
+
+    count = results[0]['shard'][1]
+    indexes = [result['shard'][0] for result in results]
+    if any(result['shard'][1] != count for result in results) or indexes != list(range(1, count + 1)):
+        raise ShardError(f"нужны результаты всех шардов 1..{count} по одному, найдены: "
+                         + ', '.join('/'.join(map(str, result['shard'])) for result in results))
+
+    # Состояние словарей описаний у шардов на разных машинах различается по времени
+    # изменения файлов, остальные параметры отчета должны совпадать
+    settings = [{key: value for key, value in result['fingerprint'].items() if key != 'descriptions'}
+                for result in results]
+    if any(setting != settings[0] for setting in settings):
+        raise ShardError("шарды собраны с разными настройками отчета")
+    if len({result['discovered'] for result in results}) > 1:
+        raise ShardError("шарды обошли разное количество файлов: проект изменился между запусками")
+    return results
@@ -0,0 +1,91 @@
+import os
+import sqlite3
+from pathlib import Path
+from sys import intern
+from typing import Dict, Iterable, Iterator, Set
+from .config import Config
+from .profiler import profiler
+from .report_item import ReportItem
+from .report_writer import ReportWriter
+
+
+class SQLiteWriter(ReportWriter):
+    """Отчет в базе SQLite с индексами по пути, имени и типу элемента.
+
+    База собирается во временном файле и атомарно заменяет прежнюю, поэтому
+    читатели отчета никогда не видят ее наполовину записанной.
+    """
+
+    FORMAT = 'sqlite'
+    EXTENSION = '.sqlite'
+    SUPPORTS_COMPRESSION = False
+    # Строк в одной пачке вставки
+    BATCH_SIZE = 5000
+
+    COLUMNS = ('row_number', 'relative_path', 'item_number', 'name', 'type', 'type_ru', 'description', 'line_number')
+
+    @profiler.timed('report_write')
+    def write_sorted(self, items: Iterable[ReportItem], output_path: str | Path):
+        """Построчно записывает уже упорядоченные элементы в базу SQLite"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.global_row_number = 1
+
+        tmp_path = output_path.with_name(f".{output_path.name}.build")
+        tmp_path.unlink(missing_ok=True)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            # Файл временный: журнал и синхронизация до переименования не нужны
+            connection.execute('PRAGMA journal_mode=OFF')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE items ('
+                ' row_number INTEGER PRIMARY KEY,'
+                ' relative_path TEXT NOT NULL,'
+                ' item_number INTEGER,'
+                ' name TEXT NOT NULL,'
+                ' type TEXT NOT NULL,'
+                ' type_ru TEXT NOT NULL,'
+                ' description TEXT,'
+                ' line_number INTEGER)'
+            )
+            insert = (f"INSERT INTO items ({', '.join(self.COLUMNS)})"
+                      f" VALUES ({', '.join('?' * len(self.COLUMNS))})")
+            batch = []
+            for item in items:
+                line_number = item.line_number if Config.INCLUDE_LINE_NUMBERS else None
+                batch.append((self.global_row_number, item.relative_path, item.item_number, item.name,
+                              item.type, item.type_ru, item.description, line_number))
+                self.global_row_number += 1
+                if len(batch) >= self.BATCH_SIZE:
+                    connection.executemany(insert, batch)
+                    batch.clear()
+            connection.executemany(insert, batch)
+
+            # Индексы строятся после вставки - так быстрее, чем обновлять их на каждой строке
+            connection.executescript('''
+                CREATE INDEX items_path ON items (relative_path, line_number);
+                CREATE INDEX items_name ON items (name);
+                CREATE INDEX items_type ON items (type, name);
+            ''')
+            connection.commit()
+        except BaseException:
+            connection.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        connection.close()
+        os.replace(tmp_path, output_path)
+
+    def read_items(self, report_path: str | Path, skip_paths: Set[str],
+                   type_mapping: Dict[str, str]) -> Iterator[ReportItem]:
+        """Читает элементы существующего отчета в порядке строк, пропуская skip_paths"""
+        connection = sqlite3.connect(f"{Path(report_path).absolute().as_uri()}?mode=ro", uri=True)
+        try:
+            cursor = connection.execute(f"SELECT {', '.join(self.COLUMNS[1:])} FROM items ORDER BY row_number")
+            for relative_path, item_number, name, item_type, type_ru, description, line_number in cursor:
+                if relative_path in skip_paths:
+                    continue
+                yield ReportItem(intern(relative_path), item_number, name, intern(item_type), intern(type_ru),
+                                 description, line_number or 0)
+        finally:
+            connection.close()
@@ -1,16 +1,35 @@
+import json
 import os
 import subprocess
+import tempfile
 from pathlib import Path
 from typing import Dict, Any
 
-def check_php_environment() -> bool:
+def check_php_environment(php_binary: str = 'php') -> bool:
     """Проверяет наличие PHP и необходимых зависимостей"""
     try:
-        result = subprocess.run(['php', '-v'], capture_output=True, text=True, check=True)
+        result = subprocess.run([php_binary, '-v'], capture_output=True, text=True, check=True)
         return 'PHP' in result.stdout
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
+def get_php_parser_version(project_dir: str | Path = '.') -> str:
+    """Возвращает версию nikic/php-parser из vendor или composer.lock"""
+    project_dir = Path(project_dir)
+    for path, key in ((project_dir / 'vendor' / 'composer' / 'installed.json', 'packages'),
+                      (project_dir / 'composer.lock', 'packages')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+
+        packages = data.get(key, []) if isinstance(data, dict) else data
+        for package in packages:
+            if isinstance(package, dict) and package.get('name') == 'nikic/php-parser':
+                return str(package.get('version', 'unknown'))
+    return 'unknown'
+
 def create_directory(path: str | Path) -> bool:
     """Создает директорию если не существует"""
     try:
@@ -29,4 +48,24 @@ def get_relative_path(file_path: Path, base_dir: Path) -> str:
     try:
         return str(file_path.relative_to(base_dir))
     except ValueError:
-        return str(file_path.name)
\ No newline at end of file
+        return str(file_path.name)
+
+def atomic_write_json(path: str | Path, data: Any):
+    """Записывает JSON через временный файл и атомарное переименование"""
+    path = Path(path)
+    # mkstemp создает файл с правами 0600 - сохраняем права исходного файла
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
\ No newline at end of file
@@ -0,0 +1,358 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .config import Config
+from .file_discovery import FileDiscovery
+from .item_sorter import ItemSorter
+from .log import get_logger, log_event
+from .report_item import Element, ReportItem
+from .utils import get_relative_path
+
+logger = get_logger('watcher')
+
+# Изменения за один опрос монитора: измененные пути и признак необходимости полного пересмотра
+Changes = Tuple[Set[Path], bool]
+
+
+class PollingMonitor:
+    """Отслеживает изменения периодическим сравнением размера и времени изменения файлов"""
+
+    def __init__(self, discovery: FileDiscovery, extra_files: Iterable[Path] = ()):
+        self.discovery = discovery
+        self.extra_files = [Path(path) for path in extra_files]
+        self._snapshot = self._take_snapshot()
+
+    def poll(self, timeout: float) -> Changes:
+        """Ждет timeout секунд и возвращает пути, изменившиеся с прошлого опроса"""
+        time.sleep(timeout)
+        snapshot = self._take_snapshot()
+        changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(path) != self._snapshot.get(path)}
+        self._snapshot = snapshot
+        return changed, False
+
+    def close(self):
+        pass
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Собирает размер и время изменения отслеживаемых файлов"""
+        snapshot = {}
+        for path in list(self.discovery) + self.extra_files:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+class InotifyMonitor:
+    """Отслеживает изменения через inotify (только Linux)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+                  | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, discovery: FileDiscovery, extra_dirs: Iterable[Path] = ()):
+        self.discovery = discovery
+        self._libc = self._load_libc()
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._watches: Dict[int, Path] = {}
+        self._watched_dirs: Set[Path] = set()
+        try:
+            self._add_tree(discovery.base_dir)
+            for directory in extra_dirs:
+                self._add_watch(Path(directory))
+        except OSError:
+            self.close()
+            raise
+
+    @staticmethod
+    def is_available() -> bool:
+        """Проверяет, поддерживает ли система inotify"""
+        try:
+            libc = InotifyMonitor._load_libc()
+        except OSError:
+            return False
+        return hasattr(libc, 'inotify_init1')
+
+    @staticmethod
+    def _load_libc():
+        """Загружает libc с функциями inotify"""
+        return ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+    def poll(self, timeout: float) -> Changes:
+        """Ждет события не дольше timeout секунд и возвращает затронутые пути"""
+        changed: Set[Path] = set()
+        rescan = False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, rescan
+
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+                offset += name_len
+
+                if mask & self.IN_Q_OVERFLOW:
+                    # Очередь событий переполнилась, часть изменений потеряна
+                    rescan = True
+                    continue
+                if mask & self.IN_IGNORED:
+                    self._forget(wd)
+                    continue
+
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                path = directory / name if name else directory
+                if mask & self.IN_ISDIR or mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    # Появление или исчезновение директории меняет набор файлов
+                    rescan = True
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        self._add_tree(path)
+                else:
+                    changed.add(path)
+        return changed, rescan
+
+    def close(self):
+        """Закрывает дескриптор inotify"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _add_tree(self, directory: Path):
+        """Ставит наблюдение на директорию и все ее поддиректории, проходящие фильтры"""
+        base = self.discovery.base_dir
+        for root, dirs, _ in os.walk(directory, followlinks=self.discovery.follow_symlinks):
+            root_path = Path(root)
+            if root_path in self._watched_dirs:
+                dirs[:] = []
+                continue
+            self._add_watch(root_path)
+            dirs[:] = sorted(name for name in dirs
+                             if self.discovery.accepts_directory(get_relative_path(root_path / name, base)))
+
+    def _add_watch(self, directory: Path):
+        """Ставит наблюдение на одну директорию"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch {directory}: {os.strerror(errno)}")
+        self._watches[wd] = directory
+        self._watched_dirs.add(directory)
+
+    def _forget(self, wd: int):
+        """Удаляет сведения о снятом наблюдении"""
+        directory = self._watches.pop(wd, None)
+        if directory is not None:
+            self._watched_dirs.discard(directory)
+
+
+class ReportWatcher:
+    """Следит за PHP-файлами и словарями описаний и перезаписывает отчет после изменений.
+
+    PHP-воркеры, кэш разбора и индексы описаний живут все время слежения;
+    результаты разбора хранятся в памяти, поэтому после изменения заново
+    разбираются только затронутые файлы.
+    """
+
+    # Сколько ждать затишья после первого события, чтобы объединить серию изменений
+    DEBOUNCE = 0.1
+    # Максимальная задержка перезаписи отчета при непрерывном потоке изменений
+    MAX_DELAY = 0.8
+
+    def __init__(self, analyzer, directory: str | Path, output: str | Path,
+                 interval: float = Config.WATCH_INTERVAL, use_inotify: bool = True):
+        self.analyzer = analyzer
+        self.base_dir = Path(directory)
+        self.output = Path(output)
+        self.interval = interval
+        self.analyzer.base_dir = self.base_dir
+
+        self.description_manager = analyzer.description_manager
+        store = self.description_manager.store
+        if store is not None:
+            # Хранилище читается запросами: при его изменении достаточно пересобрать элементы
+            descriptions_dir = store.path.parent
+            self.description_files: Dict[Path, Optional[str]] = {store.path.absolute(): None}
+        else:
+            descriptions_dir = self.description_manager.descriptions_dir
+            # Следим только за исходными словарями: found_ и empty_ файлы пишет сам анализатор
+            self.description_files = {
+                (descriptions_dir / filename).absolute(): item_type
+                for item_type, filename in self.description_manager.SOURCE_FILES.items()
+            }
+
+        self.discovery = analyzer.create_discovery(self.base_dir)
+        # Результаты разбора, элементы отчета и их статистика по относительному пути файла
+        self.elements: Dict[str, List[Element]] = {}
+        self.items: Dict[str, List[ReportItem]] = {}
+        self.file_stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.monitor = self._create_monitor(use_inotify, descriptions_dir)
+
+    def _create_monitor(self, use_inotify: bool, descriptions_dir: Path):
+        """Создает монитор изменений, при недоступности inotify - опрос файлов"""
+        if use_inotify and InotifyMonitor.is_available():
+            try:
+                return InotifyMonitor(self.discovery, extra_dirs=[descriptions_dir])
+            except OSError as e:
+                logger.warning("Предупреждение: inotify недоступен (%s), используется опрос файлов", e)
+        return PollingMonitor(self.discovery, extra_files=self.description_files)
+
+    def run(self):
+        """Строит отчет и обновляет его после изменений до прерывания"""
+        logger.info("Поиск PHP файлов в: %s", self.base_dir.absolute())
+        started = time.monotonic()
+        self._parse({get_relative_path(path, self.base_dir): path for path in self.discovery})
+        self._write_report()
+        self.analyzer._print_statistics()
+        logger.info("\nОтчет %s построен за %.2f с, файлов: %d. Ожидание изменений (Ctrl+C - выход)...",
+                    self.output, time.monotonic() - started, len(self.elements))
+
+        while True:
+            changed, rescan = self.monitor.poll(self.interval)
+            if not changed and not rescan:
+                continue
+
+            # Объединяем серию быстрых изменений (сохранение нескольких файлов, git checkout)
+            deadline = time.monotonic() + self.MAX_DELAY
+            while time.monotonic() < deadline:
+                more, more_rescan = self.monitor.poll(self.DEBOUNCE)
+                if not more and not more_rescan:
+                    break
+                changed |= more
+                rescan = rescan or more_rescan
+
+            self._apply_changes(changed, rescan)
+
+    def close(self):
+        """Останавливает воркеры и сохраняет накопленные данные"""
+        self.monitor.close()
+        self.analyzer.close()
+        self.description_manager.flush_found_descriptions()
+
+    def _apply_changes(self, changed: Set[Path], rescan: bool):
+        """Применяет изменения файлов и перезаписывает отчет"""
+        started = time.monotonic()
+        reloaded = sorted({path.absolute() for path in changed if path.absolute() in self.description_files})
+        for source in reloaded:
+            item_type = self.description_files[source]
+            if item_type is not None:
+                self.description_manager.reload(item_type)
+            logger.info("Перезагружены описания: %s", source.name)
+
+        to_parse: Dict[str, Path] = {}
+        removed: Set[str] = set()
+        if rescan:
+            current = {get_relative_path(path, self.base_dir): path for path in self.discovery}
+            removed.update(self.elements.keys() - current.keys())
+            to_parse.update((rel, path) for rel, path in current.items() if rel not in self.elements)
+
+        for path in changed:
+            if path.absolute() in self.description_files:
+                continue
+            try:
+                rel = str(path.relative_to(self.base_dir))
+            except ValueError:
+                continue
+            if path.is_file() and self.discovery.accepts(rel):
+                to_parse[rel] = path
+            elif rel in self.elements:
+                removed.add(rel)
+
+        for rel in removed:
+            self.elements.pop(rel, None)
+            self.items.pop(rel, None)
+            self.file_stats.pop(rel, None)
+
+        if reloaded:
+            # Описания изменились - пересобираем элементы всех файлов без повторного разбора
+            for rel, elements in self.elements.items():
+                if rel not in to_parse:
+                    self._process_file(rel, self.base_dir / rel, elements)
+
+        if not (to_parse or removed or reloaded):
+            return
+
+        self._parse(to_parse)
+        self._write_report()
+        elapsed = time.monotonic() - started
+        log_event(logger, logging.INFO, 'report_updated',
+                  "Отчет обновлен за %.2f с: разобрано файлов %d, удалено %d, всего файлов %d",
+                  elapsed, len(to_parse), len(removed), len(self.elements),
+                  parsed=len(to_parse), removed=len(removed), files=len(self.elements), seconds=round(elapsed, 3))
+
+    def _parse(self, files: Dict[str, Path]):
+        """Разбирает файлы теплым пулом воркеров и обновляет элементы отчета"""
+        ordered = sorted(files.items())
+        # Сбои разбора уже выведены в журнал, при слежении список не накапливается
+        self.analyzer.parser_pool.failures.clear()
+        parsed = self.analyzer.parser_pool.parse_files(path for _, path in ordered)
+        for (rel, _), (file_path, elements) in zip(ordered, parsed):
+            self.elements[rel] = elements
+            self._process_file(rel, file_path, elements)
+        if self.analyzer.parse_cache is not None:
+            self.analyzer.parse_cache.commit()
+        self._update_stats()
+
+    def _process_file(self, rel: str, file_path: Path, elements: List[Element]):
+        """Строит элементы отчета файла и запоминает статистику только по этому файлу"""
+        stats, self.analyzer.stats = self.analyzer.stats, self.analyzer.initialize_stats()
+        try:
+            self.items[rel] = self.analyzer._process_file(file_path, elements)
+            self.file_stats[rel] = self.analyzer.stats
+        finally:
+            self.analyzer.stats = stats
+
+    def _update_stats(self):
+        """Пересчитывает статистику анализатора по текущим файлам отчета"""
+        stats = self.analyzer.initialize_stats()
+        for file_stats in self.file_stats.values():
+            for key, values in file_stats.items():
+                for item_type, value in values.items():
+                    stats[key][item_type] += value
+        self.analyzer.stats = stats
+
+    def _write_report(self):
+        """Атомарно перезаписывает отчет и словари найденных и пустых описаний"""
+        rows = (item for rel in sorted(self.items)
+                for item in sorted(self.items[rel], key=ItemSorter.line_key))
+        tmp_path = self.output.with_name(f".{self.output.name}.tmp")
+        self.analyzer.report_writer.write_sorted(rows, tmp_path)
+        os.replace(tmp_path, self.output)
+        self.description_manager.flush_found_descriptions()
+        self.description_manager.save_empty_descriptions()
+
@@ -0,0 +1,99 @@
+# Общие данные тестов: примеры PHP-файлов и поддельные PHP-воркеры
+from src.php_parser import PHPParser
+from src.report_item import Element
+
+# Файл с классом и интерфейсом: члены класса, DocBlock, конструкции, которые не дают элементов
+CLASS_FILE = '''<?php
+namespace App;
+
+use Foo\\{Bar, Baz};
+
+/**
+ * Отчет. Подробности.
+ */
+abstract class Report extends Base implements Renderable
+{
+    use Loggable { log as protected; }
+
+    /** Версия */
+    final public const int VERSION = 2, MINOR = 1;
+
+    /** @var string */
+    protected ?string $title = null, $subtitle;
+
+    public function __construct(private readonly int $id = 0)
+    {
+        $this->title = "Отчет {$id}";
+    }
+
+    abstract protected function build(): void;
+
+    // Комментарий после DocBlock не отменяет его
+    /** Отрисовка */
+    // ...
+    public function &list(): array
+    {
+        return array_map(fn($item) => $item, []);
+    }
+}
+
+interface Renderable
+{
+    const FORMAT = 'html';
+    public function render(): string;
+}
+'''
+
+# Файл верхнего уровня: константы, функция, присваивания переменных и шаблон
+SCRIPT_FILE = '''<?php
+/** Флаг */
+const DEBUG = true, LEVEL = 2;
+
+function helper(array $items = [], $limit = 10): ?array
+{
+    $local = 1;
+    return $items;
+}
+
+/** Конфиг */
+$config = ['a' => 1];
+$copy = &$config;
+$config += ['b' => 2];
+$$name = $obj->prop = Foo::$stat = 3;
+static $cache = [];
+$callback = function ($value = 5) use (&$config) { $inner = $value; };
+$arrow = fn($z = 1) => $w = $z;
+[$a, $b] = [1, 2];
+for ($i = 0; $i < 3; $i++) {}
+$text = <<<EOT
+    Значение {$config['a']}
+    EOT;
+$class = Foo::class;
+?>
+<div><?= $title = 'Заголовок' ?></div>
+'''
+
+# Поддельный PHP-воркер: на любой файл отвечает одним классом Fallback
+FALLBACK_WORKER = r'''
+import json, sys
+for line in sys.stdin.buffer:
+    columns = {'type': [0], 'name': ['Fallback'], 'short_name': [''], 'doc': [''], 'line': [1]}
+    payload = json.dumps({'v': %d, 'elements': columns, 'error': None}).encode('utf-8')
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\n' + payload)
+    sys.stdout.buffer.flush()
+''' % PHPParser.PROTOCOL_VERSION
+
+# Поддельный воркер: падает на файлах с crash в имени, на остальные отвечает одним классом
+FAKE_WORKER = r'''
+import json, sys
+for line in sys.stdin.buffer:
+    path = json.loads(line)['path']
+    if 'crash' in path:
+        sys.exit(255)
+    columns = {'type': [0], 'name': ['Parsed'], 'short_name': [''], 'doc': [''], 'line': [1]}
+    payload = json.dumps({'v': %d, 'elements': columns, 'error': None}).encode('utf-8')
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\n' + payload)
+    sys.stdout.buffer.flush()
+''' % PHPParser.PROTOCOL_VERSION
+
+PARSED = [Element('class', 'Parsed', '', '', 1)]
@@ -0,0 +1,212 @@
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from benchmarks.corpus import generate_descriptions, generate_project
+from src.async_parser import AsyncPHPWorker
+from src.async_parser_pool import AsyncParserPool
+from src.config import Config
+from src.description_store import DescriptionStore
+from src.php_analyzer import PHPAnalyzer
+from src.php_parser import PHPParser
+from tests.helpers import FAKE_WORKER, PARSED
+
+# Поддельный воркер: разбирает файл 0.2 с, файлы со slow в имени - 1 с
+SLOW_WORKER = r'''
+import json, sys, time
+for line in sys.stdin.buffer:
+    path = json.loads(line)['path']
+    time.sleep(1 if 'slow' in path else 0.2)
+    columns = {'type': [0], 'name': ['Parsed'], 'short_name': [''], 'doc': [''], 'line': [1]}
+    payload = json.dumps({'v': %d, 'elements': columns, 'error': None}).encode('utf-8')
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\n' + payload)
+    sys.stdout.buffer.flush()
+''' % PHPParser.PROTOCOL_VERSION
+
+
+class TestAsyncParserPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for name in ('slow.php', 'A.php', 'B.php', 'C.php', 'crash.php'):
+            self.files.append(Path(self.tmp.name, name))
+            self.files[-1].write_text(f"<?php class {self.files[-1].stem} {{}}", encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _pool(self, jobs, worker=FAKE_WORKER):
+        pool = AsyncParserPool(jobs=jobs)
+        for parser in pool.parsers:
+            parser.worker = AsyncPHPWorker(timeout=2, command=[sys.executable, '-c', worker])
+        return pool
+
+    async def test_results_stream_in_completion_order(self):
+        pool = self._pool(jobs=2, worker=SLOW_WORKER)
+        try:
+            results = [(path.name, elements) async for path, elements in pool.parse_files(self.files[:3])]
+        finally:
+            await pool.close()
+        # Два воркера: A.php и B.php готовы раньше медленного файла, начатого первым
+        self.assertEqual(results, [('A.php', PARSED), ('B.php', PARSED), ('slow.php', PARSED)])
+        self.assertEqual([parser.worker.starts for parser in pool.parsers], [1, 1])
+
+    async def test_failures_are_retried(self):
+        pool = self._pool(jobs=2)
+        try:
+            results = dict([item async for item in pool.parse_files(self.files)])
+        finally:
+            await pool.close()
+        self.assertEqual(results, {**{path: PARSED for path in self.files[:4]}, self.files[4]: []})
+        self.assertEqual([(failure.path, failure.attempts, failure.quarantine) for failure in pool.failures],
+                         [(self.files[4], 2, True)])
+
+    async def test_event_loop_is_not_blocked(self):
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        pool = self._pool(jobs=1, worker=SLOW_WORKER)
+        beat = asyncio.create_task(heartbeat())
+        try:
+            started = time.monotonic()
+            results = [item async for item in pool.parse_files(self.files[1:4])]
+            elapsed = time.monotonic() - started
+        finally:
+            beat.cancel()
+            await pool.close()
+        self.assertEqual(len(results), 3)
+        self.assertGreater(ticks, elapsed / 0.01 / 2)
+
+    async def test_discovery_and_lookup_run_off_the_loop(self):
+        threads = set()
+
+        def discovery():
+            for file_path in self.files[1:4]:
+                threads.add(threading.current_thread())
+                yield file_path
+
+        pool = self._pool(jobs=2)
+        lookup = pool._lookup
+        pool._lookup = lambda file_path: threads.add(threading.current_thread()) or lookup(file_path)
+        try:
+            results = [item async for item in pool.parse_files(discovery())]
+        finally:
+            await pool.close()
+        self.assertEqual(len(results), 3)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    async def test_cancellation_stops_workers(self):
+        pool = self._pool(jobs=2, worker=SLOW_WORKER)
+        parsed = []
+        first = asyncio.Event()
+
+        async def consume():
+            async for path, _ in pool.parse_files(self.files[:4]):
+                parsed.append(path.name)
+                first.set()
+
+        task = asyncio.create_task(consume())
+        # Отмена, пока один воркер разбирает slow.php, а второй - B.php
+        await first.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await pool.close()
+
+        self.assertEqual(parsed, ['A.php'])
+        self.assertTrue(all(parser.worker.process is None for parser in pool.parsers))
+        self.assertEqual(pool._idle.qsize(), 2)
+
+
+class TestAnalyzeIter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name, 'project')
+        self.manifest = generate_project(self.project, files=40)
+        self.include_lines = Config.INCLUDE_LINE_NUMBERS
+        Config.INCLUDE_LINE_NUMBERS = True
+
+    def tearDown(self):
+        Config.INCLUDE_LINE_NUMBERS = self.include_lines
+        self.tmp.cleanup()
+
+    def _analyzer(self, name):
+        return PHPAnalyzer(str(Path(self.tmp.name, name)), cache_dir=None, engine='python', failure_report=None)
+
+    async def test_concurrent_analyses_match_report(self):
+        output = Path(self.tmp.name, 'report.csv')
+        self._analyzer('report').analyze_directory(self.project, output)
+
+        async def report(name):
+            analyzer = self._analyzer(name)
+            items = [item async for item in analyzer.analyze_iter(self.project, concurrency=3)]
+            path = Path(self.tmp.name, f"{name}.csv")
+            analyzer.report_writer.write_sorted(sorted(items, key=lambda item: (item.relative_path,
+                                                                                item.line_number)), path)
+            return path.read_bytes()
+
+        # Два анализа в одном цикле событий дают те же строки, что и analyze_directory
+        self.assertEqual(await asyncio.gather(report('first'), report('second')), [output.read_bytes()] * 2)
+
+    async def test_event_loop_is_not_blocked(self):
+        store_path = Path(self.tmp.name, 'descriptions.sqlite')
+        store = DescriptionStore(store_path, readonly=False)
+        for item_type, items in generate_descriptions(self.manifest, entries=500).items():
+            store.import_items(item_type, items)
+        store.close()
+        analyzer = PHPAnalyzer(str(Path(self.tmp.name, 'descriptions')), cache_dir=None, engine='python',
+                               failure_report=None, description_store=store_path)
+
+        threads = set()
+        get_description = analyzer.description_manager.get_description
+
+        def slow_description(*args):
+            # Заметная задержка поиска: в цикле событий она остановила бы heartbeat
+            threads.add(threading.current_thread())
+            time.sleep(0.002)
+            return get_description(*args)
+
+        analyzer.description_manager.get_description = slow_description
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            started = time.monotonic()
+            async with analyzer:
+                items = [item async for item in analyzer.analyze_iter(self.project, concurrency=2)]
+            elapsed = time.monotonic() - started
+        finally:
+            beat.cancel()
+        self.assertTrue(items)
+        self.assertTrue(any(item.description for item in items))
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertGreater(ticks, elapsed / 0.01 / 2)
+
+    async def test_analyzer_is_reusable_with_cache(self):
+        async with PHPAnalyzer(str(Path(self.tmp.name, 'descriptions')), cache_dir=Path(self.tmp.name, 'cache'),
+                               engine='python', failure_report=None) as analyzer:
+            first = [item async for item in analyzer.analyze_iter(self.project)]
+            # Второй запуск того же анализатора берет все файлы из кэша, открытого первым
+            second = [item async for item in analyzer.analyze_iter(self.project)]
+            self.assertEqual(analyzer.parse_cache.hits, 40)
+        self.assertIsNone(analyzer.parse_cache.connection)
+        key = lambda item: (item.relative_path, item.line_number)
+        self.assertEqual(sorted(second, key=key), sorted(first, key=key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from pathlib import Path
+from benchmarks.corpus import generate_descriptions, generate_project
+from benchmarks.suite import compare
+
+
+class TestCorpus(unittest.TestCase):
+    def test_generation_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            manifest = generate_project(first, files=20, seed=5)
+            self.assertEqual(manifest, generate_project(second, files=20, seed=5))
+            files = sorted(path.relative_to(first) for path in Path(first).rglob('*.php'))
+            self.assertEqual(files, sorted(path.relative_to(second) for path in Path(second).rglob('*.php')))
+            for path in files:
+                self.assertEqual((Path(first) / path).read_bytes(), (Path(second) / path).read_bytes())
+
+    def test_manifest_lines_point_at_declarations(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = generate_project(tmp, files=10, seed=3)
+            self.assertEqual({element['type'] for element in manifest},
+                             {'class', 'method', 'property', 'class_constant', 'function', 'variable', 'constant'})
+            for element in manifest:
+                lines = (Path(tmp) / element['relative_path']).read_text(encoding='utf-8').split('\n')
+                line = lines[element['startLine'] - 1]
+                self.assertIn(element.get('short_name') or element['name'].lstrip('$'), line)
+
+    def test_descriptions_are_padded_to_requested_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = generate_project(tmp, files=10, seed=3)
+        descriptions = generate_descriptions(manifest, entries=5000)
+        self.assertEqual(sum(len(items) for items in descriptions.values()), 5000)
+
+
+class TestCompare(unittest.TestCase):
+    def test_flags_slowdown_above_threshold(self):
+        baseline = {'scenarios': {'csv': {'median': 1.0}, 'parse': {'median': 2.0}, 'gone': {'median': 1.0}}}
+        results = {'scenarios': {'csv': {'median': 1.3}, 'parse': {'median': 2.1}, 'end_to_end': {'skipped': 'PHP'}}}
+
+        rows = {row['scenario']: row for row in compare(results, baseline, threshold=0.2)}
+        self.assertEqual(set(rows), {'csv', 'parse'})
+        self.assertTrue(rows['csv']['regression'])
+        self.assertFalse(rows['parse']['regression'])
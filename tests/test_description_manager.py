@@ -0,0 +1,142 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.config import Config
+from src.description_manager import DescriptionManager
+
+
+class TestDescriptionLookup(unittest.TestCase):
+    METHODS = [
+        {'name': 'Report::build', 'desc': 'Полное имя'},
+        {'name': 'render', 'desc': 'Короткое имя'},
+        {'name': 'report::BUILD', 'desc': 'Другой регистр'},
+        {'name': 'Controller', 'desc': 'Шаблон', 'cond': 'like'},
+        {'name': 'render', 'desc': 'Дубликат'},
+        {'name': '', 'desc': 'Без имени'},
+        {'name': 'Action', 'desc': 'Поздний шаблон', 'cond': 'like'},
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        Path(self.tmp.name, 'methods.json').write_text(json.dumps(self.METHODS), encoding='utf-8')
+        self.manager = DescriptionManager(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _linear(self, name, short_name, exact_match):
+        """Эталонный последовательный перебор описаний"""
+        _, compare_names = self.manager._prepare_search_names('method', name, short_name, True, exact_match)
+        for item in self.manager.descriptions['method']:
+            item_name = item.get('name', '')
+            if item_name and self.manager._matches(item, item_name, compare_names, exact_match):
+                return item.get('desc', ''), True
+        return None, False
+
+    def test_index_matches_linear_scan(self):
+        queries = [
+            ('Report::build', 'build'), ('Report::BUILD', 'BUILD'), ('View::render', 'render'),
+            ('SiteController::index', 'index'), ('Foo::runAction', 'runAction'),
+            ('Foo::missing', 'missing'), ('roll', ''),
+        ]
+        for exact_match in (True, False):
+            for name, short_name in queries:
+                with self.subTest(name=name, exact_match=exact_match):
+                    self.assertEqual(
+                        self.manager.get_description('method', name, short_name, exact_match),
+                        self._linear(name, short_name, exact_match)
+                    )
+
+    def test_first_match_wins(self):
+        self.assertEqual(self.manager.get_description('method', 'View::render', 'render'),
+                         ('Короткое имя', True))
+        self.assertEqual(self.manager.get_description('method', 'report::build', 'build', False),
+                         ('Полное имя', True))
+
+
+class TestFoundDescriptions(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.found_path = Path(self.tmp.name, 'found_methods.json')
+        self.found_path.write_text(json.dumps([{'name': 'A::old', 'desc': 'Было'}]), encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_found_descriptions_are_buffered_until_flush(self):
+        manager = DescriptionManager(self.tmp.name)
+        manager._save_found_description('method', 'A::old', 'Повтор')
+        manager._save_found_description('method', 'A::run', 'Запуск')
+        manager._save_found_description('method', 'A::run', 'Повтор')
+        self.assertEqual(len(json.loads(self.found_path.read_text(encoding='utf-8'))), 1)
+
+        manager.flush_found_descriptions()
+        self.assertEqual(json.loads(self.found_path.read_text(encoding='utf-8')),
+                         [{'name': 'A::old', 'desc': 'Было'}, {'name': 'A::run', 'desc': 'Запуск'}])
+        self.assertEqual(manager.found_descriptions['method'], {'A::run'})
+        self.assertEqual(sorted(p.name for p in Path(self.tmp.name).iterdir()),
+                         [Config.DESCRIPTIONS_SNAPSHOT, 'found_methods.json'])
+
+    def test_flush_every_writes_periodically(self):
+        manager = DescriptionManager(self.tmp.name, flush_every=2)
+        manager._save_found_description('method', 'A::one', 'Один')
+        manager._save_found_description('method', 'A::two', 'Два')
+        self.assertEqual(len(json.loads(self.found_path.read_text(encoding='utf-8'))), 3)
+
+
+class TestDescriptionSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.methods = Path(self.tmp.name, 'methods.json')
+        self.methods.write_text(json.dumps({'A::run': 'Запуск', 'stop': 'Остановка'}), encoding='utf-8')
+        self.snapshot = Path(self.tmp.name, Config.DESCRIPTIONS_SNAPSHOT)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _load(self):
+        """Создает менеджер и сообщает, разбирались ли JSON-файлы"""
+        with mock.patch.object(DescriptionManager, 'load_json_file',
+                               side_effect=DescriptionManager.load_json_file) as load:
+            manager = DescriptionManager(self.tmp.name)
+        return manager, load.called
+
+    def test_second_run_loads_snapshot(self):
+        first, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertTrue(self.snapshot.exists())
+
+        second, parsed = self._load()
+        self.assertFalse(parsed)
+        self.assertEqual(second.descriptions, first.descriptions)
+        self.assertEqual(second.get_description('method', 'B::stop', 'stop'), ('Остановка', True))
+        self.assertIs(second.indexes['method'].descriptions, second.descriptions['method'])
+
+    def test_changed_added_and_removed_sources_invalidate_snapshot(self):
+        self._load()
+        self.methods.write_text(json.dumps({'A::run': 'Новый запуск'}), encoding='utf-8')
+        manager, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertEqual(manager.get_description('method', 'A::run', 'run'), ('Новый запуск', True))
+
+        Path(self.tmp.name, 'classes.json').write_text(json.dumps({'A': 'Класс'}), encoding='utf-8')
+        manager, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertEqual(manager.get_description('class', 'A'), ('Класс', True))
+
+        self.methods.unlink()
+        manager, parsed = self._load()
+        self.assertEqual(manager.descriptions['method'], [])
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        self.snapshot.write_bytes(b'not a pickle')
+        manager, parsed = self._load()
+        self.assertTrue(parsed)
+        self.assertEqual(manager.get_description('method', 'A::run', 'run'), ('Запуск', True))
+        self.assertFalse(self._load()[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
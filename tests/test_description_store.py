@@ -0,0 +1,127 @@
+import json
+import random
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from src.description_index import DescriptionIndex
+from src.description_manager import DescriptionManager
+from src.description_store import DescriptionStore
+
+
+class TestDescriptionStore(unittest.TestCase):
+    METHODS = [
+        {'name': 'Report::build', 'desc': 'Полное имя'},
+        {'name': 'render', 'desc': 'Короткое имя'},
+        {'name': 'report::BUILD', 'desc': 'Другой регистр'},
+        {'name': 'Controller', 'desc': 'Шаблон', 'cond': 'like'},
+        {'name': 'render', 'desc': 'Дубликат'},
+        {'name': '', 'desc': 'Без имени'},
+        {'name': 'Action', 'desc': 'Поздний шаблон', 'cond': 'like'},
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name, 'descriptions.sqlite')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _import(self, item_type, items, replace=False):
+        store = DescriptionStore(self.path, readonly=False)
+        try:
+            return store.import_items(item_type, items, replace=replace)
+        finally:
+            store.close()
+
+    def test_import_drops_unused_short_name_index(self):
+        self._import('method', self.METHODS)
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.execute('CREATE INDEX descriptions_short_name ON descriptions (type, short_name, position)')
+            connection.commit()
+        finally:
+            connection.close()
+
+        self._import('method', self.METHODS, replace=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            connection.close()
+        self.assertNotIn('descriptions_short_name', indexes)
+        self.assertIn('descriptions_name', indexes)
+
+    def test_lookups_match_in_memory_index(self):
+        rnd = random.Random(3)
+        items = list(self.METHODS)
+        for i in range(300):
+            name = rnd.choice(['Report', 'view', 'SiteController', 'Api']) + '::' + rnd.choice(['build', 'Render', 'index', f"m{i % 7}"])
+            items.append({'name': rnd.choice([name, name.split('::')[1], name.upper()]), 'desc': f"d{i}",
+                          **({'cond': 'like'} if rnd.random() < 0.05 else {})})
+        self._import('method', items)
+
+        memory = DescriptionIndex(items)
+        store = DescriptionStore(self.path)
+        index = store.index('method')
+        try:
+            for _ in range(500):
+                names = [rnd.choice(['Report', 'View', 'sitecontroller', 'Api', 'X']) + '::'
+                         + rnd.choice(['build', 'render', 'Index', 'm3', 'none']),
+                         rnd.choice(['build', 'Render', 'index', 'm1', 'roll', 'action', ''])]
+                for exact_match in (True, False):
+                    expected = memory.find(names, exact_match)
+                    self.assertEqual(index.find(names, exact_match), expected, (names, exact_match))
+                    if expected is not None:
+                        self.assertEqual(index.description(expected), memory.description(expected))
+        finally:
+            store.close()
+
+    def test_imports_append_and_replace(self):
+        self.assertEqual(self._import('method', [{'name': 'run', 'desc': 'первый'}]), 1)
+        self.assertEqual(self._import('method', [{'name': 'run', 'desc': 'второй'}, {'name': 'stop', 'desc': ''}]), 2)
+
+        store = DescriptionStore(self.path)
+        index = store.index('method')
+        self.assertEqual(index.description(index.find(['run'])), 'первый')
+        self.assertEqual(store.count('method'), 3)
+        store.close()
+
+        self._import('method', [{'name': 'run', 'desc': 'третий'}], replace=True)
+        store = DescriptionStore(self.path)
+        self.assertEqual(store.count('method'), 1)
+        self.assertEqual(store.index('method').description(0), 'третий')
+        store.close()
+
+    def test_readonly_store_is_shared(self):
+        self._import('class', [{'name': 'Report', 'desc': 'Отчет'}])
+        first, second = DescriptionStore(self.path), DescriptionStore(self.path)
+        try:
+            self.assertEqual(first.index('class').find(['Report']), 0)
+            self.assertEqual(second.index('class').find(['Report']), 0)
+            with self.assertRaises(Exception):
+                first.connection.execute("DELETE FROM descriptions")
+        finally:
+            first.close()
+            second.close()
+
+    def test_missing_store_is_reported(self):
+        with self.assertRaises(FileNotFoundError):
+            DescriptionStore(self.path)
+
+    def test_manager_uses_store(self):
+        formats = {
+            'list.json': [{'name': 'Report', 'desc': 'Список объектов'}],
+            'single.json': [{'Report': 'Список пар'}, {'Builder': 'Строитель'}],
+            'dict.json': {'Report': 'Словарь', 'View': 'Вид'},
+        }
+        for filename, data in formats.items():
+            path = Path(self.tmp.name, filename)
+            path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+            self._import('class', DescriptionManager.load_json_file(path))
+
+        manager = DescriptionManager(self.tmp.name, store_path=self.path)
+        self.assertEqual(manager.get_description('class', 'Report'), ('Список объектов', True))
+        self.assertEqual(manager.get_description('class', 'Builder'), ('Строитель', True))
+        self.assertEqual(manager.get_description('class', 'view', exact_match=False), ('Вид', True))
+        self.assertEqual(manager.get_description('class', 'Missing'), (None, False))
@@ -0,0 +1,28 @@
+import unittest
+from src.docblock import clean_comment
+
+
+class TestCleanComment(unittest.TestCase):
+    def test_matches_php_clean_comment(self):
+        cases = [
+            ('', ''),
+            ('/**\n     * Получает список пользователей\n     *\n     * @param int $id\n     * @return array\n     */',
+             'Получает список пользователей'),
+            ('/**\n * Returns the user. Second sentence.\n */', 'Returns the user.'),
+            ('/** Метод API. Подробности */', 'Метод API.'),
+            ('/** One two three four five six seven eight nine ten eleven */',
+             'One two three four five six seven eight nine ten...'),
+            ('/**\n * Первая строка\n * вторая строка\n */', 'Первая строка вторая строка'),
+        ]
+        for comment, expected in cases:
+            with self.subTest(comment=comment):
+                self.assertEqual(clean_comment(comment), expected)
+
+    def test_keeps_php_trim_and_falsy_line_semantics(self):
+        # Строка '0' в PHP ложна и пропускается, а неразрывный пробел trim() не удаляет
+        self.assertEqual(clean_comment('/**\n * 0\n * Текст\n */'), 'Текст')
+        self.assertEqual(clean_comment('/**\n * Описание \n */'), 'Описание ')
+
+
+if __name__ == '__main__':
+    unittest.main()
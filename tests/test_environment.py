@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.environment import EnvironmentProbe
+
+
+class TestEnvironmentProbe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmp.name, 'cache')
+        self.php = Path(self.tmp.name, 'php')
+        self.php.write_text('#!/bin/sh\necho "PHP 8.3.0 (cli)"\n', encoding='utf-8')
+        self.php.chmod(0o755)
+        installed = Path(self.tmp.name, 'vendor', 'composer', 'installed.json')
+        installed.parent.mkdir(parents=True)
+        self.installed = installed
+        self._write_installed('v5.0.0')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_installed(self, version):
+        self.installed.write_text(json.dumps({'packages': [{'name': 'nikic/php-parser', 'version': version}]}),
+                                  encoding='utf-8')
+
+    def _probe(self, cache_dir=None):
+        return EnvironmentProbe(cache_dir or self.cache_dir, php_binary=str(self.php), project_dir=self.tmp.name)
+
+    def test_php_check_is_reused_until_binary_changes(self):
+        with mock.patch('src.environment.check_php_environment', return_value=True) as check:
+            self.assertTrue(self._probe().php_available())
+            probe = self._probe()
+            self.assertTrue(probe.php_available())
+            self.assertEqual((check.call_count, probe.hits), (1, 1))
+
+            # Обновленный PHP проверяется заново
+            stat = self.php.stat()
+            os.utime(self.php, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            self.assertTrue(self._probe().php_available())
+            self.assertEqual(check.call_count, 2)
+        check.assert_called_with(str(self.php))
+
+    def test_php_parser_version_follows_composer_files(self):
+        self.assertEqual(self._probe().php_parser_version(), 'v5.0.0')
+        with mock.patch('src.environment.get_php_parser_version') as get_version:
+            self.assertEqual(self._probe().php_parser_version(), 'v5.0.0')
+            get_version.assert_not_called()
+
+        self._write_installed('v5.1.0')
+        stat = self.installed.stat()
+        os.utime(self.installed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self._probe().php_parser_version(), 'v5.1.0')
+
+    def test_missing_binary_and_broken_cache(self):
+        self.cache_dir.mkdir()
+        Path(self.cache_dir, EnvironmentProbe.FILENAME).write_text('{', encoding='utf-8')
+        probe = EnvironmentProbe(self.cache_dir, php_binary=str(Path(self.tmp.name, 'missing-php')))
+        self.assertFalse(probe.php_available())
+        self.assertTrue(self._probe().php_available())
+
+
+if __name__ == '__main__':
+    unittest.main()
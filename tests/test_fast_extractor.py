@@ -0,0 +1,131 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from benchmarks.corpus import generate_project
+from src.fast_extractor import FastExtractor
+from src.parser_pool import ParserPool
+from src.php_parser import PHPParser
+from src.php_tokenizer import UnsupportedSyntax
+from src.php_worker import PHPWorker
+from src.report_item import Element
+from src.utils import check_php_environment
+from tests.helpers import CLASS_FILE, FALLBACK_WORKER, SCRIPT_FILE
+
+UNSUPPORTED = {
+    'trait': '<?php trait Loggable { function log() {} }',
+    'enum': '<?php enum Suit: string { case Hearts = "H"; }',
+    'attribute': '<?php #[Entity] class User {}',
+    'anonymous class': '<?php $handler = new class { public $a; };',
+    'nested class': '<?php function make() { class Inner {} }',
+    'nested function': '<?php function outer() { function inner() {} }',
+    'const in block': '<?php if (true) { const X = 1; }',
+    'interpolated assignment': '<?php $a = "{$b[$c = 1]}";',
+    'unterminated string': "<?php $a = 'text;",
+    'short open tag': '<? $a = 1;',
+    'unbalanced brace': '<?php class A { public function a() {}',
+    'property hooks': '<?php class A { public string $name { get => "x"; } }',
+}
+
+
+class TestFastExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = FastExtractor()
+
+    def test_class_members_follow_element_visitor(self):
+        doc = '/**\n * Отчет. Подробности.\n */'
+        self.assertEqual(self.extractor.extract(CLASS_FILE), [
+            Element('class', 'Report', '', doc, 9),
+            Element('class_constant', 'Report::VERSION', 'VERSION', '/** Версия */', 14),
+            Element('class_constant', 'Report::MINOR', 'MINOR', '/** Версия */', 14),
+            Element('property', 'Report::$title', 'title', '/** @var string */', 17),
+            Element('property', 'Report::$subtitle', 'subtitle', '/** @var string */', 17),
+            Element('method', 'Report::__construct', '__construct', '', 19),
+            Element('method', 'Report::build', 'build', '', 24),
+            Element('method', 'Report::list', 'list', '/** Отрисовка */', 29),
+        ])
+
+    def test_top_level_assignments_follow_element_visitor(self):
+        elements = self.extractor.extract(SCRIPT_FILE)
+        self.assertEqual([(element.type, element.name, element.line) for element in elements], [
+            ('constant', 'DEBUG', 3), ('constant', 'LEVEL', 3), ('function', 'helper', 5),
+            ('variable', '$config', 12), ('variable', '$callback', 17), ('variable', '$inner', 17),
+            ('variable', '$arrow', 18), ('variable', '$w', 18), ('variable', '$i', 20),
+            ('variable', '$text', 21), ('variable', '$class', 24), ('variable', '$title', 26),
+        ])
+        self.assertEqual(elements[0].doc, '/** Флаг */')
+        self.assertEqual(elements[3].doc, '/** Конфиг */')
+
+    def test_matches_corpus_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = generate_project(tmp, files=60)
+            expected = {}
+            for element in manifest:
+                expected.setdefault(element['relative_path'], []).append(
+                    (element['type'], element['name'], element.get('short_name', ''), element['startLine']))
+
+            for relative_path, elements in expected.items():
+                with self.subTest(path=relative_path):
+                    extracted = self.extractor.extract_file(Path(tmp, relative_path))
+                    self.assertEqual([(e.type, e.name, e.short_name, e.line) for e in extracted], elements)
+
+    def test_unsupported_syntax_is_reported(self):
+        for construct, code in UNSUPPORTED.items():
+            with self.subTest(construct=construct):
+                with self.assertRaises(UnsupportedSyntax):
+                    self.extractor.extract(code)
+
+
+class TestParserPoolEngine(unittest.TestCase):
+    def test_unsupported_files_fall_back_to_php_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            simple = Path(tmp, 'Simple.php')
+            simple.write_text('<?php\nclass Simple {}\n', encoding='utf-8')
+            trait = Path(tmp, 'Trait.php')
+            trait.write_text(UNSUPPORTED['trait'], encoding='utf-8')
+
+            pool = ParserPool(engine='python')
+            worker = pool.parsers[0].worker = PHPWorker(timeout=2, command=[sys.executable, '-c', FALLBACK_WORKER])
+            try:
+                results = list(pool.parse_files([simple, trait]))
+            finally:
+                pool.close()
+
+        self.assertEqual(results, [(simple, [Element('class', 'Simple', '', '', 2)]),
+                                   (trait, [Element('class', 'Fallback', '', '', 1)])])
+        self.assertEqual((pool.fast_parsed, pool.fallbacks, worker.starts), (1, 1, 1))
+
+
+@unittest.skipUnless(check_php_environment() and Path('vendor/nikic/php-parser').exists(),
+                     'нужны PHP и nikic/php-parser')
+class TestEnginesAgree(unittest.TestCase):
+    """Дифференциальная проверка: встроенный разбор и PHP-Parser на одном корпусе"""
+
+    def test_fast_extractor_matches_php_parser(self):
+        extractor = FastExtractor()
+        parser = PHPParser()
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_project(tmp, files=100)
+            samples = {'samples/Report.php': CLASS_FILE, 'samples/script.php': SCRIPT_FILE}
+            for relative_path, code in samples.items():
+                Path(tmp, relative_path).parent.mkdir(exist_ok=True)
+                Path(tmp, relative_path).write_text(code, encoding='utf-8')
+
+            files = sorted(Path(tmp).rglob('*.php')) + sorted(Path('my-project').rglob('*.php'))
+            fast_parsed = 0
+            try:
+                for file_path in files:
+                    with self.subTest(path=str(file_path)):
+                        try:
+                            elements = extractor.extract_file(file_path)
+                        except UnsupportedSyntax:
+                            continue
+                        fast_parsed += 1
+                        self.assertEqual(elements, parser.parse_file(file_path))
+            finally:
+                parser.close()
+            self.assertGreater(fast_parsed, len(files) // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from src.file_discovery import FileDiscovery, compile_gitignore_rule
+
+
+class TestFileDiscovery(unittest.TestCase):
+    FILES = [
+        'index.php', 'view.phtml', 'readme.md', 'models/User.php', 'models/old/Legacy.php',
+        'vendor/lib/Lib.php', 'runtime/cache.php', 'config/main.inc', 'a-b.php', 'a/z.php',
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        for name in self.FILES:
+            path = self.base / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('<?php\n', encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _relative(self, discovery):
+        return [path.relative_to(self.base).as_posix() for path in discovery]
+
+    def test_default_walk_is_ordered_like_rglob(self):
+        self.assertEqual(self._relative(FileDiscovery(self.base)), [
+            'a-b.php', 'index.php', 'a/z.php', 'models/User.php', 'models/old/Legacy.php',
+            'runtime/cache.php', 'vendor/lib/Lib.php',
+        ])
+
+    def test_filters(self):
+        discovery = FileDiscovery(self.base, extensions=('.php', '.phtml', '.inc'),
+                                  exclude=['vendor', 'runtime'], include=['models/*', '*.phtml', 'config/*'])
+        self.assertEqual(self._relative(discovery),
+                         ['view.phtml', 'config/main.inc', 'models/User.php', 'models/old/Legacy.php'])
+        self.assertEqual(discovery.pruned, 2)
+        self.assertTrue(discovery.accepts('models/old/Legacy.php'))
+        self.assertFalse(discovery.accepts('vendor/lib/Lib.php'))
+
+    def test_gitignore(self):
+        (self.base / '.gitignore').write_text('vendor/\n/runtime\n*.phtml\nold/\n', encoding='utf-8')
+        (self.base / 'models' / '.gitignore').write_text('!old/\n', encoding='utf-8')
+        discovery = FileDiscovery(self.base, use_gitignore=True)
+        self.assertEqual(self._relative(discovery),
+                         ['a-b.php', 'index.php', 'a/z.php', 'models/User.php', 'models/old/Legacy.php'])
+        self.assertFalse(discovery.accepts('runtime/cache.php'))
+        self.assertTrue(discovery.accepts('models/old/Legacy.php'))
+
+    def test_gitignore_rule_translation(self):
+        regex, negate, dir_only = compile_gitignore_rule('docs/**/*.php')
+        self.assertTrue(regex.match('docs/a/b/c.php'))
+        self.assertTrue(regex.match('docs/c.php'))
+        self.assertFalse(regex.match('src/docs/c.php'))
+        self.assertIsNone(compile_gitignore_rule('# comment'))
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), 'symlinks are not supported')
+    def test_symlink_loops_are_skipped(self):
+        os.symlink(self.base, self.base / 'models' / 'loop')
+        discovery = FileDiscovery(self.base, follow_symlinks=True)
+        files = self._relative(discovery)
+        self.assertEqual(len(files), len(set(files)))
+        self.assertEqual(discovery.symlink_loops, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
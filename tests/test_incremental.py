@@ -0,0 +1,107 @@
+import csv
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from benchmarks.corpus import generate_project
+from src.incremental import git_changed_files, read_report_items
+from src.php_analyzer import PHPAnalyzer
+from src.report_item import ReportItem
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class TestGitChangedFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmp.name)
+        self.project = self.repo / 'project'
+        for name in ('A.php', 'B.php', 'C.php', 'D.php'):
+            (self.project / 'src').mkdir(parents=True, exist_ok=True)
+            (self.project / 'src' / name).write_text(f'<?php // {name} unique content\n', encoding='utf-8')
+        (self.repo / 'outside.php').write_text('<?php\n', encoding='utf-8')
+        self._git('init', '-q')
+        self._git('add', '-A')
+        self._git('-c', 'user.email=dev@example.com', '-c', 'user.name=dev', 'commit', '-qm', 'init')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _git(self, *args):
+        subprocess.run(['git', '-C', str(self.repo), *args], check=True, capture_output=True)
+
+    def test_reports_paths_relative_to_analyzed_directory(self):
+        (self.project / 'src' / 'A.php').write_text('<?php // changed\n', encoding='utf-8')
+        (self.project / 'src' / 'B.php').unlink()
+        self._git('mv', 'project/src/C.php', 'project/src/E.php')
+        (self.project / 'New.php').write_text('<?php\n', encoding='utf-8')
+        (self.repo / 'outside.php').write_text('<?php // changed\n', encoding='utf-8')
+
+        self.assertEqual(git_changed_files(self.project, 'HEAD'),
+                         {'src/A.php', 'src/B.php', 'src/C.php', 'src/E.php', 'New.php'})
+
+
+class TestReadReportItems(unittest.TestCase):
+    def test_skips_changed_paths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = Path(tmp, 'report.csv')
+            with open(report, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['№', 'Относительный путь', '№ в классе', 'Наименование', 'Тип', 'Описание', 'Строка'])
+                writer.writerow([1, 'a.php', 1, 'A', 'Класс', 'Описание, с запятой', 3])
+                writer.writerow([2, 'b.php', 1, 'B', 'Класс', '', 5])
+
+            items = list(read_report_items(report, {'b.php'}, {'class': 'Класс'}))
+
+        self.assertEqual(items, [ReportItem(relative_path='a.php', item_number=1, name='A', type='class',
+                                            type_ru='Класс', description='Описание, с запятой', line_number=3)])
+
+
+class TestPatchReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.project = self.root / 'project'
+        self.paths = sorted({element['relative_path'] for element in generate_project(self.project, files=30)})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _analyzer(self, descriptions):
+        return PHPAnalyzer(str(self.root / descriptions), cache_dir=None, engine='python', failure_report=None)
+
+    def test_patched_report_matches_full_run(self):
+        report = self.root / 'report.csv'
+        with self._analyzer('descriptions') as analyzer:
+            analyzer.analyze_directory(self.project, report)
+
+        modified, deleted, renamed = self.paths[0], self.paths[1], self.paths[2]
+        added = 'src/Added/Added.php'
+        renamed_to = 'src/Renamed/Renamed.php'
+        with open(self.project / modified, 'a', encoding='utf-8') as f:
+            f.write('\nclass PatchedExtra\n{\n    public function run() {}\n}\n')
+        (self.project / added).parent.mkdir(parents=True)
+        (self.project / added).write_text('<?php\n/** Новый */\nclass Added\n{\n    public $value;\n}\n',
+                                          encoding='utf-8')
+        (self.project / deleted).unlink()
+        (self.project / renamed_to).parent.mkdir(parents=True)
+        (self.project / renamed).rename(self.project / renamed_to)
+
+        with self._analyzer('descriptions') as analyzer:
+            analyzer.patch_report(self.project, report, [modified, added, deleted, renamed, renamed_to])
+            patched_elements = sum(analyzer.stats['total'].values())
+
+        full = self.root / 'full.csv'
+        with self._analyzer('fresh') as analyzer:
+            analyzer.analyze_directory(self.project, full)
+            full_elements = sum(analyzer.stats['total'].values())
+
+        self.assertEqual(report.read_bytes(), full.read_bytes())
+        self.assertIn(b'PatchedExtra', full.read_bytes())
+        self.assertNotIn(renamed.encode(), full.read_bytes())
+        # Отчет обновлен по трем файлам, а не пересобран полным анализом
+        self.assertLess(patched_elements, full_elements / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
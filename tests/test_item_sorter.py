@@ -0,0 +1,46 @@
+import random
+import unittest
+from src.item_sorter import ItemSorter
+from src.report_item import ReportItem
+
+
+class TestItemSorter(unittest.TestCase):
+    def _files(self):
+        rnd = random.Random(1)
+        paths = [f"dir{rnd.randrange(5)}/File{i}.php" for i in range(40)] + ['a.php', 'a/b.php', 'a-b.php']
+        for path in paths:
+            yield [ReportItem(path, j, f"{path}#{j}", 'method', 'Метод', '', rnd.randrange(5))
+                   for j in range(rnd.randrange(6))]
+
+    def test_matches_full_sort_with_spilled_runs(self):
+        files = list(self._files())
+        expected = sorted((item for items in files for item in items),
+                          key=lambda x: (x.relative_path, x.line_number))
+
+        for buffer_items in (0, 1, 7):
+            with self.subTest(buffer_items=buffer_items):
+                sorter = ItemSorter(buffer_items)
+                for items in files:
+                    sorter.add_file_items(items)
+                self.assertEqual(list(sorter), expected)
+                self.assertEqual(sorter.count, len(expected))
+                if buffer_items:
+                    self.assertGreater(sorter.spilled_runs, 1)
+                sorter.close()
+
+    def test_spilled_items_share_path(self):
+        sorter = ItemSorter(1)
+        for name in ('b', 'a'):
+            path = f"{name}.php"
+            sorter.add_file_items([ReportItem(path, i, f"n{i}", 'method', 'Метод', '', i) for i in range(3)])
+        self.assertEqual(sorter.spilled_runs, 2)
+        items = list(sorter)
+        sorter.close()
+
+        self.assertEqual([item.relative_path for item in items], ['a.php'] * 3 + ['b.php'] * 3)
+        self.assertIs(items[0].relative_path, items[2].relative_path)
+        self.assertIs(items[3].type_ru, items[5].type_ru)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from src.log import LOGGER_NAME, VERBOSE, ProgressReporter, configure_logging, get_logger, log_event
+
+
+class TestConfigureLogging(unittest.TestCase):
+    def tearDown(self):
+        logger = logging.getLogger(LOGGER_NAME)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        ProgressReporter.enabled = False
+
+    def test_verbosity_levels(self):
+        logger = get_logger('test')
+        configure_logging(-1)
+        self.assertFalse(logger.isEnabledFor(logging.INFO))
+        self.assertTrue(logger.isEnabledFor(logging.WARNING))
+        self.assertFalse(ProgressReporter.enabled)
+
+        configure_logging(0)
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+        self.assertFalse(logger.isEnabledFor(VERBOSE))
+        self.assertTrue(ProgressReporter.enabled)
+
+        configure_logging(1)
+        self.assertTrue(logger.isEnabledFor(VERBOSE))
+        self.assertFalse(logger.isEnabledFor(logging.DEBUG))
+
+        configure_logging(2)
+        self.assertTrue(logger.isEnabledFor(logging.DEBUG))
+
+    def test_json_log_keeps_summary_events_in_quiet_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'events.jsonl')
+            configure_logging(-1, path)
+            logger = get_logger('test')
+            log_event(logger, logging.INFO, 'analysis_finished', "Готово за %.1f с", 1.5, files=3)
+            logger.debug("не попадает в журнал")
+            configure_logging(0)
+
+            with open(path, encoding='utf-8') as f:
+                events = [json.loads(line) for line in f]
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event'], 'analysis_finished')
+        self.assertEqual(events[0]['message'], "Готово за 1.5 с")
+        self.assertEqual(events[0]['files'], 3)
+        self.assertEqual(events[0]['logger'], 'php_analyzer.test')
+
+
+class TestProgressReporter(unittest.TestCase):
+    def setUp(self):
+        ProgressReporter.enabled = True
+
+    def tearDown(self):
+        ProgressReporter.enabled = False
+
+    def test_output_is_rate_limited(self):
+        stream = io.StringIO()
+        progress = ProgressReporter(total=100, stream=stream, plain_interval=3600)
+        for _ in range(50):
+            progress.update()
+        self.assertEqual(stream.getvalue(), '')
+        self.assertEqual(progress.done, 50)
+
+        progress.interval = 0
+        progress.update()
+        self.assertEqual(len(stream.getvalue().splitlines()), 1)
+
+    def test_line_contains_rate_and_eta(self):
+        progress = ProgressReporter(total=10, stream=io.StringIO())
+        progress.started -= 2
+        progress.done = 4
+        line = progress.format_line(progress.started + 2)
+        self.assertIn('4/10 (40%)', line)
+        self.assertIn('2.0 файл/с', line)
+        self.assertIn('осталось ~3 с', line)
+
+        progress.total = None
+        self.assertNotIn('осталось', progress.format_line(progress.started + 2))
+
+    def test_total_is_counted_in_background(self):
+        progress = ProgressReporter(stream=io.StringIO())
+        ready = threading.Event()
+
+        def files():
+            # Обход продолжается, пока не отпущен: строка прогресса уже выводится без итога
+            ready.wait(5)
+            yield from range(7)
+
+        progress.count_total(files())
+        progress.done = 3
+        self.assertIsNone(progress.total)
+        self.assertNotIn('осталось', progress.format_line())
+        ready.set()
+        for _ in range(500):
+            if progress.total is not None:
+                break
+            time.sleep(0.01)
+        self.assertEqual(progress.total, 7)
+        self.assertIn('3/7', progress.format_line())
+
+    def test_disabled_reporter_is_silent(self):
+        ProgressReporter.enabled = False
+        stream = io.StringIO()
+        progress = ProgressReporter(total=1, stream=stream, plain_interval=0)
+        progress.update()
+        progress.finish()
+        self.assertEqual(stream.getvalue(), '')
@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from src.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_and_stats(self):
+        cache = ParseCache(self.tmp.name, version='v1')
+        key = cache.make_key(b'<?php class A {}')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [{'type': 'class', 'name': 'A', 'desc': 'Описание', 'startLine': 1}])
+        self.assertEqual(cache.get(key)[0]['desc'], 'Описание')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+        reopened = ParseCache(self.tmp.name, version='v1')
+        self.assertIsNotNone(reopened.get(key))
+        reopened.close()
+
+    def test_key_depends_on_version(self):
+        first = ParseCache(self.tmp.name, version='v1')
+        second = ParseCache(self.tmp.name, version='v2')
+        self.assertNotEqual(first.make_key(b'x'), second.make_key(b'x'))
+        first.close()
+        second.close()
+
+    def test_quarantine_is_lifted_by_successful_parse(self):
+        cache = ParseCache(self.tmp.name)
+        key = cache.make_key(b'<?php $huge = [];')
+        self.assertIsNone(cache.quarantined(key))
+        cache.quarantine(key, 'Нет ответа за 60 с')
+        cache.close()
+
+        reopened = ParseCache(self.tmp.name)
+        self.assertEqual(reopened.quarantined(key), 'Нет ответа за 60 с')
+        reopened.put(key, [])
+        self.assertIsNone(reopened.quarantined(key))
+        reopened.close()
+
+    def test_eviction_keeps_cache_bounded(self):
+        cache = ParseCache(self.tmp.name, max_size_mb=0.001)
+        for i in range(50):
+            cache.put(cache.make_key(str(i).encode()), [{'name': f'n{i}' * 50}])
+        cache.evict()
+        self.assertGreater(cache.evictions, 0)
+        self.assertIsNotNone(cache.get(cache.make_key(b'49')))
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
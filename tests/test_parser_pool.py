@@ -0,0 +1,184 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from src.parse_cache import ParseCache
+from src.parser_pool import ParseFailure, ParserPool
+from src.php_parser import PHPParser
+from src.php_worker import PHPWorker
+from tests.helpers import FAKE_WORKER, PARSED
+
+
+class TestParserPoolFailures(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.good = Path(self.tmp.name, 'Good.php')
+        self.good.write_text('<?php class Good {}', encoding='utf-8')
+        self.crash = Path(self.tmp.name, 'crash.php')
+        self.crash.write_text('<?php $huge = [];', encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, files, command=None, **options):
+        cache = ParseCache(Path(self.tmp.name, 'cache'))
+        pool = ParserPool(cache=cache, **options)
+        worker = pool.parsers[0].worker = PHPWorker(timeout=2, command=command or [sys.executable, '-c', FAKE_WORKER])
+        try:
+            return list(pool.parse_files(files)), pool, worker
+        finally:
+            pool.close()
+            cache.close()
+
+    def test_failing_file_is_retried_and_quarantined(self):
+        results, pool, worker = self._run([self.crash, self.good])
+        self.assertEqual(results, [(self.crash, []), (self.good, PARSED)])
+        self.assertEqual(worker.starts, 3)
+        self.assertEqual(len(pool.failures), 1)
+        self.assertEqual(pool.failures[0]._replace(error=''), ParseFailure(self.crash, '', 2, True))
+
+        # Следующий запуск не отправляет файл из карантина воркеру
+        results, pool, worker = self._run([self.crash])
+        self.assertEqual((results, worker.starts), ([(self.crash, [])], 0))
+        self.assertEqual(pool.failures[0].attempts, 0)
+
+        # С retry_quarantined файл разбирается снова, успешный разбор снимает карантин
+        self.crash.rename(Path(self.tmp.name, 'fixed.php'))
+        fixed = Path(self.tmp.name, 'fixed.php')
+        results, pool, _ = self._run([fixed], retry_quarantined=True)
+        self.assertEqual((results, pool.failures), ([(fixed, PARSED)], []))
+        results, pool, worker = self._run([fixed])
+        self.assertEqual((results, worker.starts), ([(fixed, PARSED)], 0))
+
+    def test_unavailable_worker_does_not_quarantine(self):
+        results, pool, _ = self._run([self.good], command=['/nonexistent/php'])
+        self.assertEqual(results, [(self.good, [])])
+        self.assertEqual(pool.failures[0]._replace(error=''), ParseFailure(self.good, '', 1, False))
+
+        results, pool, _ = self._run([self.good])
+        self.assertEqual((results, pool.failures), ([(self.good, PARSED)], []))
+
+
+class TestParserPoolWindow(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(40):
+            self.files.append(Path(self.tmp.name, f"File{i}.php"))
+            self.files[-1].write_text(f"<?php class File{i} {{}}", encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_files_are_taken_from_discovery_by_window(self):
+        pulled = 0
+
+        def discovery():
+            nonlocal pulled
+            for file_path in self.files:
+                pulled += 1
+                yield file_path
+
+        pool = ParserPool(jobs=2)
+        for parser in pool.parsers:
+            parser.worker = PHPWorker(timeout=2, command=[sys.executable, '-c', FAKE_WORKER])
+        try:
+            parsed = pool.parse_files(discovery())
+            first = next(parsed)
+            # Обход идет вперед не дальше окна, а не до конца проекта
+            self.assertEqual(pulled, 2 * ParserPool.WINDOW_PER_JOB)
+            results = [first, *parsed]
+        finally:
+            pool.close()
+        self.assertEqual(results, [(file_path, PARSED) for file_path in self.files])
+
+    def test_large_files_are_dispatched_first(self):
+        large = Path(self.tmp.name, 'Large.php')
+        large.write_text('<?php class Large {}\n' + '// padding\n' * 10000, encoding='utf-8')
+        files = [*self.files[:5], large]
+        started = []
+        lock = threading.Lock()
+
+        pool = ParserPool(jobs=2)
+        for parser in pool.parsers:
+            parser.worker = PHPWorker(timeout=2, command=[sys.executable, '-c', FAKE_WORKER])
+        parse = pool._parse
+
+        def record(file_path):
+            with lock:
+                started.append(file_path)
+            return parse(file_path)
+
+        pool._parse = record
+        try:
+            results = list(pool.parse_files(files))
+        finally:
+            pool.close()
+        # Большой файл, найденный последним, получает один из воркеров сразу, а выдается в порядке обхода
+        self.assertIn(large, started[:2])
+        self.assertEqual([file_path for file_path, _ in results], files)
+
+
+# Поддельный воркер: отвечает классом с путем файла, чтобы было видно, какой файл разобран
+NAMING_WORKER = r'''
+import json, sys
+from pathlib import Path
+for line in sys.stdin.buffer:
+    path = Path(json.loads(line)['path'])
+    name = f"{path.parent.name}/{path.name}"
+    columns = {'type': [0], 'name': [name], 'short_name': [''], 'doc': [''], 'line': [1]}
+    payload = json.dumps({'v': %d, 'elements': columns, 'error': None}).encode('utf-8')
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\n' + payload)
+    sys.stdout.buffer.flush()
+''' % PHPParser.PROTOCOL_VERSION
+
+
+class TestParserPoolDeduplication(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for module, content in (('a', 'Lib'), ('b', 'Lib'), ('c', 'Other'), ('d', 'Lib'), ('e', 'Lib')):
+            file_path = Path(self.tmp.name, module, 'Lib.php')
+            file_path.parent.mkdir()
+            file_path.write_text(f"<?php class {content} {{}}", encoding='utf-8')
+            self.files.append(file_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _parse(self, jobs, **options):
+        pool = ParserPool(jobs=jobs, **options)
+        for parser in pool.parsers:
+            parser.worker = PHPWorker(timeout=2, command=[sys.executable, '-c', NAMING_WORKER])
+        try:
+            return [(path, [e.name for e in elements]) for path, elements in pool.parse_files(self.files)], pool
+        finally:
+            pool.close()
+
+    def test_identical_files_are_parsed_once_in_parallel(self):
+        results, pool = self._parse(jobs=2)
+        self.assertEqual([path for path, _ in results], self.files)
+        self.assertEqual([names for _, names in results],
+                         [['a/Lib.php'], ['a/Lib.php'], ['c/Lib.php'], ['a/Lib.php'], ['a/Lib.php']])
+        self.assertEqual(pool.deduplicated, 3)
+
+    def test_repeated_content_is_reused_when_streaming(self):
+        results, pool = self._parse(jobs=1)
+        self.assertEqual([names for _, names in results],
+                         [['a/Lib.php'], ['a/Lib.php'], ['c/Lib.php'], ['a/Lib.php'], ['a/Lib.php']])
+        self.assertEqual(pool.deduplicated, 3)
+
+        _, pool = self._parse(jobs=2, deduplicate=False)
+        self.assertEqual(pool.deduplicated, 0)
+
+    def test_least_recently_seen_content_is_evicted(self):
+        # В памяти одно содержимое: Other вытесняет Lib, следующая копия Lib разбирается снова
+        results, pool = self._parse(jobs=1, shared_files=1)
+        self.assertEqual([names for _, names in results],
+                         [['a/Lib.php'], ['a/Lib.php'], ['c/Lib.php'], ['d/Lib.php'], ['d/Lib.php']])
+        self.assertEqual((pool.deduplicated, len(pool._shared)), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.parser_pool import ParseFailure
+from src.php_analyzer import PHPAnalyzer
+from src.report_item import Element
+
+
+class TestProcessElement(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        methods = [{'name': 'Report::build', 'desc': 'Из словаря'}, {'name': 'Report::empty', 'desc': ''}]
+        Path(self.tmp.name, 'methods.json').write_text(json.dumps(methods), encoding='utf-8')
+        self.analyzer = PHPAnalyzer(self.tmp.name, cache_dir=None, description_snapshot=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _process(self, name, doc):
+        element = Element('method', name, name.split('::')[1], doc, 7)
+        return self.analyzer._process_element(element, 'a.php', 1)
+
+    def test_docblock_is_cleaned_only_without_json_description(self):
+        with mock.patch('src.php_analyzer.clean_comment', wraps=lambda doc: 'DocBlock') as clean:
+            self.assertEqual(self._process('Report::build', '/** Returns. */').description, 'Из словаря')
+            clean.assert_not_called()
+
+            # Пустое описание в словаре, как и отсутствие записи, берется из DocBlock
+            self.assertEqual(self._process('Report::empty', '/** Пусто */').description, 'DocBlock')
+            self.assertEqual(self._process('Report::other', '/** Другое */').description, 'DocBlock')
+            self.assertEqual(clean.call_count, 2)
+
+    def test_cleaned_docblock_is_saved_to_found(self):
+        item = self._process('Report::other', '/**\n * Builds the report. Details.\n * @return void\n */')
+        self.assertEqual(item.description, 'Builds the report.')
+        self.assertEqual(self.analyzer.description_manager.pending_found['found_methods.json'],
+                         [{'name': 'Report::other', 'desc': 'Builds the report.'}])
+
+
+class TestFailureReport(unittest.TestCase):
+    def test_report_lists_failures_and_is_removed_after_clean_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = Path(tmp, 'failures.json')
+            analyzer = PHPAnalyzer(tmp, cache_dir=None, description_snapshot=False, failure_report=report)
+            analyzer.base_dir = Path(tmp, 'project')
+            analyzer.parser_pool.failures = [
+                ParseFailure(Path(tmp, 'project', 'b.php'), 'Нет ответа за 60 с', 2, True),
+                ParseFailure(Path(tmp, 'project', 'a.php'), 'Не удалось запустить воркер', 1, False),
+            ]
+            analyzer._write_failure_report()
+            self.assertEqual(json.loads(report.read_text(encoding='utf-8')), [
+                {'path': 'a.php', 'error': 'Не удалось запустить воркер', 'attempts': 1, 'quarantine': False},
+                {'path': 'b.php', 'error': 'Нет ответа за 60 с', 'attempts': 2, 'quarantine': True},
+            ])
+
+            analyzer.parser_pool.failures = []
+            analyzer._write_failure_report()
+            self.assertFalse(report.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
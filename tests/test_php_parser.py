@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.config import Config
+from src.php_parser import PHPParser
+from src.php_worker import PHPWorker
+from src.report_item import Element
+
+# Поддельный воркер: отвечает элементами по столбцам с версией протокола из запроса пути
+FAKE_WORKER = r'''
+import json, sys
+for line in sys.stdin.buffer:
+    path = json.loads(line)['path']
+    version, _, name = path.partition(':')
+    columns = {'type': [0, 1], 'name': [name, name + '::run'], 'short_name': ['', 'run'],
+               'doc': ['/** Класс */', ''], 'line': [3, 5]}
+    if name == 'broken':
+        del columns['line']
+    payload = json.dumps({'v': int(version), 'elements': columns, 'error': None}).encode('utf-8')
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\n' + payload)
+    sys.stdout.buffer.flush()
+'''
+
+
+class TestPHPParserProtocol(unittest.TestCase):
+    def setUp(self):
+        self.parser = PHPParser()
+        self.parser.worker = PHPWorker(timeout=2, command=[sys.executable, '-c', FAKE_WORKER])
+
+    def tearDown(self):
+        self.parser.close()
+
+    def test_unpacks_columnar_response(self):
+        elements = self.parser.parse_file(f"{PHPParser.PROTOCOL_VERSION}:Report")
+        self.assertEqual(elements, [Element('class', 'Report', '', '/** Класс */', 3),
+                                    Element('method', 'Report::run', 'run', '', 5)])
+        self.assertIs(elements[1].type, PHPParser.ELEMENT_TYPES[1])
+        self.assertFalse(self.parser.last_failed)
+
+    def test_rejects_other_protocol_version_and_malformed_columns(self):
+        for path in ('1:Report', f"{PHPParser.PROTOCOL_VERSION}:broken"):
+            with self.subTest(path=path):
+                self.assertEqual(self.parser.parse_file(path), [])
+                self.assertTrue(self.parser.last_failed)
+
+
+class TestPHPParserScript(unittest.TestCase):
+    def test_script_is_written_only_when_content_differs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script_path = Path(tmp, 'php_ast_parser.php')
+            with mock.patch.object(Config, 'PHP_PARSER_SCRIPT', str(script_path)):
+                PHPParser().close()
+                self.assertEqual(script_path.read_bytes(), PHPParser.PHP_SCRIPT.encode('utf-8'))
+
+                os.utime(script_path, ns=(0, 0))
+                PHPParser().close()
+                self.assertEqual(script_path.stat().st_mtime_ns, 0)
+
+                script_path.write_text('<?php // старая версия', encoding='utf-8')
+                PHPParser().close()
+                self.assertEqual(script_path.read_bytes(), PHPParser.PHP_SCRIPT.encode('utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import unittest
+from unittest import mock
+from src.php_worker import PHPWorker, PHPWorkerError, PHPWorkerStartError, PHPWorkerTimeout
+
+# Поддельный воркер, говорящий на том же протоколе, что и php_ast_parser.php --worker
+FAKE_WORKER = r'''
+import json, sys, time
+for line in sys.stdin.buffer:
+    request = json.loads(line)
+    if request['path'] == 'crash':
+        sys.exit(3)
+    if request['path'] == 'hang':
+        time.sleep(30)
+    payload = json.dumps({'elements': [{'type': 'class', 'name': request['path']}],
+                          'error': None}).encode('utf-8')
+    sys.stdout.buffer.write(str(len(payload)).encode() + b'\n' + payload)
+    sys.stdout.buffer.flush()
+'''
+
+
+class TestPHPWorker(unittest.TestCase):
+    def setUp(self):
+        self.worker = PHPWorker(timeout=2, command=[sys.executable, '-c', FAKE_WORKER])
+
+    def tearDown(self):
+        self.worker.close()
+
+    def test_reuses_process_between_requests(self):
+        first = self.worker.request({'path': 'A.php'})
+        second = self.worker.request({'path': 'Файл.php'})
+        self.assertEqual(first['elements'][0]['name'], 'A.php')
+        self.assertEqual(second['elements'][0]['name'], 'Файл.php')
+        self.assertEqual(self.worker.starts, 1)
+
+    def test_restarts_after_crash(self):
+        with self.assertRaises(PHPWorkerError):
+            self.worker.request({'path': 'crash'})
+        response = self.worker.request({'path': 'B.php'})
+        self.assertEqual(response['elements'][0]['name'], 'B.php')
+        self.assertEqual(self.worker.restarts, 1)
+
+    def test_timeout_kills_worker(self):
+        self.worker.timeout = 0.5
+        with self.assertRaises(PHPWorkerTimeout):
+            self.worker.request({'path': 'hang'})
+        self.assertFalse(self.worker.is_alive())
+        response = self.worker.request({'path': 'C.php'})
+        self.assertEqual(response['elements'][0]['name'], 'C.php')
+
+    def test_recycles_after_max_files(self):
+        self.worker.max_files = 2
+        for name in ('A.php', 'B.php', 'C.php'):
+            self.assertEqual(self.worker.request({'path': name})['elements'][0]['name'], name)
+        self.assertEqual((self.worker.starts, self.worker.recycles), (2, 1))
+
+    def test_recycles_when_rss_exceeds_limit(self):
+        self.worker.max_rss_mb = 100
+        with mock.patch.object(PHPWorker, 'rss_mb', side_effect=[50.0, 150.0]):
+            self.worker.request({'path': 'A.php'})
+            self.assertTrue(self.worker.is_alive())
+            self.worker.request({'path': 'B.php'})
+        self.assertFalse(self.worker.is_alive())
+        self.assertEqual(self.worker.recycles, 1)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'RSS читается из /proc')
+    def test_reads_rss_of_running_process(self):
+        self.worker.request({'path': 'A.php'})
+        self.assertGreater(self.worker.rss_mb(), 0)
+
+    def test_memory_limit_is_passed_to_php(self):
+        self.assertIn('memory_limit=128M', PHPWorker(memory_limit_mb=128).command)
+        self.assertIn('memory_limit=-1', PHPWorker(memory_limit_mb=0).command)
+
+    def test_start_failure_has_own_error(self):
+        worker = PHPWorker(command=['/nonexistent/php'])
+        with self.assertRaises(PHPWorkerStartError):
+            worker.request({'path': 'A.php'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from benchmarks.corpus import generate_project
+from src.parser_pool import ParserPool
+from src.php_worker import PHPWorker
+from src.prefilter import PreFilter
+from src.report_item import Element
+from tests.helpers import CLASS_FILE, FALLBACK_WORKER, SCRIPT_FILE
+
+# Файлы, которые могут дать элементы, в том числе с комментариями вместо пробелов
+DECLARATIONS = {
+    'class': '<?php\nfinal class Report {}',
+    'class uppercase': '<?php CLASS Report {}',
+    'class comment': '<?php class/* */Report {}',
+    'function': '<?php function helper() {}',
+    'function by reference': '<?php function&helper() {}',
+    'function comment': '<?php function#\nhelper() {}',
+    'const': '<?php const DEBUG = true;',
+    'const comment': '<?php const// x\nDEBUG = true;',
+    'assignment': '<?php $config = [];',
+    'assignment compact': '<?php $a=1;',
+    'assignment comment': '<?php $a/* x */= 1;',
+    'view assignment': '<div><?= $title = "Заголовок" ?></div>',
+    'non-latin variable': '<?php $имя = 1;',
+}
+
+# Файлы, в которых PHP-Parser не найдет элементов
+NO_DECLARATIONS = {
+    'html': '<html><body>class Report { function a() {} }</body></html>',
+    'view': '<div class="title"><?= $this->title ?></div>\n<?php foreach ($items as $item): ?>\n'
+            '<p><?= $item->name ?></p>\n<?php endforeach ?>',
+    'config': "<?php\nreturn [\n    'class' => Foo::class,\n    'const' => 1,\n    'debug' => $debug ?? false,\n];",
+    'comparison': '<?php if ($a == $b && $c === $d) { echo $a => 1; }',
+    'compound assignment': '<?php $total .= "x"; $count += 1;',
+    'empty': '',
+}
+
+
+class TestPreFilter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.prefilter = PreFilter()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _accepts(self, code):
+        file_path = Path(self.tmp.name, 'file.php')
+        file_path.write_text(code, encoding='utf-8')
+        return self.prefilter.accepts(file_path)
+
+    def test_declarations_are_accepted(self):
+        for construct, code in {**DECLARATIONS, 'class file': CLASS_FILE, 'script file': SCRIPT_FILE}.items():
+            with self.subTest(construct=construct):
+                self.assertTrue(self._accepts(code))
+
+    def test_files_without_declarations_are_skipped(self):
+        for construct, code in NO_DECLARATIONS.items():
+            with self.subTest(construct=construct):
+                self.assertFalse(self._accepts(code))
+        self.assertEqual((self.prefilter.checked, self.prefilter.skipped),
+                         (len(NO_DECLARATIONS), len(NO_DECLARATIONS)))
+
+    def test_unreadable_file_is_left_to_parser(self):
+        self.assertTrue(self.prefilter.accepts(Path(self.tmp.name, 'missing.php')))
+        self.assertEqual(self.prefilter.skipped, 0)
+
+    def test_corpus_files_with_elements_are_accepted(self):
+        manifest = generate_project(self.tmp.name, files=60)
+        for relative_path in sorted({element['relative_path'] for element in manifest}):
+            with self.subTest(path=relative_path):
+                self.assertTrue(self.prefilter.accepts(Path(self.tmp.name, relative_path)))
+
+
+class TestParserPoolPreFilter(unittest.TestCase):
+    def _parse(self, files, prefilter):
+        pool = ParserPool(prefilter=prefilter)
+        worker = pool.parsers[0].worker = PHPWorker(timeout=2, command=[sys.executable, '-c', FALLBACK_WORKER])
+        try:
+            return list(pool.parse_files(files)), worker.starts
+        finally:
+            pool.close()
+
+    def test_skipped_files_are_not_sent_to_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = Path(tmp, 'script.php')
+            script.write_text(DECLARATIONS['assignment'], encoding='utf-8')
+            view = Path(tmp, 'view.php')
+            view.write_text(NO_DECLARATIONS['view'], encoding='utf-8')
+            fallback = [Element('class', 'Fallback', '', '', 1)]
+
+            self.assertEqual(self._parse([script, view], prefilter=True), ([(script, fallback), (view, [])], 1))
+            self.assertEqual(self._parse([view], prefilter=True), ([(view, [])], 0))
+            self.assertEqual(self._parse([view], prefilter=False), ([(view, fallback)], 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from src.profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+        self.profiler.enabled = True
+
+    def test_disabled_profiler_records_nothing(self):
+        self.profiler.enabled = False
+        with self.profiler.span('parse_file', 'a.php'):
+            pass
+        self.assertEqual(list(self.profiler.timed_iter('discovery', [1, 2])), [1, 2])
+        self.assertEqual(self.profiler.timed('lookup')(lambda x: x * 2)(3), 6)
+        self.assertEqual(dict(self.profiler.samples), {})
+
+    def test_spans_are_attributed_to_files(self):
+        with self.profiler.span('parse_file', 'a.php'):
+            pass
+        self.profiler.record('parse_file', 0.5, 'b.php')
+        self.profiler.record('process_file', 0.25, 'b.php')
+
+        self.assertEqual(len(self.profiler.samples['parse_file']), 2)
+        self.assertEqual(dict(self.profiler.file_times['b.php']), {'parse_file': 0.5, 'process_file': 0.25})
+        report = self.profiler.report(top=1)
+        self.assertTrue(any(line.strip().startswith('750.0  b.php') for line in report))
+        self.assertFalse(any('a.php' in line for line in report))
+
+    def test_nested_phases_are_not_counted_twice(self):
+        self.profiler.record('parse_file', 0.5, 'a.php')
+        self.profiler.record('php_wait', 0.4, 'a.php')
+        self.profiler.record('prefilter', 0.125, 'b.php')
+        self.profiler.record('parse_file', 0.5, 'b.php')
+
+        files = [line.strip() for line in self.profiler.report() if line.startswith('  ')]
+        # php_wait входит в parse_file: a.php - 500 мс и ниже b.php, вложенная фаза остается в подробностях
+        self.assertEqual(files, ['625.0  b.php (parse_file 500.0, prefilter 125.0)',
+                                 '500.0  a.php (parse_file 500.0, php_wait 400.0)'])
+
+    def test_report_is_logged(self):
+        self.profiler.record('parse_file', 0.5, 'a.php')
+        with self.assertLogs('php_analyzer.profiler', level='INFO') as logs:
+            self.profiler.print_report()
+        self.assertIn('a.php', logs.output[0])
+
+    def test_timed_decorator_and_iterator(self):
+        double = self.profiler.timed('lookup')(lambda x: x * 2)
+        self.assertEqual([double(i) for i in range(3)], [0, 2, 4])
+        self.assertEqual(list(self.profiler.timed_iter('discovery', 'ab')), ['a', 'b'])
+
+        self.assertEqual(len(self.profiler.samples['lookup']), 3)
+        # Последний замер - получение StopIteration
+        self.assertEqual(len(self.profiler.samples['discovery']), 3)
+
+    def test_nearest_rank_percentile(self):
+        ordered = [float(i) for i in range(1, 21)]
+        self.assertEqual(Profiler._percentile(ordered, 0.95), 19.0)
+        self.assertEqual(Profiler._percentile([3.0], 0.95), 3.0)
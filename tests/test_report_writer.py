@@ -0,0 +1,77 @@
+import gzip
+import lzma
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from src.csv_writer import CSVWriter
+from src.jsonl_writer import JsonLinesWriter
+from src.php_analyzer import PHPAnalyzer
+from src.report_item import ReportItem
+from src.sqlite_writer import SQLiteWriter
+
+
+def make_items():
+    return [
+        ReportItem('a.php', 1, 'A', 'class', 'Класс', 'Описание, с "кавычками"', 3),
+        ReportItem('a.php', 1, 'A::run', 'method', 'Метод', '', 5),
+        ReportItem('b.php', 1, 'helper', 'function', 'Функция', 'Помощник', 2),
+    ]
+
+
+class TestReportWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_formats_round_trip_and_skip_paths(self):
+        writers = [CSVWriter(), CSVWriter('gzip'), JsonLinesWriter(), JsonLinesWriter('xz'), SQLiteWriter()]
+        for writer in writers:
+            with self.subTest(format=writer.FORMAT, compression=writer.compression):
+                path = Path(self.tmp.name, writer.default_filename('report', writer.compression))
+                writer.write_sorted(iter(make_items()), path)
+                self.assertEqual(writer.global_row_number, 4)
+
+                items = list(writer.read_items(path, {'b.php'}, PHPAnalyzer.TYPE_MAPPING))
+                self.assertEqual([item.name for item in items], ['A', 'A::run'])
+                self.assertEqual(items[0].type, 'class')
+                self.assertEqual(items[0].description, 'Описание, с "кавычками"')
+                self.assertEqual(str(items[1].line_number), '5')
+
+    def test_compressed_output_matches_plain(self):
+        plain = Path(self.tmp.name, 'report.csv')
+        CSVWriter().write_sorted(make_items(), plain)
+        CSVWriter('gzip').write_sorted(make_items(), Path(self.tmp.name, 'report.csv.gz'))
+        JsonLinesWriter('xz').write_sorted(make_items(), Path(self.tmp.name, 'report.jsonl.xz'))
+
+        self.assertEqual(gzip.decompress(Path(self.tmp.name, 'report.csv.gz').read_bytes()), plain.read_bytes())
+        lines = lzma.decompress(Path(self.tmp.name, 'report.jsonl.xz').read_bytes()).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"row_number": 1', lines[0])
+
+    def test_sqlite_report_is_indexed_and_replaced(self):
+        path = Path(self.tmp.name, 'report.sqlite')
+        SQLiteWriter().write_sorted(make_items(), path)
+        SQLiteWriter().write_sorted(make_items()[:1], path)
+
+        connection = sqlite3.connect(path)
+        try:
+            self.assertEqual(connection.execute('SELECT row_number, name FROM items').fetchall(), [(1, 'A')])
+            indexes = {row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'items'")}
+            self.assertEqual(indexes, {'items_path', 'items_name', 'items_type'})
+            plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM items WHERE name = 'A'").fetchall()
+            self.assertIn('items_name', plan[0][-1])
+        finally:
+            connection.close()
+        self.assertEqual(sorted(p.name for p in Path(self.tmp.name).iterdir()), ['report.sqlite'])
+
+    def test_sqlite_rejects_compression(self):
+        with self.assertRaises(ValueError):
+            SQLiteWriter('gzip')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from benchmarks.corpus import generate_descriptions, generate_project
+from src.description_manager import DescriptionManager
+from src.shard_merger import ShardMerger
+from src.sharding import ShardError, load_shard_results, parse_shard, shard_of
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestShardOf(unittest.TestCase):
+    def test_partition_is_stable_and_covers_all_shards(self):
+        paths = [f"src/Module{i}/File{i}.php" for i in range(400)]
+        shards = [shard_of(path, 4) for path in paths]
+        self.assertEqual(shards, [shard_of(path, 4) for path in paths])
+        self.assertEqual(set(shards), {1, 2, 3, 4})
+        self.assertEqual({shard_of(path, 1) for path in paths}, {1})
+
+    def test_value_does_not_depend_on_process(self):
+        # Шарды на разных машинах должны делить файлы одинаково
+        self.assertEqual([shard_of(path, 16) for path in
+                          ('src/Controller/UserController.php', 'views/index.php', 'config/app.php')],
+                         [14, 1, 7])
+
+
+class TestParseShard(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(parse_shard('1/1'), (1, 1))
+        self.assertEqual(parse_shard('3/4'), (3, 4))
+
+    def test_invalid(self):
+        for spec in ('', '2', '0/3', '4/3', '-1/3', 'a/b', '1/0'):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    parse_shard(spec)
+
+
+class TestMergeShards(unittest.TestCase):
+    """Шарды - отдельные процессы main.py, объединение сравнивается с обычным запуском"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.project = self.root / 'project'
+        manifest = generate_project(self.project, files=60)
+        self.dictionaries = generate_descriptions(manifest, entries=200, hit_ratio=0.3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _workdir(self, name):
+        workdir = self.root / name
+        (workdir / 'descriptions').mkdir(parents=True)
+        for item_type, items in self.dictionaries.items():
+            (workdir / 'descriptions' / DescriptionManager.SOURCE_FILES[item_type]).write_text(
+                json.dumps(items, ensure_ascii=False), encoding='utf-8')
+        return workdir
+
+    def _command(self, *args):
+        return [sys.executable, str(ROOT / 'main.py'), *args]
+
+    def _analysis(self, *args):
+        return self._command(str(self.project), '--engine', 'python', '--no-cache', '--skip-composer',
+                             '--include-lines', '--log-json', 'events.jsonl', *args)
+
+    def _statistics(self, workdir):
+        with open(workdir / 'events.jsonl', 'r', encoding='utf-8') as f:
+            events = [json.loads(line) for line in f]
+        return [{key: event[key] for key in ('found', 'missing', 'empty', 'total')}
+                for event in events if event['event'] == 'statistics'][-1]
+
+    def _descriptions(self, workdir):
+        result = {}
+        for path in sorted((workdir / 'descriptions').glob('*.json')):
+            if not path.name.startswith(('found_', 'empty_')):
+                continue
+            items = json.loads(path.read_text(encoding='utf-8'))
+            # Пустые описания записываются из множества, их порядок не определен
+            result[path.name] = sorted(items, key=json.dumps) if path.name.startswith('empty_') else items
+        return result
+
+    def test_merged_shards_match_single_run(self):
+        single = self._workdir('single')
+        subprocess.run(self._analysis(), cwd=single, check=True, capture_output=True)
+
+        sharded = self._workdir('sharded')
+        shards = [subprocess.Popen(self._analysis('--shard', f"{index}/3", '--jobs', '2'), cwd=sharded,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                  for index in (1, 2, 3)]
+        self.assertEqual([shard.wait() for shard in shards], [0, 0, 0])
+        self.assertFalse((sharded / 'php_analysis.csv').exists())
+        self.assertEqual(self._descriptions(sharded), {})
+        subprocess.run(self._command('merge', '--log-json', 'events.jsonl'), cwd=sharded, check=True,
+                       capture_output=True)
+
+        self.assertEqual((sharded / 'php_analysis.csv').read_bytes(), (single / 'php_analysis.csv').read_bytes())
+        self.assertEqual(self._descriptions(sharded), self._descriptions(single))
+        self.assertIn('found_methods.json', self._descriptions(single))
+        self.assertEqual(self._statistics(sharded), self._statistics(single))
+
+    def test_all_shards_are_required(self):
+        sharded = self._workdir('sharded')
+        for index in (1, 3):
+            subprocess.run(self._analysis('--shard', f"{index}/3"), cwd=sharded, check=True, capture_output=True)
+
+        with self.assertRaises(ShardError):
+            load_shard_results([sharded / 'shards'])
+        merge = subprocess.run(self._command('merge'), cwd=sharded, capture_output=True, text=True)
+        self.assertEqual(merge.returncode, 1)
+        self.assertFalse((sharded / 'php_analysis.csv').exists())
+
+    def test_failure_reports_are_combined(self):
+        def result(index, failures):
+            return {'shard': [index, 2], 'fingerprint': {'format': 'csv', 'compression': None},
+                    'description_store': None, 'discovered': 3, 'files': len(failures), 'rows': 0,
+                    'stats': {}, 'found': [], 'empty': {}, 'failures': failures}
+
+        def failure(path):
+            return {'path': path, 'error': 'Воркер неожиданно завершился', 'attempts': 2, 'quarantine': True}
+
+        workdir = self._workdir('merge')
+        report = workdir / 'parse_failures.json'
+        ShardMerger([result(1, [failure('b.php'), failure('c/d.php')]), result(2, [failure('a.php')])],
+                    workdir / 'descriptions', failure_report=report).merge(workdir / 'php_analysis.csv')
+        self.assertEqual(json.loads(report.read_text(encoding='utf-8')),
+                         [failure('a.php'), failure('b.php'), failure('c/d.php')])
+
+        # Без сбоев у всех шардов отчет прошлого объединения удаляется
+        ShardMerger([result(1, []), result(2, [])], workdir / 'descriptions',
+                    failure_report=report).merge(workdir / 'php_analysis.csv')
+        self.assertFalse(report.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.file_discovery import FileDiscovery
+from src.php_analyzer import PHPAnalyzer
+from src.watcher import InotifyMonitor, PollingMonitor, ReportWatcher
+
+
+class MonitorTests:
+    """Общие проверки мониторов изменений"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        (self.base / 'src').mkdir()
+        (self.base / 'src' / 'A.php').write_text('<?php\n', encoding='utf-8')
+        (self.base / 'B.php').write_text('<?php\n', encoding='utf-8')
+        self.monitor = self.create_monitor(FileDiscovery(self.base))
+
+    def tearDown(self):
+        self.monitor.close()
+        self.tmp.cleanup()
+
+    def collect(self):
+        changed, rescan = self.monitor.poll(0.2)
+        while True:
+            more, more_rescan = self.monitor.poll(0.05)
+            if not more and not more_rescan:
+                return changed, rescan
+            changed |= more
+            rescan = rescan or more_rescan
+
+    def test_reports_modified_created_and_deleted_files(self):
+        (self.base / 'src' / 'A.php').write_text('<?php // changed content\n', encoding='utf-8')
+        (self.base / 'C.php').write_text('<?php\n', encoding='utf-8')
+        (self.base / 'B.php').unlink()
+
+        changed, _ = self.collect()
+        self.assertTrue({self.base / 'src' / 'A.php', self.base / 'C.php', self.base / 'B.php'} <= changed)
+
+    def test_quiet_tree_reports_nothing(self):
+        self.assertEqual(self.monitor.poll(0.05), (set(), False))
+
+
+class TestPollingMonitor(MonitorTests, unittest.TestCase):
+    def create_monitor(self, discovery):
+        return PollingMonitor(discovery)
+
+    def test_tracks_extra_files(self):
+        extra = self.base / 'methods.json'
+        self.monitor.close()
+        self.monitor = PollingMonitor(FileDiscovery(self.base), extra_files=[extra])
+        extra.write_text('{}', encoding='utf-8')
+
+        changed, _ = self.monitor.poll(0)
+        self.assertEqual(changed, {extra})
+
+
+@unittest.skipUnless(InotifyMonitor.is_available(), 'inotify is not available')
+class TestInotifyMonitor(MonitorTests, unittest.TestCase):
+    def create_monitor(self, discovery):
+        return InotifyMonitor(discovery)
+
+    def test_new_directories_are_watched(self):
+        (self.base / 'new').mkdir()
+        _, rescan = self.collect()
+        self.assertTrue(rescan)
+
+        (self.base / 'new' / 'D.php').write_text('<?php\n', encoding='utf-8')
+        changed, _ = self.collect()
+        self.assertIn(self.base / 'new' / 'D.php', changed)
+
+    def test_excluded_directories_are_not_watched(self):
+        self.monitor.close()
+        (self.base / 'vendor').mkdir()
+        self.monitor = InotifyMonitor(FileDiscovery(self.base, exclude=['vendor']))
+
+        (self.base / 'vendor' / 'E.php').write_text('<?php\n', encoding='utf-8')
+        self.assertEqual(self.collect(), (set(), False))
+
+
+class TestReportWatcherStatistics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name, 'project')
+        self.base.mkdir()
+        (self.base / 'A.php').write_text('<?php\nclass A {\n    public function run() {}\n}\n', encoding='utf-8')
+        (self.base / 'B.php').write_text('<?php\nclass B {}\n', encoding='utf-8')
+        self.analyzer = PHPAnalyzer(str(Path(self.tmp.name, 'descriptions')), cache_dir=None, engine='python',
+                                    failure_report=None)
+        self.watcher = ReportWatcher(self.analyzer, self.base, Path(self.tmp.name, 'report.csv'),
+                                     use_inotify=False)
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp.cleanup()
+
+    def test_statistics_follow_changes(self):
+        self.watcher._parse({'A.php': self.base / 'A.php', 'B.php': self.base / 'B.php'})
+        self.assertEqual(dict(self.analyzer.stats['total']), {'class': 2, 'method': 1})
+
+        # Повторный разбор измененного файла не добавляет его элементы второй раз
+        (self.base / 'A.php').write_text('<?php\nclass A {}\n', encoding='utf-8')
+        self.watcher._apply_changes({self.base / 'A.php'}, False)
+        self.assertEqual(dict(self.analyzer.stats['total']), {'class': 2})
+
+        (self.base / 'B.php').unlink()
+        self.watcher._apply_changes({self.base / 'B.php'}, False)
+        self.assertEqual(dict(self.analyzer.stats['total']), {'class': 1})
+